@@ -1,13 +1,26 @@
 import os
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from modules.loader import DataLoader
+from modules.cube import SalesCube
 from modules.kpi import KPIEngine
 from modules.visualization import Visualizer
-from modules.forecasting import ForecastEngine
+from modules.forecasting import ForecastEngine, DEFAULT_ORDER
+from modules.anomaly import AnomalyDetector
+from modules.backtest import Backtester
+from modules.growth import GrowthEngine, GROWTH_LABELS
 from modules.ai_engine import AIEngine
-from modules.utils import format_currency, format_percentage
+from modules.rfm import RFMEngine, RFM_COLUMNS
+from modules.context import ContextBuilder
+from modules.cache import ResultCache, CachedEngine
+from modules.shared import SharedFrameStore
+from modules.storage import SQLiteStore
+from modules.refresh import IncrementalDataset, MIN_SCAN_INTERVAL
+from modules.downsample import page_count, page_frame
+from modules.profiling import get_profiler, profile_block
+from modules.utils import format_currency, format_percentage, slice_by_date
 
 # Page Config
 st.set_page_config(
@@ -17,6 +30,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Every timed call made by this script run is tagged with run_id, so the
+# diagnostics panel can show where this rerun's time went.
+profiler = get_profiler()
+run_id = profiler.begin_run()
+
 # ---------- Load CSS (correct path) ----------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 css_path = os.path.join(BASE_DIR, "assets", "custom.css")
@@ -29,20 +47,137 @@ except FileNotFoundError:
 # ---------------------------------------------
 
 # Initialize Modules
-@st.cache_data
+# Serving several worker processes: with DASHBOARD_SHARED_MEMORY=1 the frame
+# and cube are published once (to DASHBOARD_SHARED_DIR, /dev/shm by default)
+# and every worker memory-maps the same read-only copy.
+SHARED_MEMORY = os.getenv('DASHBOARD_SHARED_MEMORY', '0') == '1'
+# Incremental refresh: order batches (CSV/Parquet) dropped into this directory
+# are appended to the loaded data without a full reload.
+REFRESH_DIR = os.getenv('DASHBOARD_REFRESH_DIR', '')
+# DASHBOARD_BACKEND=sqlite keeps the order lines in SQLite instead of memory:
+# the date filter, KPIs and charts run as SQL aggregations, and only the
+# aggregated cube of the selected range is held by the process.
+USE_STORE = os.getenv('DASHBOARD_BACKEND', 'memory') == 'sqlite'
+# DASHBOARD_STREAMING=1 serves a full-history overview from aggregates folded
+# in while the source is read in chunks; the raw frame is never loaded.
+STREAMING = os.getenv('DASHBOARD_STREAMING', '0') == '1'
+
+# cache_resource rather than cache_data: the frame is only ever read, and
+# cache_data would hand every rerun a fresh unpickled copy of it.
+@st.cache_resource
 def load_data():
     loader = DataLoader()
-    return loader.load_data()
+    return loader.load_shared() if SHARED_MEMORY else loader.load_data()
+
+@st.cache_resource
+def dataset_fingerprint():
+    return DataLoader().fingerprint()
+
+@st.cache_resource
+def get_result_cache():
+    # Shared by all sessions: KPI dicts, aggregated frames and figures keyed
+    # on (dataset, date range, method, args).
+    return ResultCache()
+
+@st.cache_resource
+def load_cube():
+    # Built once per process (or once per host in shared mode); every widget
+    # interaction reads the cube instead of re-aggregating the raw rows.
+    if SHARED_MEMORY:
+        return SalesCube.get_or_publish(SharedFrameStore(), DataLoader().data_path,
+                                        dataset_fingerprint(), load_data)
+    return SalesCube.from_frame(load_data())
+
+@st.cache_resource
+def load_store():
+    # Built from the source file on first use and whenever it changes.
+    return DataLoader().get_store()
+
+@st.cache_resource(max_entries=8)
+def store_rfm_engine(fingerprint, start_date, end_date):
+    # Customers are scored from the range's rows read in chunks, never all at once.
+    engine = RFMEngine()
+    for chunk in load_store().iter_rows(start_date, end_date, columns=RFM_COLUMNS):
+        engine.update(chunk)
+    return engine
+
+@st.cache_resource
+def load_aggregates():
+    return DataLoader().stream_data()
+
+@st.cache_resource
+def load_dataset():
+    # One per process, shared by all sessions: each rerun picks up the batches
+    # any session has applied.
+    return IncrementalDataset(load_data(), load_cube(), batch_dir=REFRESH_DIR)
+
+if STREAMING:
+    try:
+        aggregates = load_aggregates()
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        st.stop()
+    stream_scope = (dataset_fingerprint(), None, None)
+    stream_kpis = CachedEngine(get_result_cache(), stream_scope, KPIEngine, aggregates=aggregates)
+    stream_charts = CachedEngine(get_result_cache(), stream_scope, Visualizer, aggregates=aggregates)
+
+    st.sidebar.title("📊 Smart Dashboard")
+    st.sidebar.markdown("---")
+    st.sidebar.info("Streaming mode: the whole history, aggregated while reading the source in chunks.")
+
+    st.title("🚀 Business Overview")
+    kpis = stream_kpis.calculate_kpis()
+    growth = stream_kpis.calculate_growth()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Sales", format_currency(kpis['total_sales']), f"{growth['mom_growth']:.1f}% MoM")
+    col2.metric("Total Profit", format_currency(kpis['total_profit']), f"{growth['yoy_growth']:.1f}% YoY")
+    col3.metric("Total Orders", kpis['total_orders'])
+    col4.metric("Avg Order Value", format_currency(kpis['avg_order_value']))
+    st.markdown("---")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(stream_charts.plot_sales_over_time(), use_container_width=True)
+    with col2:
+        st.plotly_chart(stream_charts.plot_profit_over_time(), use_container_width=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(stream_charts.plot_category_sales(), use_container_width=True)
+    with col2:
+        st.plotly_chart(stream_charts.plot_region_map(), use_container_width=True)
+    st.subheader("Region Performance")
+    st.dataframe(stream_kpis.get_region_performance(), hide_index=True)
+    st.stop()
 
 try:
-    df = load_data()
+    if USE_STORE:
+        store = load_store()
+        df = None
+        fingerprint = store.fingerprint()
+    else:
+        df = load_data()
+        cube = load_cube()
+        fingerprint = dataset_fingerprint()
+    if REFRESH_DIR and not USE_STORE:
+        dataset = load_dataset()
+        dataset.refresh()
+        version, df, cube = dataset.snapshot()
+        # Results computed before a batch landed must not be served after it
+        fingerprint = f"{fingerprint}-v{version}"
 except Exception as e:
     st.error(f"Error loading data: {e}")
     st.stop()
 
-kpi_engine = KPIEngine(df)
-visualizer = Visualizer(df)
-forecast_engine = ForecastEngine(df)
+result_cache = get_result_cache()
+full_scope = (fingerprint, None, None)
+if USE_STORE:
+    # Store queries are memoized like engine methods, keyed on their arguments.
+    store_queries = CachedEngine(result_cache, full_scope, SQLiteStore, store.db_path)
+    cube = SalesCube(store_queries.cube_frame())
+kpi_engine = CachedEngine(result_cache, full_scope, KPIEngine, df, cube=cube)
+visualizer = CachedEngine(result_cache, full_scope, Visualizer, df, cube=cube)
+forecast_engine = CachedEngine(result_cache, full_scope, ForecastEngine, df, cube=cube)
+backtester = CachedEngine(result_cache, full_scope, Backtester, df, cube=cube)
 ai_engine = AIEngine()
 
 # Sidebar
@@ -50,8 +185,11 @@ st.sidebar.title("📊 Smart Dashboard")
 st.sidebar.markdown("---")
 
 # Date Filter
-min_date = df['order_date'].min().date()
-max_date = df['order_date'].max().date()
+if USE_STORE:
+    min_date, max_date = (bound.date() for bound in store_queries.date_bounds())
+else:
+    min_date = df['order_date'].iloc[0].date()
+    max_date = df['order_date'].iloc[-1].date()
 
 start_date = st.sidebar.date_input("Start Date", min_date)
 end_date = st.sidebar.date_input("End Date", max_date)
@@ -59,16 +197,40 @@ end_date = st.sidebar.date_input("End Date", max_date)
 if start_date > end_date:
     st.sidebar.error("Start date must be before end date.")
 
-# Filter Data
-mask = (df['order_date'].dt.date >= start_date) & (df['order_date'].dt.date <= end_date)
-filtered_df = df.loc[mask]
+# Long daily histories are downsampled (LTTB) to what the chart can show.
+chart_freq = st.sidebar.selectbox("Chart granularity", ["D", "W", "M"], index=2,
+                                  format_func={'D': "Daily", 'W': "Weekly", 'M': "Monthly"}.get)
+mark_anomalies = st.sidebar.checkbox("Mark anomalies on charts", value=True)
+
+# Filter Data (df is sorted by order_date, so this is a binary search and a view;
+# with the SQLite backend the range is aggregated by the database instead)
+with profile_block('app.filter_by_date', rows=len(cube) if USE_STORE else len(df)):
+    if USE_STORE:
+        filtered_df = None
+        filtered_cube = SalesCube(store_queries.cube_frame(start_date, end_date))
+    else:
+        filtered_df = slice_by_date(df, start_date, end_date)
+        filtered_cube = cube.slice(start_date, end_date)
 
-# Re-initialize engines with filtered data
-kpi_engine_filtered = KPIEngine(filtered_df)
-visualizer_filtered = Visualizer(filtered_df)
+# Engines for the filtered data; results are memoized per date range, so
+# revisiting a page or a previous filter reuses them instead of recomputing.
+scope = (fingerprint, start_date, end_date)
+# One growth timeline per range, shared by the KPI cards, the AI digest and the charts
+growth_engine_filtered = CachedEngine(result_cache, scope, GrowthEngine, filtered_df, cube=filtered_cube)
+kpi_engine_filtered = CachedEngine(result_cache, scope, KPIEngine, filtered_df, cube=filtered_cube,
+                                   growth=growth_engine_filtered)
+visualizer_filtered = CachedEngine(result_cache, scope, Visualizer, filtered_df, cube=filtered_cube,
+                                   growth=growth_engine_filtered)
+context_builder_filtered = CachedEngine(result_cache, scope, ContextBuilder, filtered_df, cube=filtered_cube,
+                                        growth=growth_engine_filtered)
+anomaly_detector_filtered = CachedEngine(result_cache, scope, AnomalyDetector, filtered_df, cube=filtered_cube)
+rfm_engine_filtered = None if USE_STORE else CachedEngine(result_cache, scope, RFMEngine, filtered_df)
 
 # Navigation
 page = st.sidebar.radio("Navigate", ["Overview", "Sales Analytics", "Customers", "Forecasting", "AI Insights"])
+show_diagnostics = st.sidebar.checkbox("Show diagnostics", value=False)
+watch_data = REFRESH_DIR and not USE_STORE and st.sidebar.checkbox("Watch for new data", value=False)
+poll_forecast = False
 
 st.sidebar.markdown("---")
 st.sidebar.info("Built with Streamlit & OpenAI")
@@ -93,7 +255,7 @@ if page == "Overview":
     # Charts Row 1
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(visualizer_filtered.plot_sales_over_time(), use_container_width=True)
+        st.plotly_chart(visualizer_filtered.plot_sales_over_time(freq=chart_freq, anomalies=mark_anomalies), use_container_width=True)
     with col2:
         st.plotly_chart(visualizer_filtered.plot_category_sales(), use_container_width=True)
         
@@ -102,7 +264,13 @@ if page == "Overview":
     with col1:
         st.plotly_chart(visualizer_filtered.plot_region_map(), use_container_width=True)
     with col2:
-        st.plotly_chart(visualizer_filtered.plot_top_products(), use_container_width=True)
+        if USE_STORE:
+            product_sales = store_queries.aggregate(by=['product_name'], start_date=start_date,
+                                                    end_date=end_date, measures=('sales',))
+            st.plotly_chart(visualizer_filtered.plot_top_products(product_sales=product_sales),
+                            use_container_width=True)
+        else:
+            st.plotly_chart(visualizer_filtered.plot_top_products(), use_container_width=True)
 
 # --- SALES ANALYTICS PAGE ---
 elif page == "Sales Analytics":
@@ -110,48 +278,108 @@ elif page == "Sales Analytics":
     
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(visualizer_filtered.plot_profit_over_time(), use_container_width=True)
+        st.plotly_chart(visualizer_filtered.plot_profit_over_time(freq=chart_freq, anomalies=mark_anomalies), use_container_width=True)
     with col2:
         st.plotly_chart(visualizer_filtered.plot_monthly_trends(), use_container_width=True)
         
     st.plotly_chart(visualizer_filtered.plot_profitability_heatmap(), use_container_width=True)
+
+    # Every rate for every slice comes from one cached timeline per date range.
+    st.subheader("Growth by Slice")
+    col1, col2 = st.columns(2)
+    growth_rate = col1.radio("Rate", list(GROWTH_LABELS), index=2, horizontal=True,
+                             format_func=GROWTH_LABELS.get)
+    growth_dimension = col2.radio("Slice by", ["region", "category", "segment"], horizontal=True)
+    growth_timeline = growth_engine_filtered.timeline()
+    st.plotly_chart(visualizer_filtered.plot_growth(growth_rate, growth_dimension, timeline=growth_timeline),
+                    use_container_width=True)
+
+    with st.expander("Anomalies by Region & Category"):
+        # Every slice is scored against its own trailing window in one vectorized pass.
+        anomaly_metric = st.radio("Metric", ["sales", "profit"], horizontal=True)
+        anomalies = anomaly_detector_filtered.detect(metric=anomaly_metric, freq=chart_freq)
+        st.caption(f"{len(anomalies):,} flagged points (|robust z| ≥ 3.5)")
+        st.dataframe(anomalies.head(100), hide_index=True)
     
     with st.expander("Raw Data View"):
-        st.dataframe(filtered_df)
+        # Only the visible page is sent to the browser.
+        page_size = st.selectbox("Rows per page", [100, 500, 1000, 5000], index=2)
+        n_rows = int(filtered_cube.totals()['lines']) if USE_STORE else len(filtered_df)
+        n_pages = page_count(n_rows, page_size)
+        page_number = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1)
+        first_row = (min(page_number, n_pages) - 1) * page_size
+        if USE_STORE:
+            page_rows = store.fetch_rows(start_date, end_date, limit=page_size, offset=first_row)
+        else:
+            page_rows = page_frame(filtered_df, page_number, page_size)
+        st.caption(f"Rows {first_row + 1:,}–{first_row + len(page_rows):,} of {n_rows:,}")
+        st.dataframe(page_rows)
 
 # --- CUSTOMERS PAGE ---
 elif page == "Customers":
     st.title("👥 Customer Insights")
     
-    st.plotly_chart(visualizer_filtered.plot_discount_vs_sales(), use_container_width=True)
-    
-    # Simple Customer Segmentation (RFM-like)
-    customer_stats = filtered_df.groupby('customer_name').agg({
-        'sales': 'sum',
-        'order_id': 'nunique',
-        'order_date': 'max'
-    }).reset_index()
-    customer_stats.columns = ['Customer', 'Total Spend', 'Frequency', 'Last Order']
+    if USE_STORE:
+        st.info("The discount scatter plots order lines, which the SQLite backend does not hold in memory.")
+    else:
+        scatter_mode = st.radio("Large data rendering", ["sample", "density"], horizontal=True,
+                                format_func={'sample': "Stratified sample", 'density': "Density heatmap"}.get)
+        st.plotly_chart(visualizer_filtered.plot_discount_vs_sales(mode=scatter_mode), use_container_width=True)
     
+    # RFM segmentation per customer_id, scored by quintiles of the filtered period
+    st.subheader("Customer Segments (RFM)")
+    if USE_STORE:
+        rfm_engine_filtered = store_rfm_engine(fingerprint, start_date, end_date)
+    segments = rfm_engine_filtered.segment_summary()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(px.bar(segments, x='segment', y='customers', color='total_sales',
+                               title='Customers per Segment'), use_container_width=True)
+    with col2:
+        st.dataframe(segments, hide_index=True)
+
     st.subheader("Top Customers")
-    st.dataframe(customer_stats.sort_values('Total Spend', ascending=False).head(10))
+    top_customers = rfm_engine_filtered.top_customers(10).rename(columns={
+        'customer_id': 'Customer ID', 'customer_name': 'Customer', 'monetary': 'Total Spend',
+        'frequency': 'Frequency', 'recency_days': 'Days Since Last Order', 'segment': 'Segment'})
+    st.dataframe(top_customers, hide_index=True)
 
 # --- FORECASTING PAGE ---
 elif page == "Forecasting":
     st.title("🔮 AI Forecasting")
     
     forecast_periods = st.slider("Forecast Months", 1, 24, 12)
+    auto_order = st.checkbox("Auto-select model order", value=False,
+                             help="Search a small grid of SARIMA orders by AIC; the choice is cached per dataset.")
+    sarima_order = 'auto' if auto_order else DEFAULT_ORDER
     
-    tab1, tab2 = st.tabs(["SARIMA Model", "Linear Trend"])
+    tab1, tab2, tab3 = st.tabs(["SARIMA Model", "Linear Trend", "Model Accuracy"])
+
+    # The model is fitted on a background worker and cached per series, so
+    # the page never blocks on a fit and horizon changes never refit.
+    sarima_fit = forecast_engine.engine.fit_sarima_async(order=sarima_order)
     
     with tab1:
         st.subheader("SARIMA Sales Forecast")
-        with st.spinner("Generating Forecast..."):
-            forecast_df = forecast_engine.sarima_forecast(periods=forecast_periods)
+        if not sarima_fit.done():
+            st.info("Selecting and fitting the SARIMA model in the background; the forecast will appear shortly."
+                    if auto_order else
+                    "Fitting the SARIMA model in the background; the forecast will appear shortly.")
+        elif sarima_fit.exception() is not None:
+            st.error("Forecast generation failed. Check data sufficiency.")
+        else:
+            forecast_df = forecast_engine.sarima_forecast(periods=forecast_periods, order=sarima_order)
             history_df = forecast_engine.prepare_data()
             
+            # Months the fitted model missed by an outlying margin
+            model_outliers = result_cache.get_or_compute(
+                (full_scope, 'residual_outliers', sarima_order),
+                lambda: AnomalyDetector(df, cube).residual_outliers(sarima_fit.result())
+            ) if mark_anomalies else None
+
             if not forecast_df.empty:
-                st.plotly_chart(visualizer.plot_forecast(history_df, forecast_df), use_container_width=True)
+                st.plotly_chart(visualizer.plot_forecast(history_df, forecast_df, anomalies=model_outliers),
+                                use_container_width=True)
                 
                 # AI Interpretation
                 if st.button("Interpret Forecast with AI"):
@@ -168,6 +396,30 @@ elif page == "Forecasting":
             fig = px.line(trend_df, title="Linear Trend Projection")
             st.plotly_chart(fig, use_container_width=True)
 
+    with tab3:
+        st.subheader("Rolling-origin Backtest")
+        st.caption("Each model is refitted on the history before each of the last 6 origins and scored on "
+                   "the months after it, for the total and every region and category.")
+        backtest_horizon = st.slider("Horizon (months)", 1, 12, 6)
+        include_sarima = st.checkbox("Include SARIMA", value=False,
+                                     help="Fits every slice at every origin on a process pool; "
+                                          "results are cached per dataset.")
+        backtest_models = ('trend', 'sarima') if include_sarima else ('trend',)
+        with st.spinner("Backtesting..."):
+            scores = backtester.run(models=backtest_models, horizon=backtest_horizon)
+        if scores.empty:
+            st.warning("Not enough history to backtest.")
+        else:
+            st.plotly_chart(px.line(scores[scores['dimension'] == 'total'], x='horizon', y='mape',
+                                    color='model', markers=True, title='Total Sales MAPE by Horizon (%)'),
+                            use_container_width=True)
+            st.markdown("**Best model per slice (mean MAPE over all horizons)**")
+            st.dataframe(Backtester.best_models(scores), hide_index=True)
+            with st.expander("All scores"):
+                st.dataframe(scores, hide_index=True)
+
+    poll_forecast = not sarima_fit.done()
+
 # --- AI INSIGHTS PAGE ---
 elif page == "AI Insights":
     st.title("🤖 AI Insight Engine")
@@ -176,34 +428,64 @@ elif page == "AI Insights":
     if api_key:
         ai_engine = AIEngine(api_key)
     
-    insight_type = st.selectbox("Select Insight Type", [
+    insight_types = st.multiselect("Select Insight Types", [
         "Executive Summary",
         "Trend Analysis",
         "Regional Performance",
         "Anomaly Detection",
-        "Discount Strategy"
-    ])
-    
-    if st.button("Generate Insight"):
+        "Discount Strategy",
+        "Customer Segments"
+    ], default=["Executive Summary"])
+
+    INSIGHT_PROMPTS = {
+        "Executive Summary": 'executive_summary',
+        "Trend Analysis": 'trend_summary',
+        "Regional Performance": 'region_performance',
+        "Discount Strategy": 'discount_causality',
+        "Anomaly Detection": 'anomaly_detection',
+        "Customer Segments": 'rfm_segment'
+    }
+
+    def build_insight_context(insight_type):
+        """Compact digest of the filtered data and prompt type for one insight."""
+        prompt_type = INSIGHT_PROMPTS.get(insight_type, 'anomaly_detection')
+        return context_builder_filtered.build(prompt_type), prompt_type
+
+    if st.button("Generate Insights") and insight_types:
         with st.spinner("Analyzing data..."):
-            # Prepare context based on selection
-            if insight_type == "Executive Summary":
-                context = kpi_engine_filtered.calculate_kpis()
-                prompt_type = 'executive_summary'
-            elif insight_type == "Trend Analysis":
-                context = filtered_df.groupby('month_year')['sales'].sum().to_dict()
-                prompt_type = 'trend_summary'
-            elif insight_type == "Regional Performance":
-                context = kpi_engine_filtered.get_region_performance().to_dict()
-                prompt_type = 'region_performance'
-            elif insight_type == "Discount Strategy":
-                context = filtered_df[['discount', 'sales', 'profit']].corr().to_dict()
-                prompt_type = 'discount_causality'
-            else:
-                context = filtered_df.describe().to_string()
-                prompt_type = 'anomaly_detection'
-                
-            insight = ai_engine.generate_insight(str(context), prompt_type)
-            
-            st.markdown("### 💡 AI Analysis")
-            st.write(insight)
+            # All selected insights are requested concurrently; ones already
+            # generated for this data come straight from the insight cache.
+            prompt_types, requests = {}, {}
+            for insight_type in insight_types:
+                context, prompt_type = build_insight_context(insight_type)
+                prompt_types[insight_type] = prompt_type
+                requests[prompt_type] = context
+            insights = ai_engine.generate_insights(requests)
+
+        for insight_type in insight_types:
+            st.markdown(f"### 💡 {insight_type}")
+            st.write(insights[prompt_types[insight_type]])
+
+# --- DIAGNOSTICS ---
+if show_diagnostics:
+    with st.sidebar.expander("⏱ Diagnostics", expanded=True):
+        track_memory = st.checkbox("Track peak memory (slower)", value=profiler.track_memory)
+        if track_memory != profiler.track_memory:
+            profiler.set_memory_tracking(track_memory)
+
+        st.caption("This rerun (cache hits do not appear)")
+        st.dataframe(profiler.summary(run_id)[['name', 'calls', 'total_ms', 'rows', 'peak_bytes']],
+                     hide_index=True)
+        cache_stats = result_cache.stats()
+        st.caption(f"Result cache: {cache_stats['entries']} entries, {cache_stats['bytes'] / 1e6:.1f} MB, "
+                   f"{cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        st.caption("Since start, all sessions")
+        st.dataframe(profiler.summary(), hide_index=True)
+        if st.button("Write timings to log"):
+            st.caption(f"Logged {profiler.log_records(run_id)} records")
+
+# Poll until the background fit lands; widgets stay responsive meanwhile.
+# Watching for new data reruns on the refresh interval to pick up batches.
+if poll_forecast or watch_data:
+    time.sleep(1 if poll_forecast else MIN_SCAN_INTERVAL)
+    st.rerun()
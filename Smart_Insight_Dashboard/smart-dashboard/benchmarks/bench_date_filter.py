@@ -0,0 +1,50 @@
+"""Per-interaction latency of the sidebar date filter: row mask vs sorted slice.
+
+    python benchmarks/bench_date_filter.py --rows 1000000 10000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import timed
+from modules.utils import day_index, slice_by_date
+
+def mask_filter(df, start_date, end_date):
+    """The original app.py filter: per-row date objects, then a copying .loc."""
+    mask = (df['order_date'].dt.date >= start_date) & (df['order_date'].dt.date <= end_date)
+    return df.loc[mask]
+
+def make_frame(n_rows, seed=42):
+    """Sorted order dates over four years plus a few measure/dimension columns."""
+    rng = np.random.default_rng(seed)
+    days = np.sort(rng.integers(0, 1460, n_rows))
+    df = pd.DataFrame({
+        'order_date': pd.Timestamp('2021-01-01') + pd.to_timedelta(days, unit='D'),
+        'region': pd.Categorical.from_codes(rng.integers(0, 4, n_rows), ['North', 'South', 'East', 'West']),
+        'sales': rng.uniform(10, 5000, n_rows),
+        'profit': rng.uniform(-100, 500, n_rows)
+    })
+    df['order_day'] = day_index(df['order_date'])
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}{'mask ms':>12}{'slice ms':>12}{'speedup':>10}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        start_date = (df['order_date'].iloc[n_rows // 4]).date()
+        end_date = (df['order_date'].iloc[n_rows // 2]).date()
+
+        # Each interaction filters, then sums: what the KPI row does on a rerun
+        mask_ms, expected = timed(lambda: mask_filter(df, start_date, end_date)['sales'].sum(), args.repeat)
+        slice_ms, result = timed(lambda: slice_by_date(df, start_date, end_date)['sales'].sum(), args.repeat)
+        assert np.isclose(expected, result)
+        print(f"{n_rows:>12,}{mask_ms:>12.1f}{slice_ms:>12.2f}{mask_ms / slice_ms:>9.0f}x")
+
+if __name__ == '__main__':
+    main()
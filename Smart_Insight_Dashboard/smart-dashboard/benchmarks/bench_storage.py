@@ -0,0 +1,67 @@
+"""Compare the SQLite storage backend with the in-memory pandas path.
+
+    python benchmarks/bench_storage.py --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import timed
+from modules.synthetic import SyntheticGenerator
+from modules.loader import DataLoader
+from modules.kpi import KPIEngine
+from modules.utils import filter_data_by_date
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'orders.csv')
+        SyntheticGenerator(args.rows, n_customers=10_000).write(csv_path)
+        loader = DataLoader(csv_path, use_cache=False)
+
+        start = time.perf_counter()
+        df = loader.load_data()
+        pandas_load = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        store = loader.get_store()
+        sqlite_load = (time.perf_counter() - start) * 1000
+
+        lo, hi = df['order_date'].min(), df['order_date'].max()
+        start_date = (lo + (hi - lo) / 4).date()
+        end_date = (lo + (hi - lo) / 2).date()
+
+        def pandas_kpis():
+            return KPIEngine(filter_data_by_date(df, start_date, end_date)).calculate_kpis()
+
+        def pandas_monthly():
+            return loader.get_monthly_aggregated(filter_data_by_date(df, start_date, end_date))
+
+        def pandas_region_month():
+            filtered = filter_data_by_date(df, start_date, end_date)
+            return filtered.groupby(['month_year', 'region'], observed=True)['sales'].sum()
+
+        cases = [
+            ('load', lambda: None, lambda: None),
+            ('kpis (date range)', pandas_kpis, lambda: store.kpis(start_date, end_date)),
+            ('monthly (date range)', pandas_monthly, lambda: store.monthly(start_date, end_date)),
+            ('month x region', pandas_region_month,
+             lambda: store.aggregate(by=['region'], grain='M', start_date=start_date, end_date=end_date)),
+        ]
+
+        print(f"{args.rows:,} rows, range {start_date} .. {end_date}")
+        print(f"{'case':<24}{'pandas ms':>12}{'sqlite ms':>12}")
+        for name, pandas_fn, sqlite_fn in cases:
+            if name == 'load':
+                pandas_ms, sqlite_ms = pandas_load, sqlite_load
+            else:
+                pandas_ms, _ = timed(pandas_fn, args.repeat)
+                sqlite_ms, _ = timed(sqlite_fn, args.repeat)
+            print(f"{name:<24}{pandas_ms:>12.1f}{sqlite_ms:>12.1f}")
+
+if __name__ == '__main__':
+    main()
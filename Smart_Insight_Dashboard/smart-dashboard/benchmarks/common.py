@@ -0,0 +1,22 @@
+"""Shared helpers for the standalone benchmark scripts."""
+import os
+import sys
+import time
+
+# Benchmarks are run as scripts from the project root: make `modules` importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.synthetic import SyntheticGenerator
+
+def make_orders(n_rows, seed=42):
+    """Superstore-shaped order lines over 2021-2024 with seasonality and skewed popularity."""
+    return SyntheticGenerator(n_rows, n_customers=10_000, seed=seed).generate()
+
+def timed(fn, repeat=5):
+    """Best-of-`repeat` wall time in milliseconds, plus the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
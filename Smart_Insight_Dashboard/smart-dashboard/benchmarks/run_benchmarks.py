@@ -0,0 +1,164 @@
+"""Benchmark suite over the dashboard hot paths at several synthetic data sizes.
+
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --output baseline.json
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 --compare baseline.json
+
+With --compare, cases slower than the baseline by more than --threshold (and
+by more than --min-ms, to ignore timer noise on tiny cases) are reported and
+the script exits with status 1, so it can gate a CI job.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from common import timed
+from modules.cube import SalesCube
+from modules.forecasting import ForecastEngine
+from modules.kpi import KPIEngine
+from modules.loader import DataLoader
+from modules.model_store import ModelStore
+from modules.synthetic import SyntheticGenerator
+from modules.utils import available_cpus, filter_data_by_date, logger, slice_by_date
+from modules.visualization import Visualizer
+
+PLOTS = ['plot_sales_over_time', 'plot_profit_over_time', 'plot_category_sales', 'plot_region_map',
+         'plot_top_products', 'plot_discount_vs_sales', 'plot_profitability_heatmap',
+         'plot_monthly_trends']
+
+def build_cases(data_path, workdir):
+    """(name, fn, repeat override) for every hot path, against one dataset.
+
+    Cases with a repeat override measure one-off work and are not warmed up.
+    """
+    df = DataLoader(data_path).load_data()  # also primes the Parquet cache
+    cube = SalesCube.from_frame(df)
+    lo, hi = df['order_date'].iloc[0], df['order_date'].iloc[-1]
+    start_date, end_date = (lo + (hi - lo) / 4).date(), (lo + (hi - lo) / 2).date()
+    filtered = slice_by_date(df, start_date, end_date)
+    filtered_cube = cube.slice(start_date, end_date)
+
+    cases = [
+        ('load.csv_parse', lambda: DataLoader(data_path, use_cache=False).load_data(), None),
+        ('load.cached', lambda: DataLoader(data_path).load_data(), None),
+        ('cube.build', lambda: SalesCube.from_frame(df), None),
+        ('filter.filter_data_by_date', lambda: filter_data_by_date(df, start_date, end_date), None),
+        ('filter.slice_by_date', lambda: slice_by_date(df, start_date, end_date), None),
+    ]
+    for variant, engine in (('raw', lambda: KPIEngine(filtered)),
+                            ('cube', lambda: KPIEngine(filtered, cube=filtered_cube))):
+        for method in ('calculate_kpis', 'calculate_growth', 'get_region_performance'):
+            cases.append((f'kpi.{method}[{variant}]',
+                          lambda engine=engine, method=method: getattr(engine(), method)(), None))
+    for variant, visualizer in (('raw', Visualizer(filtered)),
+                                ('cube', Visualizer(filtered, cube=filtered_cube))):
+        for method in PLOTS:
+            cases.append((f'viz.{method}[{variant}]', getattr(visualizer, method), None))
+
+    engine = ForecastEngine(df, cube=cube, model_store=ModelStore(os.path.join(workdir, 'models')))
+    history, forecast = engine.prepare_data(), engine.sarima_forecast()
+    cases.append(('viz.plot_forecast', lambda: Visualizer(df).plot_forecast(history, forecast), None))
+    # A fresh store per call measures the fit itself; the second case is a warm rerun.
+    cases.append(('forecast.sarima_forecast[cold]', lambda: ForecastEngine(
+        df, cube=cube, model_store=ModelStore(tempfile.mkdtemp(dir=workdir))).sarima_forecast(), 1))
+    cases.append(('forecast.sarima_forecast[cached]', engine.sarima_forecast, None))
+    cases.append(('forecast.linear_trend', engine.linear_trend, None))
+    return cases
+
+def run_suite(sizes, repeat, pattern=None, seed=42):
+    """Time every case at every size; one record per (case, rows)."""
+    results = []
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            data_path = os.path.join(workdir, 'orders.csv')
+            SyntheticGenerator(n_rows, seed=seed).write(data_path)
+            for name, fn, case_repeat in build_cases(data_path, workdir):
+                if pattern and not re.search(pattern, name):
+                    continue
+                if case_repeat is None:
+                    fn()  # warm-up: first-call costs (imports, lazy caches) are not the hot path
+                ms, _ = timed(fn, case_repeat or repeat)
+                results.append({'case': name, 'rows': n_rows, 'ms': round(ms, 3)})
+                print(f"{n_rows:>12,}  {name:<44}{ms:>12.2f} ms", flush=True)
+    return results
+
+def environment():
+    """Where the numbers came from, so baselines are only compared like for like."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': available_cpus()
+    }
+
+def compare(baseline, results, threshold=0.2, min_ms=1.0):
+    """Rows of (case, rows, baseline ms, current ms, ratio, regressed) for cases in both runs."""
+    previous = {(r['case'], r['rows']): r['ms'] for r in baseline['results']}
+    rows = []
+    for r in results:
+        before = previous.get((r['case'], r['rows']))
+        if before is None:
+            continue
+        ratio = r['ms'] / before if before > 0 else float('inf')
+        regressed = ratio > 1 + threshold and r['ms'] - before > min_ms
+        rows.append((r['case'], r['rows'], before, r['ms'], ratio, regressed))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cases', help='Only run cases whose name matches this regex')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier --output run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown as a fraction of the baseline (default 0.2)')
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help='Ignore slowdowns smaller than this many milliseconds')
+    args = parser.parse_args()
+
+    # Keep the timing table readable: library deprecation chatter and
+    # per-load info logs are not what is being measured.
+    warnings.simplefilter('ignore')
+    logger.setLevel(logging.WARNING)
+    results = run_suite(args.rows, args.repeat, args.cases)
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, results, args.threshold, args.min_ms)
+        print(f"\n{'case':<44}{'rows':>12}{'base ms':>12}{'now ms':>12}{'ratio':>8}")
+        for case, n_rows, before, now, ratio, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{case:<44}{n_rows:>12,}{before:>12.2f}{now:>12.2f}{ratio:>7.2f}x{flag}")
+        regressions = [r for r in rows if r[-1]]
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print('\nNo regressions against baseline')
+
+if __name__ == '__main__':
+    main()
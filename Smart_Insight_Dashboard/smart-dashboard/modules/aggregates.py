@@ -0,0 +1,96 @@
+import pandas as pd
+import numpy as np
+
+MEASURES = ['sales', 'profit', 'quantity']
+
+class StreamingAggregates:
+    """Running aggregates folded in chunk by chunk, so peak memory is bounded by
+    the chunk size and the number of distinct orders rather than the row count."""
+
+    def __init__(self):
+        self.rows = 0
+        self._monthly = None
+        self._by_dimension = {'region': None, 'category': None}
+        # Distinct (month, order) pairs as (period ordinal, uint64 hash). New
+        # pairs are buffered and deduplicated once the buffer outgrows the
+        # compacted set, which keeps the total work O(n log n).
+        self._orders = pd.DataFrame({'month': np.array([], dtype='int64'),
+                                     'order': np.array([], dtype='uint64')})
+        self._pending = []
+        self._pending_rows = 0
+
+    def update(self, chunk):
+        """Fold a preprocessed chunk (needs month_year, order_id and measures) into the totals."""
+        if chunk.empty:
+            return self
+        self.rows += len(chunk)
+
+        monthly = chunk.groupby('month_year')[MEASURES].sum()
+        self._monthly = self._combine(self._monthly, monthly)
+
+        for dim in self._by_dimension:
+            if dim in chunk.columns:
+                totals = chunk.groupby(dim, observed=True)[MEASURES].sum()
+                totals.index = totals.index.astype(str)
+                self._by_dimension[dim] = self._combine(self._by_dimension[dim], totals)
+
+        keys = pd.DataFrame({
+            'month': chunk['month_year'].array.asi8,
+            'order': pd.util.hash_pandas_object(chunk['order_id'], index=False).to_numpy()
+        }).drop_duplicates()
+        self._pending.append(keys)
+        self._pending_rows += len(keys)
+        if self._pending_rows > max(len(self._orders), 1 << 16):
+            self._compact()
+        return self
+
+    @staticmethod
+    def _combine(total, part):
+        """Add a partial aggregate onto the running one, aligning on the index."""
+        if total is None:
+            return part
+        return total.add(part, fill_value=0)
+
+    def _compact(self):
+        """Merge buffered order keys into the deduplicated set."""
+        if self._pending:
+            self._orders = pd.concat([self._orders] + self._pending, ignore_index=True).drop_duplicates()
+            self._pending = []
+            self._pending_rows = 0
+        return self._orders
+
+    def monthly_frame(self):
+        """Monthly sales/profit/quantity and distinct orders, shaped like DataLoader.get_monthly_aggregated."""
+        if self._monthly is None:
+            return pd.DataFrame(columns=['month_year'] + MEASURES + ['order_id'])
+        orders = self._compact().groupby('month')['order'].size()
+        monthly = self._monthly.sort_index()
+        monthly['order_id'] = orders.reindex(monthly.index.asi8).fillna(0).astype('int64').to_numpy()
+        monthly = monthly.reset_index()
+        monthly['month_year'] = monthly['month_year'].dt.to_timestamp()
+        return monthly
+
+    def monthly_sales(self):
+        """Monthly sales series indexed by period."""
+        if self._monthly is None:
+            return pd.Series(dtype='float64')
+        return self._monthly['sales'].sort_index()
+
+    def dimension_totals(self, dim):
+        """Sales/profit/quantity totals per value of `region` or `category`."""
+        totals = self._by_dimension[dim]
+        if totals is None:
+            return pd.DataFrame(columns=[dim] + MEASURES)
+        return totals.rename_axis(dim).reset_index()
+
+    def totals(self):
+        """Grand totals, with orders counted once across all months."""
+        if self._monthly is None:
+            return {'sales': 0, 'profit': 0, 'quantity': 0, 'orders': 0}
+        sums = self._monthly.sum()
+        return {
+            'sales': sums['sales'],
+            'profit': sums['profit'],
+            'quantity': sums['quantity'],
+            'orders': self._compact()['order'].nunique()
+        }
@@ -1,46 +1,215 @@
-import openai
+import asyncio
+import hashlib
+import json
 import os
+import random
+import threading
+from .cache import ResultCache
 from .utils import logger
+from .profiling import profiled
+
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+DEFAULT_MODEL = 'gpt-4o-mini'
+DEFAULT_CACHE_DIR = 'data/.cache/insights'
+REQUEST_TIMEOUT = 30.0
+MAX_RETRIES = 3
+# Rate limits and transient server errors are retried with backoff; anything
+# else (bad key, bad request) fails immediately.
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+MAX_CONNECTIONS = 10
+# Insights held in memory; older ones are re-read from disk when asked again.
+MAX_CACHED_INSIGHTS = 256
+
+SYSTEM_PROMPT = "You are a senior data analyst providing business insights."
+PROMPTS = {
+    'executive_summary': "Analyze this sales data summary and provide a concise executive summary for stakeholders: {context}",
+    'trend_summary': "Analyze these sales trends and identify key patterns: {context}",
+    'region_performance': "Compare regional performance and suggest improvements: {context}",
+    'anomaly_detection': "Identify any anomalies or outliers in this data: {context}",
+    'forecast_interpretation': "Interpret this sales forecast and potential risks: {context}",
+    'category_insights': "Provide insights on product category performance: {context}",
+    'discount_causality': "Analyze the relationship between discounts and sales volume/profit: {context}",
+    'rfm_segment': "Suggest marketing strategies for these customer segments: {context}",
+    'growth_explanation': "Explain the Month-over-Month and Year-over-Year growth figures: {context}",
+    'root_cause': "Hypothesize root causes for the observed performance dips: {context}"
+}
+
+# One event loop thread per process owns the pooled HTTP clients and the
+# table of in-flight requests, so every session and engine instance shares
+# connections and identical concurrent requests are sent once. Both are bound
+# to that loop, which is why the coroutines using them are private to AIEngine.
+_loop = None
+_loop_lock = threading.Lock()
+_clients = {}
+_inflight = {}
+
+def _background_loop():
+    """Event loop running on a daemon thread, started on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='ai-engine-loop', daemon=True).start()
+            _loop = loop
+    return _loop
+
+def _client(base_url, timeout):
+    """Pooled keep-alive client for a base URL; only touched from the loop thread."""
+    client = _clients.get(base_url)
+    if client is None:
+        import httpx
+
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS)
+        )
+        _clients[base_url] = client
+    return client
+
+def normalize_context(context):
+    """Canonical text for a context so equivalent inputs share a cache entry."""
+    if not isinstance(context, str):
+        context = json.dumps(context, sort_keys=True, default=str)
+    return ' '.join(context.split())
+
+class InsightCache:
+    """Generated insights kept in memory (LRU) and as JSON files across restarts."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=MAX_CACHED_INSIGHTS):
+        self.cache_dir = cache_dir
+        self._entries = ResultCache(max_entries=max_entries)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        text = self._entries.get(key)
+        if text is not None:
+            return text
+        try:
+            with open(self._path(key)) as f:
+                text = json.load(f)['text']
+        except (OSError, ValueError, KeyError):
+            return None
+        return self._entries.put(key, text)
+
+    def put(self, key, text):
+        self._entries.put(key, text)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'text': text}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not persist insight {key}: {e}")
+        return text
 
 class AIEngine:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, base_url=None, model=DEFAULT_MODEL, cache_dir=DEFAULT_CACHE_DIR,
+                 timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES, max_tokens=200, temperature=0.7):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        if self.api_key:
-            openai.api_key = self.api_key
-        else:
+        # Any OpenAI-compatible endpoint (proxy, local model server, test mock)
+        self.base_url = (base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.cache = InsightCache(cache_dir)
+        if not self.api_key:
             logger.warning("No OpenAI API Key found. AI features will be disabled.")
 
-    def generate_insight(self, context, prompt_type='executive_summary'):
-        """Generate insights using OpenAI."""
+    def cache_key(self, context, prompt_type):
+        """Hash of everything that determines the answer: prompt, context and model settings."""
+        payload = json.dumps([prompt_type, normalize_context(context), self.base_url, self.model,
+                              self.max_tokens, self.temperature])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _messages(self, context, prompt_type):
+        template = PROMPTS.get(prompt_type, PROMPTS['executive_summary'])
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": template.format(context=context)}
+        ]
+
+    async def _request(self, context, prompt_type):
+        """POST a chat completion, retrying rate limits, 5xx and network errors with backoff."""
+        import httpx
+        client = _client(self.base_url, self.timeout)
+        body = {
+            'model': self.model,
+            'messages': self._messages(context, prompt_type),
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature
+        }
+        headers = {'Authorization': f"Bearer {self.api_key}"}
+        for attempt in range(self.max_retries + 1):
+            delay = None
+            try:
+                response = await client.post('/chat/completions', json=body, headers=headers)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    try:
+                        delay = float(response.headers.get('retry-after', ''))
+                    except ValueError:
+                        pass
+                else:
+                    response.raise_for_status()
+                    return response.json()['choices'][0]['message']['content'].strip()
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            if delay is None:
+                delay = 0.5 * 2 ** attempt
+            await asyncio.sleep(delay + random.uniform(0, 0.1))
+
+    async def _agenerate_insight(self, context, prompt_type='executive_summary'):
+        """Async insight: served from cache, joined to an identical in-flight request, or fetched."""
         if not self.api_key:
             return "AI Insights unavailable. Please provide an OpenAI API Key."
+        key = self.cache_key(context, prompt_type)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
 
-        prompts = {
-            'executive_summary': f"Analyze this sales data summary and provide a concise executive summary for stakeholders: {context}",
-            'trend_summary': f"Analyze these sales trends and identify key patterns: {context}",
-            'region_performance': f"Compare regional performance and suggest improvements: {context}",
-            'anomaly_detection': f"Identify any anomalies or outliers in this data: {context}",
-            'forecast_interpretation': f"Interpret this sales forecast and potential risks: {context}",
-            'category_insights': f"Provide insights on product category performance: {context}",
-            'discount_causality': f"Analyze the relationship between discounts and sales volume/profit: {context}",
-            'rfm_segment': f"Suggest marketing strategies for these customer segments: {context}",
-            'growth_explanation': f"Explain the Month-over-Month and Year-over-Year growth figures: {context}",
-            'root_cause': f"Hypothesize root causes for the observed performance dips: {context}"
-        }
-        
-        prompt = prompts.get(prompt_type, prompts['executive_summary'])
-        
+        task = _inflight.get(key)
+        if task is None:
+            async def fetch():
+                try:
+                    return self.cache.put(key, await self._request(context, prompt_type))
+                finally:
+                    _inflight.pop(key, None)
+            task = asyncio.ensure_future(fetch())
+            _inflight[key] = task
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a senior data analyst providing business insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
+            return await asyncio.shield(task)
         except Exception as e:
             logger.error(f"OpenAI API call failed: {e}")
             return f"Error generating insight: {str(e)}"
+
+    async def _agenerate_insights(self, requests):
+        """Run several {prompt_type: context} requests concurrently."""
+        prompt_types = list(requests)
+        results = await asyncio.gather(*(self._agenerate_insight(requests[p], p) for p in prompt_types))
+        return dict(zip(prompt_types, results))
+
+    def _run(self, coroutine):
+        """Run a coroutine on the shared loop and wait for it from this thread."""
+        future = asyncio.run_coroutine_threadsafe(coroutine, _background_loop())
+        return future.result(timeout=self.timeout * (self.max_retries + 1) + 30)
+
+    @profiled()
+    def generate_insight(self, context, prompt_type='executive_summary'):
+        """Generate insights using OpenAI."""
+        if self.api_key:
+            # Cache hits return without touching the event loop.
+            cached = self.cache.get(self.cache_key(context, prompt_type))
+            if cached is not None:
+                return cached
+        return self._run(self._agenerate_insight(context, prompt_type))
+
+    @profiled()
+    def generate_insights(self, requests):
+        """Generate several insights concurrently; returns {prompt_type: text}."""
+        return self._run(self._agenerate_insights(requests))
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from .profiling import profiled
+
+# Slices scored by default: the total plus every region, category and pair.
+ANOMALY_DIMENSIONS = [(), ('region',), ('category',), ('region', 'category')]
+ANOMALY_COLUMNS = ['dimension', 'slice', 'order_date', 'value', 'expected', 'score']
+# Trailing window per frequency: a year of months, a quarter of weeks, four weeks of days.
+DEFAULT_WINDOWS = {'D': 28, 'W': 13, 'M': 12}
+# |score| at or above this is flagged (3.5 is the usual cut-off for robust z).
+DEFAULT_THRESHOLD = 3.5
+# Consistency constant: 1.4826 * MAD estimates the standard deviation of normal data.
+MAD_SCALE = 1.4826
+# Time steps scored per block of sliding windows, bounding memory to
+# block * slices * window floats.
+MEDIAN_BLOCK = 128
+
+def rolling_scores(values, window, method='mad'):
+    """Score of each point against the `window` points before it, for every column at once.
+
+    values is a (time, series) array. 'mad' scores (x - median) / (1.4826 * MAD),
+    falling back to the standard deviation where the MAD is zero (sparse
+    series); 'zscore' scores (x - mean) / std. The first `window` rows have
+    no full history and score NaN. Returns (expected, score).
+    """
+    if method not in ('mad', 'zscore'):
+        raise ValueError(f"Unknown anomaly scoring method {method!r}")
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    expected = np.full(values.shape, np.nan)
+    scale = np.full(values.shape, np.nan)
+    if n <= window:
+        return expected, scale
+
+    for start in range(window, n, MEDIAN_BLOCK):
+        stop = min(start + MEDIAN_BLOCK, n)
+        # (block, series, window) view: row i holds the `window` points before it
+        windows = sliding_window_view(values[start - window:stop - 1], window, axis=0)
+        std = windows.std(axis=-1, ddof=1)
+        if method == 'zscore':
+            expected[start:stop], scale[start:stop] = windows.mean(axis=-1), std
+        else:
+            median = np.median(windows, axis=-1)
+            mad = np.median(np.abs(windows - median[..., None]), axis=-1) * MAD_SCALE
+            expected[start:stop] = median
+            scale[start:stop] = np.where(mad > 0, mad, std)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = (values - expected) / scale
+    score[~np.isfinite(score)] = np.nan
+    return expected, score
+
+def robust_scores(values):
+    """(x - median) / (1.4826 * MAD) over the whole series."""
+    values = np.asarray(values, dtype='float64')
+    deviation = values - np.median(values)
+    scale = np.median(np.abs(deviation)) * MAD_SCALE or values.std() or 1.0
+    return deviation / scale
+
+class AnomalyDetector:
+    """Outlier points in sales/profit series, per dimension slice."""
+
+    def __init__(self, df, cube=None):
+        self.df = df
+        self.cube = cube
+
+    def _rows(self):
+        """Cube cells when a cube is attached, raw rows otherwise."""
+        return self.cube.frame if self.cube is not None else self.df
+
+    def series_frame(self, dimensions=ANOMALY_DIMENSIONS, metric='sales', freq='M'):
+        """Every slice as one column (dimension, slice) over a shared, gap-free calendar."""
+        rows = self._rows()
+        # One pass over the rows at the finest grain; each dimension set is
+        # then rolled up from that (small) result.
+        finest = list(dict.fromkeys(d for dims in dimensions for d in dims))
+        base = rows.groupby(finest + [pd.Grouper(key='order_date', freq=freq)],
+                            observed=True)[metric].sum()
+        parts = {}
+        for dims in dimensions:
+            if not dims:
+                parts['total'] = base.groupby(level='order_date').sum().to_frame('All')
+                continue
+            wide = base.groupby(list(dims) + ['order_date'], observed=True).sum().unstack(
+                list(range(len(dims))))
+            if len(dims) > 1:
+                wide.columns = [' / '.join(map(str, key)) for key in wide.columns]
+            parts[' x '.join(dims)] = wide
+        wide = pd.concat(parts, axis=1, names=['dimension', 'slice'])
+        full_range = pd.date_range(wide.index.min(), wide.index.max(), freq=freq)
+        return wide.reindex(full_range).fillna(0).rename_axis('order_date')
+
+    @profiled()
+    def detect(self, dimensions=ANOMALY_DIMENSIONS, metric='sales', freq='M', window=None,
+               threshold=DEFAULT_THRESHOLD, method='mad'):
+        """Flagged points of every slice, most extreme first (columns ANOMALY_COLUMNS).
+
+        All slices are scored together on one (time x slice) array, so the
+        cost grows with the number of cells, not with a Python loop per slice.
+        """
+        if self._rows() is None or self._rows().empty:
+            return pd.DataFrame(columns=ANOMALY_COLUMNS)
+        wide = self.series_frame(dimensions, metric, freq)
+        window = window or DEFAULT_WINDOWS.get(freq, 12)
+        values = wide.to_numpy(dtype='float64')
+        expected, score = rolling_scores(values, window, method)
+
+        t, s = np.nonzero(np.abs(np.nan_to_num(score)) >= threshold)
+        flagged = pd.DataFrame({
+            'dimension': wide.columns.get_level_values('dimension')[s],
+            'slice': wide.columns.get_level_values('slice')[s],
+            'order_date': wide.index[t],
+            'value': values[t, s],
+            'expected': expected[t, s],
+            'score': score[t, s]
+        })
+        return flagged.iloc[np.argsort(-np.abs(flagged['score'].to_numpy()), kind='stable')].reset_index(drop=True)
+
+    @profiled()
+    def residual_outliers(self, results, metric='sales', threshold=DEFAULT_THRESHOLD):
+        """Months where a fitted model (e.g. ForecastEngine.fit_sarima) missed by an outlying margin.
+
+        The burn-in residuals of a differenced model are not real errors and
+        are skipped; the rest are scored with a robust z over the whole fit.
+        """
+        burn = max(int(getattr(results, 'loglikelihood_burn', 0)), 0)
+        residuals = pd.Series(results.resid).iloc[burn:]
+        fitted = pd.Series(results.fittedvalues).iloc[burn:]
+        if len(residuals) < 3:
+            return pd.DataFrame(columns=ANOMALY_COLUMNS)
+        score = robust_scores(residuals.to_numpy())
+        mask = np.abs(score) >= threshold
+        flagged = pd.DataFrame({
+            'dimension': 'model',
+            'slice': metric,
+            'order_date': residuals.index[mask],
+            'value': (fitted + residuals).to_numpy()[mask],
+            'expected': fitted.to_numpy()[mask],
+            'score': score[mask]
+        })
+        return flagged.iloc[np.argsort(-np.abs(flagged['score'].to_numpy()), kind='stable')].reset_index(drop=True)
@@ -0,0 +1,182 @@
+import signal
+import warnings
+import numpy as np
+import pandas as pd
+from .anomaly import AnomalyDetector
+from .forecasting import DEFAULT_ORDER, DEFAULT_SEASONAL_ORDER, _raise_fit_timeout
+from .profiling import profiled
+from .utils import logger, available_cpus, process_pool
+
+# Series evaluated by default: the total plus every region and category.
+BACKTEST_DIMENSIONS = [(), ('region',), ('category',)]
+BACKTEST_MODELS = ('trend', 'sarima')
+BACKTEST_COLUMNS = ['dimension', 'slice', 'model', 'horizon', 'mape', 'rmse', 'origins']
+# Months of history the first origin trains on: two seasonal cycles, the
+# minimum for a seasonally differenced SARIMA to have anything to fit.
+MIN_TRAIN = 24
+
+def rolling_origins(n_points, horizon, n_origins=6, step=1, min_train=MIN_TRAIN):
+    """Forecast origins (training lengths) for rolling-origin evaluation, latest last.
+
+    Each origin trains on the points before it and is scored on the next
+    `horizon` points, so only origins with a full horizon ahead are used.
+    """
+    last = n_points - horizon
+    origins = last - step * np.arange(n_origins)[::-1]
+    return origins[origins >= min_train]
+
+def trend_predictions(x, values, origins, horizon):
+    """Expanding-window linear trend forecasts for every origin and series, in one batched solve.
+
+    The least-squares sums for every training length come from cumulative
+    sums, so all (origin, series) lines are fitted at once without a loop.
+    Returns an (origin, step, series) array.
+    """
+    # Measuring x from its start keeps n * Sxx - Sx^2 from cancelling out
+    x = np.asarray(x, dtype='float64')
+    x = x - x[0]
+    values = np.asarray(values, dtype='float64')
+    zero = np.zeros((1,) + values.shape[1:])
+    sx = np.concatenate([[0.0], np.cumsum(x)])[origins][:, None]
+    sxx = np.concatenate([[0.0], np.cumsum(x * x)])[origins][:, None]
+    sy = np.concatenate([zero, np.cumsum(values, axis=0)])[origins]
+    sxy = np.concatenate([zero, np.cumsum(x[:, None] * values, axis=0)])[origins]
+    n = origins[:, None].astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+    slope = np.nan_to_num(slope)
+    intercept = (sy - slope * sx) / n
+    targets = origins[:, None] + np.arange(horizon)
+    return intercept[:, None, :] + slope[:, None, :] * x[targets][:, :, None]
+
+def error_metrics(actual, predicted):
+    """MAPE (%) and RMSE per forecast step and series from (origin, step, series) arrays.
+
+    Zero actuals are left out of the MAPE.
+    """
+    error = predicted - actual
+    rmse = np.sqrt(np.nanmean(error ** 2, axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ape = np.abs(error) / np.abs(actual)
+    ape[~np.isfinite(ape)] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns are expected
+        mape = np.nanmean(ape, axis=0) * 100
+    return mape, rmse
+
+def _sarima_backtest_worker(train, order, seasonal_order, horizon, timeout=None):
+    """Process-pool entry point: fit one training window and forecast `horizon` steps.
+
+    Returns the forecast array, or None when the fit fails or times out.
+    """
+    use_alarm = timeout is not None and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_fit_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            results = SARIMAX(train, order=order, seasonal_order=seasonal_order).fit(disp=False)
+        return np.asarray(results.forecast(steps=horizon), dtype='float64')
+    except Exception:  # including FitTimeout
+        return None
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+class Backtester:
+    """Rolling-origin accuracy of ForecastEngine's models for many series.
+
+    Every series is cut at several origins; each model is trained on the
+    history before the origin and scored on the months after it, giving
+    MAPE and RMSE per forecast horizon.
+    """
+
+    def __init__(self, df, cube=None):
+        self.df = df
+        self.cube = cube
+
+    def trend_predictions(self, wide, origins, horizon):
+        """Linear trend (ForecastEngine.linear_trend's model) forecasts, all series at once."""
+        ordinals = np.array([d.toordinal() for d in wide.index], dtype='float64')
+        return trend_predictions(ordinals, wide.to_numpy(dtype='float64'), origins, horizon)
+
+    def sarima_predictions(self, wide, origins, horizon, order=DEFAULT_ORDER,
+                           seasonal_order=DEFAULT_SEASONAL_ORDER, max_workers=None, timeout=60):
+        """SARIMA forecasts for every (origin, series), fitted on a process pool.
+
+        Fits that fail or time out leave NaN in their (origin, series) cells.
+        """
+        values = wide.to_numpy(dtype='float64')
+        predicted = np.full((len(origins), horizon, values.shape[1]), np.nan)
+        jobs = [(i, j, values[:origin, j]) for i, origin in enumerate(origins)
+                for j in range(values.shape[1])]
+        workers = max_workers or min(available_cpus(), len(jobs))
+        args = [(train, order, seasonal_order, horizon, timeout) for _, _, train in jobs]
+        if workers > 1:
+            with process_pool(workers) as executor:
+                # Chunks amortise the round trip of the many small fits
+                forecasts = list(executor.map(_sarima_backtest_worker, *zip(*args),
+                                              chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            # SIGALRM only works on the main thread, which may not be ours (Streamlit)
+            forecasts = [_sarima_backtest_worker(*a[:-1]) for a in args]
+        failed = 0
+        for (i, j, _), forecast in zip(jobs, forecasts):
+            if forecast is None:
+                failed += 1
+            else:
+                predicted[i, :, j] = forecast
+        if failed:
+            logger.warning(f"SARIMA backtest: {failed} of {len(jobs)} fits failed")
+        return predicted
+
+    @profiled()
+    def run(self, models=BACKTEST_MODELS, dimensions=BACKTEST_DIMENSIONS, horizon=6, n_origins=6,
+            metric='sales', order=DEFAULT_ORDER, seasonal_order=DEFAULT_SEASONAL_ORDER, max_workers=None):
+        """MAPE/RMSE per (slice, model, horizon) over rolling origins (columns BACKTEST_COLUMNS)."""
+        rows = self.cube.frame if self.cube is not None else self.df
+        if rows is None or rows.empty:
+            return pd.DataFrame(columns=BACKTEST_COLUMNS)
+        # Same gap-free monthly slices the anomaly detector scores, from one grouped pass
+        wide = AnomalyDetector(self.df, self.cube).series_frame(dimensions, metric, 'M')
+        origins = rolling_origins(len(wide), horizon, n_origins)
+        if not len(origins):
+            logger.warning(f"Backtest needs at least {MIN_TRAIN + horizon} months; got {len(wide)}")
+            return pd.DataFrame(columns=BACKTEST_COLUMNS)
+
+        values = wide.to_numpy(dtype='float64')
+        actual = values[origins[:, None] + np.arange(horizon)]
+        frames = []
+        for model in models:
+            if model == 'trend':
+                predicted = self.trend_predictions(wide, origins, horizon)
+            elif model == 'sarima':
+                predicted = self.sarima_predictions(wide, origins, horizon, order, seasonal_order,
+                                                    max_workers)
+            else:
+                raise ValueError(f"Unknown backtest model {model!r}")
+            mape, rmse = error_metrics(actual, predicted)
+            n_slices = values.shape[1]
+            complete = np.isfinite(predicted).all(axis=1).sum(axis=0)
+            frames.append(pd.DataFrame({
+                # Horizon-major, like the (step, series) metric arrays
+                'dimension': np.tile(wide.columns.get_level_values('dimension'), horizon),
+                'slice': np.tile(wide.columns.get_level_values('slice').astype(str), horizon),
+                'model': model,
+                'horizon': np.repeat(np.arange(1, horizon + 1), n_slices),
+                'mape': mape.ravel(),
+                'rmse': rmse.ravel(),
+                'origins': np.tile(complete, horizon)
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def best_models(scores, by='mape'):
+        """Model with the lowest mean error over all horizons, per slice."""
+        if scores.empty:
+            return pd.DataFrame(columns=['dimension', 'slice', 'model', by])
+        means = scores.groupby(['dimension', 'slice', 'model'], sort=False)[by].mean().reset_index()
+        means = means.dropna(subset=[by])
+        return means.loc[means.groupby(['dimension', 'slice'], sort=False)[by].idxmin()].reset_index(drop=True)
@@ -0,0 +1,145 @@
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+from .utils import logger
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def estimate_size(value):
+    """Approximate in-memory size of a cached value, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (int, float, str, bytes, bool, type(None))):
+        return sys.getsizeof(value)
+    # Plotly figures and other objects: their pickle is a fair proxy.
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count and estimated bytes."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def get(self, key, default=None):
+        """Return a cached value and mark it most recently used."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, size=None):
+        """Store a value, evicting least recently used entries to stay within limits.
+
+        Pass size when the caller already knows it (e.g. from a pickle it wrote).
+        """
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key!r}: {size} bytes exceeds the cache limit")
+            return value
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+        # Compute outside the lock so slow misses don't serialise other sessions.
+        return self.put(key, compute())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Counters for a diagnostics panel."""
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+def _freeze(value):
+    """Hashable form of a call argument, or raise TypeError if it has none."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    hash(value)
+    return value
+
+class CachedEngine:
+    """Memoizes the public methods of an engine under a scope key.
+
+    The engine is only constructed on the first cache miss, so a rerun that
+    hits the cache for every call never builds it at all. Calls whose
+    arguments are not hashable (e.g. DataFrames) go straight to the engine.
+    """
+
+    def __init__(self, cache, scope, engine_cls, *args, **kwargs):
+        self._cache = cache
+        self._scope = scope
+        self._engine_cls = engine_cls
+        self._engine_args = args
+        self._engine_kwargs = kwargs
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = self._engine_cls(*self._engine_args, **self._engine_kwargs)
+        return self._engine
+
+    def __getattr__(self, name):
+        attr = getattr(self._engine_cls, name, None)
+        if name.startswith('_') or not callable(attr):
+            return getattr(self.engine, name)
+
+        def cached_call(*args, **kwargs):
+            try:
+                key = (self._scope, self._engine_cls.__name__, name, _freeze(args), _freeze(kwargs))
+            except TypeError:
+                return getattr(self.engine, name)(*args, **kwargs)
+            return self._cache.get_or_compute(key, lambda: getattr(self.engine, name)(*args, **kwargs))
+
+        return cached_call
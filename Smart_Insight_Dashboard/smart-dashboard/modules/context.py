@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+from .anomaly import AnomalyDetector
+from .growth import GrowthEngine
+from .profiling import profiled
+from .rfm import RFMEngine
+
+# Prompt budget for the data digest; ~4 characters per token for English and numbers.
+DEFAULT_TOKEN_BUDGET = 500
+CHARS_PER_TOKEN = 4
+MOVER_DIMENSIONS = ['region', 'category', 'sub_category', 'segment']
+# Months whose sales sit this many robust standard deviations from the median
+OUTLIER_Z = 2.5
+
+# Digest sections per prompt type, most important first; later sections are
+# dropped or shortened when the budget runs out.
+SECTIONS = {
+    'executive_summary': ['headline', 'growth', 'regions', 'movers', 'outliers'],
+    'trend_summary': ['growth', 'quarters', 'outliers', 'movers', 'headline'],
+    'region_performance': ['regions', 'region_movers', 'headline', 'growth'],
+    'anomaly_detection': ['anomalies', 'outliers', 'movers', 'growth', 'headline'],
+    'discount_causality': ['discounts', 'headline', 'regions'],
+    'category_insights': ['categories', 'movers', 'headline'],
+    'growth_explanation': ['growth', 'quarters', 'movers', 'headline'],
+    'root_cause': ['anomalies', 'outliers', 'movers', 'regions', 'growth'],
+    'rfm_segment': ['segments', 'headline']
+}
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def _money(value):
+    """Compact currency: $1.23M, $45.6K, $789."""
+    for threshold, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+        if abs(value) >= threshold:
+            return f"${value / threshold:.3g}{suffix}"
+    return f"${value:.0f}"
+
+def _pct(value):
+    return 'n/a' if value is None or not np.isfinite(value) else f"{value:+.1f}%"
+
+class ContextBuilder:
+    """Token-budgeted digest of the (filtered) data for AI prompts.
+
+    Every section is a few lines computed from grouped aggregates (the cube
+    when attached), so the digest size and cost do not grow with the rows.
+    """
+
+    def __init__(self, df, cube=None, growth=None):
+        self.df = df
+        self.cube = cube
+        # GrowthEngine over the same rows (the app shares its cached one);
+        # created on first use when not given
+        self._growth = growth
+
+    def _growth_engine(self):
+        if self._growth is None:
+            self._growth = GrowthEngine(self.df, self.cube)
+        return self._growth
+
+    def _rows(self):
+        """Cube cells when a cube is attached, raw rows otherwise."""
+        return self.cube.frame if self.cube is not None else self.df
+
+    def _monthly(self, dims=()):
+        """Sales and profit per month (and dims), months as a PeriodIndex level."""
+        rows = self._rows()
+        keys = [rows['order_date'].dt.to_period('M').rename('month')] + [rows[d] for d in dims]
+        return rows[['sales', 'profit']].groupby(keys, observed=True).sum()
+
+    def headline(self):
+        rows = self._rows()
+        sales, profit = rows['sales'].sum(), rows['profit'].sum()
+        orders = rows['orders'].sum() if self.cube is not None else rows['order_id'].nunique()
+        start, end = rows['order_date'].min(), rows['order_date'].max()
+        margin = profit / sales * 100 if sales else float('nan')
+        return [f"Period {start:%Y-%m-%d} to {end:%Y-%m-%d}: sales {_money(sales)}, profit {_money(profit)} "
+                f"(margin {margin:.1f}%), {int(orders):,} orders"]
+
+    def growth(self):
+        latest = self._growth_engine().latest()
+        if pd.isna(latest['month']) or (pd.isna(latest['mom']) and pd.isna(latest['yoy'])):
+            return []
+        return [f"Latest month {latest['month']}: sales {_money(latest['value'])}, MoM {_pct(latest['mom'])}, "
+                f"YoY {_pct(latest['yoy'])}; last 3 months vs previous 3: {_pct(latest['rolling_3'])}"]
+
+    def quarters(self, k=8):
+        monthly = self._monthly()['sales']
+        quarterly = monthly.groupby(monthly.index.asfreq('Q')).sum().iloc[-k:]
+        return ['Quarterly sales: ' + ', '.join(f"{q} {_money(v)}" for q, v in quarterly.items())]
+
+    def outliers(self, k=5):
+        monthly = self._monthly()['sales']
+        if len(monthly) < 6:
+            return []
+        # Robust z-score: median/MAD is not dragged by the outliers themselves
+        deviation = monthly - monthly.median()
+        mad = (deviation.abs().median() * 1.4826) or monthly.std() or 1.0
+        z = deviation / mad
+        flagged = z[z.abs() >= OUTLIER_Z].abs().nlargest(k).index
+        if not len(flagged):
+            return ['No outlier months (|robust z| < 2.5)']
+        return ['Outlier months: ' + ', '.join(
+            f"{m} {_money(monthly[m])} (z {z[m]:+.1f})" for m in sorted(flagged))]
+
+    def anomalies(self, k=8):
+        """Most extreme months per slice against each slice's own trailing year."""
+        flagged = AnomalyDetector(self.df, self.cube).detect(freq='M')
+        if flagged.empty:
+            return []
+        return ['Anomalous slice-months (robust z vs trailing 12 months): ' + ', '.join(
+            f"{row.slice} {row.order_date:%Y-%m} {_money(row.value)} vs {_money(row.expected)} (z {row.score:+.1f})"
+            for row in flagged.head(k).itertuples())]
+
+    def _movers(self, dims, k):
+        """Largest sales changes, last 3 months vs the 3 before, per value of each dim."""
+        lines = []
+        for dim in dims:
+            if dim not in self._rows().columns:
+                continue
+            wide = self._monthly([dim])['sales'].unstack(dim, fill_value=0)
+            if len(wide) < 6:
+                continue
+            recent, prior = wide.iloc[-3:].sum(), wide.iloc[-6:-3].sum()
+            change = (recent - prior).sort_values()
+            pct = (recent / prior.replace(0, np.nan) - 1) * 100
+            picks = pd.concat([change.tail(k)[::-1], change.head(k)])
+            picks = picks[~picks.index.duplicated()]
+            lines.append(f"{dim} movers (last 3 vs prior 3 months): " + ', '.join(
+                f"{name} {_money(delta)} ({_pct(pct[name])})" for name, delta in picks.items() if delta))
+        return lines
+
+    def movers(self, k=3):
+        return self._movers(MOVER_DIMENSIONS, k)
+
+    def region_movers(self, k=3):
+        return self._movers(['region'], k)
+
+    def regions(self):
+        rows = self._rows()
+        stats = rows[['sales', 'profit']].groupby(rows['region'], observed=True).sum()
+        if stats.empty:
+            return []
+        share = stats['sales'] / stats['sales'].sum() * 100
+        margin = stats['profit'] / stats['sales'].replace(0, np.nan) * 100
+        overall = stats['profit'].sum() / stats['sales'].sum() * 100
+        return [f"Regions (share of sales, margin vs overall {overall:.1f}%): " + ', '.join(
+            f"{r} {share[r]:.0f}% / {margin[r] - overall:+.1f}pt" for r in share.sort_values(ascending=False).index)]
+
+    def categories(self):
+        rows = self._rows()
+        stats = rows[['sales', 'profit']].groupby(rows['category'], observed=True).sum()
+        margin = stats['profit'] / stats['sales'].replace(0, np.nan) * 100
+        return ['Categories: ' + ', '.join(f"{c} {_money(stats.at[c, 'sales'])} (margin {margin[c]:.1f}%)"
+                                           for c in stats['sales'].sort_values(ascending=False).index)]
+
+    def discounts(self):
+        # Discounts are per order line, so this section needs the raw rows.
+        df = self.df
+        if df is None or 'discount' not in df.columns or df.empty:
+            return []
+        stats = df[['sales', 'profit']].groupby(df['discount'].round(2)).agg(['sum', 'size'])
+        margin = stats[('profit', 'sum')] / stats[('sales', 'sum')].replace(0, np.nan) * 100
+        return ['Margin by discount level: ' + ', '.join(
+            f"{d:.0%} {margin[d]:.1f}% ({stats.at[d, ('sales', 'size')]:,} lines)" for d in stats.index),
+            f"Correlation discount/profit: {df['discount'].corr(df['profit']):.2f}"]
+
+    def segments(self):
+        # Customers are not a cube dimension, so this section needs the raw rows.
+        df = self.df
+        if df is None or 'customer_id' not in df.columns or df.empty:
+            return []
+        summary = RFMEngine(df).segment_summary()
+        return ['Customer segments (RFM quintiles; share of customers, avg days since last order, '
+                'orders, spend): ' + ', '.join(
+                    f"{row.segment} {row.share:.0%} / {row.recency_days:.0f}d / {row.frequency:.1f} / "
+                    f"{_money(row.monetary)}" for row in summary.itertuples())]
+
+    @profiled()
+    def build(self, prompt_type='executive_summary', token_budget=DEFAULT_TOKEN_BUDGET):
+        """Digest for a prompt type that fits in token_budget (approximately)."""
+        lines, budget = [], token_budget * CHARS_PER_TOKEN
+        for section in SECTIONS.get(prompt_type, SECTIONS['executive_summary']):
+            for line in getattr(self, section)():
+                remaining = budget - sum(len(l) + 1 for l in lines)
+                if len(line) + 1 > remaining:
+                    # Cut long lists at an item boundary rather than mid-number
+                    cut = line[:max(remaining - 4, 0)].rsplit(', ', 1)[0]
+                    if len(cut) > 40:
+                        lines.append(cut + ' ...')
+                    return '\n'.join(lines)
+                lines.append(line)
+        return '\n'.join(lines)
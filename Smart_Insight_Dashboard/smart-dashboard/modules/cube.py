@@ -0,0 +1,149 @@
+import pandas as pd
+import numpy as np
+from .utils import concat_rows
+
+CUBE_DIMENSIONS = ['region', 'category', 'sub_category', 'segment', 'ship_mode']
+CUBE_MEASURES = ['sales', 'profit', 'quantity', 'orders', 'lines']
+
+class SalesCube:
+    """Day x region x category x sub_category x segment x ship_mode aggregates.
+
+    `frame` keeps the raw column names (order_date, region, ..., sales, profit,
+    quantity) so engines can run the same groupby on it as on the raw rows.
+    `orders` counts each order once, on its first line on its earliest day,
+    so it stays additive under any roll-up and grand totals match the
+    distinct order ids; `lines` is the raw row count.
+
+    `repeats` lists the later days of orders spanning several days (the
+    order's first line on that day and the previous day it appeared), so a
+    date slice can count an order that started before the range on its
+    first line inside it, as filtering the raw rows would.
+    """
+
+    def __init__(self, frame, repeats=None):
+        self.frame = frame
+        self.repeats = repeats
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build the cube from raw order lines in one grouped pass."""
+        dims = [d for d in CUBE_DIMENSIONS if d in df.columns]
+        day = df['order_date'].dt.normalize()
+        lines = pd.DataFrame({'order_id': df['order_id'], 'order_date': day, **{d: df[d] for d in dims}})
+        if day.is_monotonic_increasing:
+            by_day = None
+        else:
+            by_day = np.argsort(day.to_numpy(), kind='stable')
+            lines = lines.iloc[by_day]
+
+        # An order whose lines span several days counts on its first day only
+        ids = lines['order_id']
+        codes = ids.cat.codes.to_numpy() if isinstance(ids.dtype, pd.CategoricalDtype) else pd.factorize(ids)[0]
+        first_of_order = np.unique(codes, return_index=True)[1]
+        first_line = np.zeros(len(lines), dtype=bool)
+        first_line[first_of_order] = True
+
+        # Lines after their order's first day (usually few) become repeats
+        first_day = np.zeros(codes.max() + 1 if len(codes) else 0, dtype='datetime64[ns]')
+        first_day[codes[first_of_order]] = lines['order_date'].to_numpy()[first_of_order]
+        later = lines['order_date'].to_numpy() > first_day[codes]
+        order_days = lines[later]
+        order_days = order_days[~order_days[['order_id', 'order_date']].duplicated()]
+        previous = order_days.groupby('order_id', observed=True, sort=False)['order_date'].shift()
+        previous = previous.fillna(pd.Series(first_day[codes[later]], index=lines.index[later]))
+        repeats = order_days.assign(prev_day=previous).reset_index(drop=True)
+        if by_day is not None:
+            first_line[by_day] = first_line.copy()
+
+        measures = df[['sales', 'profit']].assign(
+            quantity=df['quantity'] if 'quantity' in df.columns else 0,
+            orders=first_line.astype('int32'),
+            lines=np.int32(1)
+        )
+        keys = [day.rename('order_date')] + [df[d] for d in dims]
+        frame = measures.groupby(keys, observed=True, sort=True).sum().reset_index()
+        return cls(frame, repeats)
+
+    @classmethod
+    def get_or_publish(cls, store, source, fingerprint, rows):
+        """The cube of rows() from a SharedFrameStore, built and published once if missing."""
+        built = []
+
+        def build(part):
+            if not built:
+                built.append(cls.from_frame(rows()))
+            return getattr(built[0], part)
+
+        frame = store.get_or_publish('cube', source, fingerprint, lambda: build('frame'))
+        repeats = store.get_or_publish('cube_repeats', source, fingerprint, lambda: build('repeats'))
+        return cls(frame, repeats)
+
+    def append(self, df, existing=None):
+        """New cube with the raw rows of df added.
+
+        Only cells from the first affected day on are re-aggregated; earlier
+        cells are carried over as they are. When df may add lines to orders
+        the cube already holds, pass the rows it was built from as existing:
+        those orders are then re-counted from all of their lines.
+        """
+        keys = [c for c in self.frame.columns if c not in CUBE_MEASURES]
+        parts, replaced = [], None
+        if existing is not None:
+            old = existing.loc[existing['order_id'].isin(df['order_id']), list(df.columns)]
+            if len(old):
+                removed = SalesCube.from_frame(old).frame
+                parts.append(removed.assign(**{m: -removed[m] for m in CUBE_MEASURES}))
+                replaced = old['order_id'].unique()
+                df = concat_rows([old, df])
+        added = SalesCube.from_frame(df)
+        if added.frame.empty:
+            return self
+        parts.append(added.frame)
+
+        first_day = min(part['order_date'].iloc[0] for part in parts)
+        start = self.frame['order_date'].to_numpy().searchsorted(np.datetime64(first_day))
+        head, tail = self.frame.iloc[:start], self.frame.iloc[start:]
+        merged = concat_rows([tail] + parts).groupby(keys, observed=True, sort=True).sum().reset_index()
+        merged = merged[merged['lines'] != 0]
+
+        repeats = self.repeats
+        if repeats is not None:
+            if replaced is not None:
+                repeats = repeats[~repeats['order_id'].isin(replaced)]
+            repeats = concat_rows([repeats, added.repeats]).sort_values(
+                'order_date', kind='stable', ignore_index=True)
+        return SalesCube(concat_rows([head, merged]), repeats)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def slice(self, start_date, end_date):
+        """Cells with order_date in [start_date, end_date].
+
+        A positional view of the frame, except that orders which started
+        before start_date are added to the cell of their first line in range.
+        """
+        start = np.datetime64(pd.Timestamp(start_date).normalize())
+        end = np.datetime64(pd.Timestamp(end_date).normalize())
+        days = self.frame['order_date'].to_numpy()
+        frame = self.frame.iloc[days.searchsorted(start, side='left'):days.searchsorted(end, side='right')]
+        if self.repeats is None:
+            return SalesCube(frame)
+
+        repeat_days = self.repeats['order_date'].to_numpy()
+        repeats = self.repeats.iloc[repeat_days.searchsorted(start, side='left'):
+                                    repeat_days.searchsorted(end, side='right')]
+        carried = repeats[repeats['prev_day'].to_numpy() < start]
+        if len(carried):
+            keys = [c for c in frame.columns if c not in CUBE_MEASURES]
+            counts = carried.groupby(keys, observed=True).size()
+            cells = (pd.MultiIndex.from_frame(frame[keys]) if len(keys) > 1
+                     else pd.Index(frame[keys[0]])).get_indexer(counts.index)
+            orders = frame['orders'].to_numpy().copy()
+            np.add.at(orders, cells, counts.to_numpy().astype(orders.dtype))
+            frame = frame.assign(orders=orders)
+        return SalesCube(frame, repeats)
+
+    def totals(self):
+        """Grand totals of every measure."""
+        return self.frame[CUBE_MEASURES].sum()
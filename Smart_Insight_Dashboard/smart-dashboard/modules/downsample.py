@@ -0,0 +1,114 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Most points a chart sends to the browser; Plotly stays interactive well below this.
+MAX_SCATTER_POINTS = 5000
+# Points per line trace: a few per horizontal pixel of a wide chart is all that shows.
+MAX_LINE_POINTS = 2000
+DEFAULT_PAGE_SIZE = 1000
+
+def stratified_sample(df, by, n, seed=0):
+    """At most about n rows, sampled per value of `by` in proportion to its size.
+
+    Every group keeps at least one row, so small categories stay visible.
+    Rows come back in their original order.
+    """
+    if len(df) <= n:
+        return df
+    codes, _ = pd.factorize(df[by], use_na_sentinel=False)
+    counts = np.bincount(codes)
+    quotas = np.minimum(counts, np.maximum(1, np.floor(n * counts / len(df)).astype(int)))
+    rng = np.random.default_rng(seed)
+    # Few groups (categories, segments): one pass per group is cheaper than sorting all rows.
+    keep = [rng.choice(np.flatnonzero(codes == g), quota, replace=False)
+            for g, quota in enumerate(quotas)]
+    return df.iloc[np.sort(np.concatenate(keep))]
+
+def density_grid(df, x, y, bins=60):
+    """2D histogram of two columns as (counts[y_bin, x_bin], x_centers, y_centers).
+
+    Columns with fewer distinct values than bins (e.g. discount levels) get one
+    bin per value, so the grid does not smear them across empty bins.
+    """
+    def edges(values):
+        distinct = np.unique(values)
+        if len(distinct) <= bins:
+            mids = (distinct[1:] + distinct[:-1]) / 2
+            step = (distinct[-1] - distinct[0]) / max(len(distinct) - 1, 1) or 1
+            return np.concatenate([[distinct[0] - step / 2], mids, [distinct[-1] + step / 2]])
+        return np.linspace(distinct[0], distinct[-1], bins + 1)
+
+    xs, ys = df[x].to_numpy(dtype='float64'), df[y].to_numpy(dtype='float64')
+    x_edges, y_edges = edges(xs), edges(ys)
+    counts, _, _ = np.histogram2d(xs, ys, bins=[x_edges, y_edges])
+    return counts.T, (x_edges[1:] + x_edges[:-1]) / 2, (y_edges[1:] + y_edges[:-1]) / 2
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype('int64').astype('float64')
+    return values.astype('float64')
+
+def lttb_indices(x, y, n_out):
+    """Positions kept by largest-triangle-three-buckets, first and last always included.
+
+    Each bucket keeps the point forming the largest triangle with the previous
+    pick and the next bucket's mean, which preserves peaks and dips. The loop
+    runs once per output point; the work inside each bucket is vectorized.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    picked = np.empty(n_out, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(area.argmax())
+        picked[i + 1] = prev
+    return picked
+
+def minmax_indices(y, n_out):
+    """Positions of the minimum and maximum of each of n_out / 2 equal buckets, in order."""
+    n = len(y)
+    if n <= n_out or n_out < 2:
+        return np.arange(n)
+    y = _as_float(y)
+    n_buckets = n_out // 2
+    bucket = np.arange(n) * n_buckets // n  # non-decreasing, so buckets are contiguous runs
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+    counts = np.diff(np.append(starts, n))
+    picks = []
+    for extreme in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == np.repeat(extreme.reduceat(y, starts), counts))
+        _, first = np.unique(bucket[hits], return_index=True)
+        picks.append(hits[first])
+    return np.unique(np.concatenate(picks))
+
+def downsample_frame(df, x, y, max_points=MAX_LINE_POINTS, method='lttb'):
+    """Rows of a line-chart frame reduced to at most max_points; `x` may be a column or 'index'."""
+    if max_points is None or len(df) <= max_points:
+        return df
+    xs = df.index.to_numpy() if x == 'index' else df[x].to_numpy()
+    if method == 'minmax':
+        positions = minmax_indices(df[y].to_numpy(), max_points)
+    elif method == 'lttb':
+        positions = lttb_indices(xs, df[y].to_numpy(), max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method {method!r}")
+    return df.iloc[positions]
+
+def page_count(n_rows, page_size=DEFAULT_PAGE_SIZE):
+    return max(1, math.ceil(n_rows / page_size))
+
+def page_frame(df, page, page_size=DEFAULT_PAGE_SIZE):
+    """Rows of one 1-based page as a positional view; out-of-range pages are clamped."""
+    page = min(max(int(page), 1), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
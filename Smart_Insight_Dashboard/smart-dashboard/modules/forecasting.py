@@ -1,57 +1,359 @@
+import itertools
+import math
+import signal
+import threading
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from sklearn.linear_model import LinearRegression
-from .utils import logger
+from .model_store import default_model_store, series_fingerprint
+from .utils import logger, available_cpus, process_pool
+from .profiling import profiled
+
+# statsmodels (SARIMAX) is imported inside the functions that fit models: it
+# costs about a second of import time, which every app start would pay even
+# if nobody opens the Forecasting page.
+
+DEFAULT_ORDER = (1, 1, 1)
+DEFAULT_SEASONAL_ORDER = (1, 1, 1, 12)
+
+# Bounded search space for order='auto': (p, d, q) x (P, D, Q, s).
+ORDER_GRID = {
+    'p': (0, 1, 2), 'd': (1,), 'q': (0, 1, 2),
+    'P': (0, 1), 'D': (1,), 'Q': (0, 1), 's': (12,)
+}
+# Successive halving: every candidate gets a cheap fit capped at the first
+# iteration budget, and only the best 1/ORDER_SEARCH_ETA of each round move
+# on to the next, larger budget.
+ORDER_SEARCH_BUDGETS = (10, 50)
+ORDER_SEARCH_ETA = 3
+
+# Slices forecast by batch_forecast by default.
+BATCH_DIMENSIONS = [('region',), ('category',), ('region', 'category')]
+BATCH_COLUMNS = ['dimension', 'slice', 'predicted', 'lower_ci', 'upper_ci']
+
+# Background fits: one shared worker pool, and at most one in-flight fit per
+# model key no matter how many sessions ask for it.
+_fit_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sarima-fit')
+_pending_fits = {}
+_pending_lock = threading.Lock()
+
+def _finish_fit(key, future):
+    """Done-callback for background fits: forget the in-flight entry and log failures."""
+    with _pending_lock:
+        _pending_fits.pop(key, None)
+    if future.exception() is not None:
+        logger.error(f"Background SARIMA fit {key} failed: {future.exception()}")
+
+class FitTimeout(Exception):
+    """A single series fit exceeded its time budget."""
+
+def _raise_fit_timeout(signum, frame):
+    raise FitTimeout()
+
+def _fit_series_worker(series, order, seasonal_order, periods, timeout=None):
+    """Process-pool entry point: fit one series and forecast it.
+
+    The timeout is enforced inside the worker with SIGALRM where available,
+    so an overrunning fit frees its worker for the next series.
+    """
+    use_alarm = timeout is not None and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_fit_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        results = SARIMAX(series, order=order, seasonal_order=seasonal_order).fit(disp=False)
+        return results, ForecastEngine.forecast_from_results(results, periods)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def fit_trends(x, values):
+    """Least-squares line through each column of values against the shared x, in closed form.
+
+    Every column is fitted by the same few array operations, so many series
+    cost about as much as one. Returns (slope, intercept), one per column
+    (scalars for a 1-D values).
+    """
+    x = np.asarray(x, dtype='float64')
+    values = np.asarray(values, dtype='float64')
+    # Centering keeps large x (e.g. date ordinals) from losing precision
+    dx = x - x.mean()
+    y_mean = values.mean(axis=0)
+    spread = dx @ dx
+    slope = dx @ (values - y_mean) / spread if spread else np.zeros_like(y_mean)
+    return slope, y_mean - slope * x.mean()
+
+def order_candidates(grid=ORDER_GRID):
+    """Every (order, seasonal_order) pair in a grid."""
+    return [((p, d, q), (P, D, Q, m)) for p, d, q, P, D, Q, m in itertools.product(
+        grid['p'], grid['d'], grid['q'], grid['P'], grid['D'], grid['Q'], grid['s'])]
+
+def _score_order_worker(series, order, seasonal_order, criterion, holdout, maxiter):
+    """Fit one candidate within an iteration budget; lower scores are better."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            if criterion == 'holdout':
+                train, test = series.iloc[:-holdout], series.iloc[-holdout:]
+                results = SARIMAX(train, order=order, seasonal_order=seasonal_order).fit(
+                    disp=False, maxiter=maxiter)
+                error = results.forecast(steps=holdout).to_numpy() - test.to_numpy()
+                score = float(np.sqrt(np.mean(error ** 2)))
+            else:
+                results = SARIMAX(series, order=order, seasonal_order=seasonal_order).fit(
+                    disp=False, maxiter=maxiter)
+                score = float(results.aic)
+        except Exception:
+            return math.inf
+    return score if np.isfinite(score) else math.inf
 
 class ForecastEngine:
-    def __init__(self, df):
+    def __init__(self, df, cube=None, model_store=None):
         self.df = df
+        self.cube = cube
+        self.model_store = model_store or default_model_store()
         
     def prepare_data(self, metric='sales', freq='M'):
         """Prepare time series data."""
-        ts_data = self.df.groupby(pd.Grouper(key='order_date', freq=freq))[metric].sum().reset_index()
+        rows = self.cube.frame if self.cube is not None else self.df
+        ts_data = rows.groupby(pd.Grouper(key='order_date', freq=freq))[metric].sum().reset_index()
         ts_data = ts_data.set_index('order_date')
         return ts_data
         
-    def sarima_forecast(self, periods=12):
-        """Generate SARIMA forecast."""
+    def _model_key(self, data, metric, order, seasonal_order):
+        return self.model_store.make_key(series_fingerprint(data[metric]), metric, 'sarima',
+                                         order, seasonal_order)
+
+    def _order_key(self, series, metric, criterion='aic', grid=ORDER_GRID, holdout=6):
+        """Model store key of the order chosen for a series by one search setup."""
+        grid_id = series_fingerprint(pd.Series([str(sorted(grid.items())), criterion, holdout]))
+        return self.model_store.make_key(series_fingerprint(series), metric, 'order', grid_id)
+
+    @profiled()
+    def select_order(self, metric='sales', criterion='aic', grid=ORDER_GRID, holdout=6,
+                     max_workers=None):
+        """Pick SARIMA orders for the series by AIC or holdout RMSE over a bounded grid.
+
+        Candidates are scored in parallel with successive halving, so clearly
+        worse orders are dropped after a cheap, iteration-capped fit. The winner
+        is remembered per series, so later calls skip the search.
+        """
+        series = self.prepare_data(metric)[metric]
+        key = self._order_key(series, metric, criterion, grid, holdout)
+        cached = self.model_store.get_order(key)
+        if cached is not None:
+            return cached
+
+        candidates = order_candidates(grid)
+        best = None
+        workers = max_workers or min(available_cpus(), len(candidates))
+        executor = process_pool(workers) if workers > 1 else None
         try:
-            data = self.prepare_data()
-            
-            # Simple SARIMA configuration (auto-arima would be better but keeping it simple/fast)
-            model = SARIMAX(data, order=(1, 1, 1), seasonal_order=(1, 1, 1, 12))
-            results = model.fit(disp=False)
-            
-            forecast = results.get_forecast(steps=periods)
-            forecast_df = forecast.conf_int()
-            forecast_df['predicted'] = forecast.predicted_mean
-            forecast_df.columns = ['lower_ci', 'upper_ci', 'predicted']
-            
-            return forecast_df
+            for maxiter in ORDER_SEARCH_BUDGETS:
+                args = [(series, order, seasonal, criterion, holdout, maxiter)
+                        for order, seasonal in candidates]
+                if executor is None:
+                    scores = [_score_order_worker(*a) for a in args]
+                else:
+                    scores = list(executor.map(_score_order_worker, *zip(*args)))
+                ranked = sorted((score, i) for i, score in enumerate(scores) if score < math.inf)
+                if not ranked:
+                    # Keep the previous round's winner rather than discarding it
+                    if best is not None:
+                        logger.warning(f"Order search ({criterion}, maxiter={maxiter}): no candidate "
+                                       f"fitted; keeping the previous round's best")
+                    break
+                keep = max(1, math.ceil(len(ranked) / ORDER_SEARCH_ETA))
+                candidates = [candidates[i] for _, i in ranked[:keep]]
+                best = candidates[0]
+                logger.info(f"Order search ({criterion}, maxiter={maxiter}): "
+                            f"kept {len(candidates)} of {len(scores)}, best {ranked[0][0]:.2f}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if best is None:
+            logger.warning(f"No SARIMA order in the grid fitted {metric}; using the default order")
+            return DEFAULT_ORDER, DEFAULT_SEASONAL_ORDER
+        order, seasonal_order = best
+        self.model_store.put_order(key, order, seasonal_order)
+        return order, seasonal_order
+
+    @profiled()
+    def fit_sarima(self, metric='sales', order=DEFAULT_ORDER, seasonal_order=DEFAULT_SEASONAL_ORDER):
+        """Fitted SARIMA results for the series, reused from the model store when cached.
+
+        Pass order='auto' to use the orders chosen by select_order.
+        """
+        if order == 'auto':
+            order, seasonal_order = self.select_order(metric)
+        data = self.prepare_data(metric)
+        key = self._model_key(data, metric, order, seasonal_order)
+        results = self.model_store.get(key)
+        if results is None:
+            from statsmodels.tsa.statespace.sarimax import SARIMAX
+            model = SARIMAX(data[metric], order=order, seasonal_order=seasonal_order)
+            results = self.model_store.put(key, model.fit(disp=False))
+        return results
+
+    def fit_sarima_async(self, metric='sales', order=DEFAULT_ORDER, seasonal_order=DEFAULT_SEASONAL_ORDER):
+        """Future for fit_sarima; resolved immediately when the model is already cached.
+
+        For order='auto' an order remembered by select_order is looked up
+        here, so only a missing search or fit goes to the background.
+        """
+        data = self.prepare_data(metric)
+        if order == 'auto':
+            cached = self.model_store.get_order(self._order_key(data[metric], metric))
+            if cached is not None:
+                order, seasonal_order = cached
+        # While order is still 'auto' the key stands for the search itself;
+        # the fit for the chosen orders is cached under its own key by fit_sarima.
+        key = self._model_key(data, metric, order, seasonal_order)
+        results = None if order == 'auto' else self.model_store.get(key)
+        if results is not None:
+            future = Future()
+            future.set_result(results)
+            return future
+
+        with _pending_lock:
+            future = _pending_fits.get(key)
+            if future is None:
+                future = _fit_executor.submit(self.fit_sarima, metric, order, seasonal_order)
+                _pending_fits[key] = future
+                future.add_done_callback(lambda f: _finish_fit(key, f))
+        return future
+
+    @staticmethod
+    def forecast_from_results(results, periods=12):
+        """Forecast frame (lower_ci, upper_ci, predicted) for any horizon from fitted results."""
+        forecast = results.get_forecast(steps=periods)
+        forecast_df = forecast.conf_int()
+        forecast_df['predicted'] = forecast.predicted_mean
+        forecast_df.columns = ['lower_ci', 'upper_ci', 'predicted']
+        return forecast_df
+
+    @profiled()
+    def sarima_forecast(self, periods=12, metric='sales', order=DEFAULT_ORDER,
+                        seasonal_order=DEFAULT_SEASONAL_ORDER):
+        """Generate SARIMA forecast; order='auto' searches ORDER_GRID for the orders."""
+        try:
+            # The fit only depends on the series, so every horizon reuses it.
+            results = self.fit_sarima(metric, order, seasonal_order)
+            return self.forecast_from_results(results, periods)
         except Exception as e:
             logger.error(f"SARIMA forecast failed: {e}")
             return pd.DataFrame()
 
+    def slice_series(self, dims, metric='sales', freq='M'):
+        """One column per value combination of `dims`, over a shared calendar, in one groupby."""
+        rows = self.cube.frame if self.cube is not None else self.df
+        grouped = rows.groupby(list(dims) + [pd.Grouper(key='order_date', freq=freq)],
+                               observed=True)[metric].sum()
+        wide = grouped.unstack(list(range(len(dims))))
+        # Months with no orders in a slice are zero sales, not missing data
+        full_range = pd.date_range(wide.index.min(), wide.index.max(), freq=freq)
+        return wide.reindex(full_range, fill_value=0).fillna(0).rename_axis('order_date')
+
+    @profiled()
+    def batch_forecast(self, dimensions=BATCH_DIMENSIONS, periods=12, metric='sales',
+                       order=DEFAULT_ORDER, seasonal_order=DEFAULT_SEASONAL_ORDER,
+                       max_workers=None, timeout=120):
+        """SARIMA forecasts for every slice of every dimension set, fitted on a process pool.
+
+        Returns one tidy frame indexed by order_date with dimension/slice labels, the
+        dimension columns and predicted/lower_ci/upper_ci; a slice's rows can be passed
+        straight to Visualizer.plot_forecast. Failed or timed-out slices are left out
+        and reported in ``result.attrs['failures']`` (slice label -> error).
+        """
+        jobs = []
+        for dims in dimensions:
+            wide = self.slice_series(dims, metric)
+            for values in wide.columns:
+                values = values if isinstance(values, tuple) else (values,)
+                series = wide[values if len(values) > 1 else values[0]].rename(metric)
+                key = self.model_store.make_key(series_fingerprint(series), metric, 'sarima',
+                                                order, seasonal_order)
+                labels = dict(zip(dims, (str(v) for v in values)))
+                jobs.append((key, series, ' x '.join(dims), ' / '.join(labels.values()), labels))
+
+        frames, failures, pending, to_fit = [], {}, {}, []
+        for job in jobs:
+            key, _, dimension, label, labels = job
+            results = self.model_store.get(key)
+            if results is None:
+                to_fit.append(job)
+            else:
+                frames.append(self._tidy(self.forecast_from_results(results, periods),
+                                         dimension, label, labels))
+
+        if to_fit:
+            workers = max_workers or min(available_cpus(), len(to_fit))
+            executor = process_pool(workers)
+            try:
+                for job in to_fit:
+                    future = executor.submit(_fit_series_worker, job[1], order, seasonal_order,
+                                             periods, timeout)
+                    pending[future] = job
+                # Backstop for workers that cannot be interrupted: every series
+                # gets its own budget, spread over the pool.
+                deadline = None if timeout is None else timeout * (math.ceil(len(to_fit) / workers) + 1)
+                done, not_done = wait(pending, timeout=deadline)
+                for future in not_done:
+                    future.cancel()
+                    failures[pending[future][3]] = 'timeout'
+                for future in done:
+                    key, _, dimension, label, labels = pending[future]
+                    try:
+                        results, forecast_df = future.result()
+                    except FitTimeout:
+                        failures[label] = 'timeout'
+                        continue
+                    except Exception as e:
+                        failures[label] = f"{type(e).__name__}: {e}"
+                        continue
+                    self.model_store.put(key, results)
+                    frames.append(self._tidy(forecast_df, dimension, label, labels))
+            finally:
+                # Don't block on a worker stuck past its deadline; it exits on its own.
+                executor.shutdown(wait=not failures, cancel_futures=True)
+
+        for label, error in failures.items():
+            logger.warning(f"Batch forecast for {label} failed: {error}")
+
+        dim_columns = list(dict.fromkeys(d for dims in dimensions for d in dims))
+        if frames:
+            batch = pd.concat(frames)
+        else:
+            batch = pd.DataFrame(columns=BATCH_COLUMNS + dim_columns,
+                                 index=pd.DatetimeIndex([], name='order_date'))
+        batch = batch.reindex(columns=BATCH_COLUMNS + dim_columns)
+        batch.attrs['failures'] = failures
+        return batch
+
+    @staticmethod
+    def _tidy(forecast_df, dimension, label, labels):
+        """Label a single-series forecast for the batch frame."""
+        return forecast_df.rename_axis('order_date').assign(dimension=dimension, slice=label, **labels)
+
+    @profiled()
     def linear_trend(self, periods=12):
         """Generate Linear Regression trend."""
         try:
             data = self.prepare_data()
             data = data.reset_index()
-            data['date_ordinal'] = data['order_date'].map(pd.Timestamp.toordinal)
-            
-            X = data[['date_ordinal']]
-            y = data['sales']
-            
-            model = LinearRegression()
-            model.fit(X, y)
+            ordinals = data['order_date'].map(pd.Timestamp.toordinal)
+            slope, intercept = fit_trends(ordinals, data['sales'])
             
             # Future dates
             last_date = data['order_date'].max()
             future_dates = [last_date + pd.DateOffset(months=x) for x in range(1, periods + 1)]
-            future_ordinals = [[d.toordinal()] for d in future_dates]
+            future_ordinals = np.array([d.toordinal() for d in future_dates], dtype='float64')
             
-            predictions = model.predict(future_ordinals)
+            predictions = intercept + slope * future_ordinals
             
             return pd.DataFrame({
                 'order_date': future_dates,
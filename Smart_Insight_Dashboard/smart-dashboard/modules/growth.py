@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from .anomaly import AnomalyDetector
+from .profiling import profiled
+
+# Slices with a growth timeline by default: the total plus every region, category and segment.
+GROWTH_DIMENSIONS = [(), ('region',), ('category',), ('segment',)]
+# Calendar offset in months for each point-to-point rate: a month against the
+# previous month, the same month a quarter earlier and a year earlier.
+GROWTH_LAGS = {'mom': 1, 'qoq': 3, 'yoy': 12}
+# Rolling rates: the sum of the last n months against the n months before.
+ROLLING_WINDOWS = (3, 12)
+GROWTH_LABELS = {'mom': 'MoM', 'qoq': 'QoQ', 'yoy': 'YoY',
+                 **{f"rolling_{n}": f"Last {n} vs prior {n} months" for n in ROLLING_WINDOWS}}
+GROWTH_COLUMNS = (['dimension', 'slice', 'month', 'value'] + list(GROWTH_LAGS)
+                  + [f"rolling_{n}" for n in ROLLING_WINDOWS])
+
+def _shift(values, lag):
+    """values moved down `lag` rows, NaN above."""
+    shifted = np.full(values.shape, np.nan)
+    if lag < len(values):
+        shifted[lag:] = values[:len(values) - lag]
+    return shifted
+
+def _pct_change(current, base):
+    """Percent change, NaN where the base is missing or zero."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = (current / base - 1) * 100
+    pct[~np.isfinite(pct)] = np.nan
+    return pct
+
+def growth_rates(values, lags=GROWTH_LAGS, windows=ROLLING_WINDOWS):
+    """Percent growth of every point of a (month, series) array, for all series at once.
+
+    Rows must be consecutive calendar months (fill gaps with 0), so a lag of
+    12 rows is always the same month of the previous year. Returns
+    {name: array shaped like values}.
+    """
+    values = np.asarray(values, dtype='float64')
+    rates = {name: _pct_change(values, _shift(values, lag)) for name, lag in lags.items()}
+    cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    for n in windows:
+        trailing = np.full(values.shape, np.nan)
+        if n <= len(values):
+            trailing[n - 1:] = cumulative[n:] - cumulative[:len(cumulative) - n]
+        rates[f"rolling_{n}"] = _pct_change(trailing, _shift(trailing, n))
+    return rates
+
+def monthly_growth(monthly):
+    """Growth rates of the last month of a monthly Series (PeriodIndex), gaps counted as 0."""
+    if monthly.empty:
+        return {name: np.nan for name in GROWTH_COLUMNS[4:]}
+    months = pd.period_range(monthly.index.min(), monthly.index.max(), freq='M')
+    values = monthly.reindex(months, fill_value=0).to_numpy(dtype='float64')
+    return {name: rate[-1] for name, rate in growth_rates(values).items()}
+
+class GrowthEngine:
+    """Calendar-aligned MoM, QoQ, YoY and rolling growth for every month and slice.
+
+    All slices come from one grouped pass (AnomalyDetector.series_frame) and
+    all rates from whole-array shifts, so a missing month is a zero, never a
+    silently skipped position. Timelines are kept per instance; the app
+    additionally caches them per date range.
+    """
+
+    def __init__(self, df, cube=None):
+        self.df = df
+        self.cube = cube
+        self._timelines = {}
+
+    def _rows(self):
+        """Cube cells when a cube is attached, raw rows otherwise."""
+        return self.cube.frame if self.cube is not None else self.df
+
+    @profiled()
+    def timeline(self, dimensions=GROWTH_DIMENSIONS, metric='sales'):
+        """One row per (slice, month) with the value and every rate in percent (GROWTH_COLUMNS).
+
+        Rates are NaN where there is no earlier period to compare with or it is zero.
+        """
+        key = (tuple(tuple(dims) for dims in dimensions), metric)
+        if key in self._timelines:
+            return self._timelines[key]
+        rows = self._rows()
+        if rows is None or rows.empty:
+            return pd.DataFrame(columns=GROWTH_COLUMNS)
+        wide = AnomalyDetector(self.df, self.cube).series_frame(dimensions, metric, 'M')
+        values = wide.to_numpy(dtype='float64')
+        rates = growth_rates(values)
+
+        # Slice-major: every month of the first slice, then the next slice
+        n_months, n_slices = values.shape
+        timeline = pd.DataFrame({
+            'dimension': np.repeat(wide.columns.get_level_values('dimension'), n_months),
+            'slice': np.repeat(wide.columns.get_level_values('slice').astype(str), n_months),
+            'month': wide.index.to_period('M')[np.tile(np.arange(n_months), n_slices)],
+            'value': values.T.ravel(),
+            **{name: rate.T.ravel() for name, rate in rates.items()}
+        })
+        self._timelines[key] = timeline
+        return timeline
+
+    def latest(self, dimension='total', slice_label='All', metric='sales'):
+        """Rates for the last month of one slice, e.g. latest('region', 'East')."""
+        dimensions = [()] if dimension == 'total' else [tuple(dimension.split(' x '))]
+        timeline = self.timeline(dimensions, metric)
+        rows = timeline[timeline['slice'] == slice_label]
+        if rows.empty:
+            return {name: np.nan for name in GROWTH_COLUMNS[2:]}
+        return rows.iloc[-1][GROWTH_COLUMNS[2:]].to_dict()
+
+    def slice_latest(self, dimensions=GROWTH_DIMENSIONS, metric='sales'):
+        """Last month's row of every slice."""
+        timeline = self.timeline(dimensions, metric)
+        return timeline.groupby(['dimension', 'slice'], sort=False).tail(1).reset_index(drop=True)
@@ -1,15 +1,40 @@
 import pandas as pd
 import numpy as np
+from .growth import GrowthEngine, monthly_growth
+from .profiling import profiled
 
 class KPIEngine:
-    def __init__(self, df):
+    def __init__(self, df=None, aggregates=None, cube=None, growth=None):
         self.df = df
+        # StreamingAggregates from DataLoader.stream_data, used when no frame is held
+        self.aggregates = aggregates
+        # SalesCube covering the same rows as df; answers take precedence over df
+        self.cube = cube
+        # GrowthEngine over the same rows (the app shares its cached one);
+        # created on first use when not given
+        self._growth = growth
+
+    def _rows(self):
+        """Cube cells when a cube is attached, raw rows otherwise."""
+        return self.cube.frame if self.cube is not None else self.df
         
+    @profiled()
     def calculate_kpis(self):
         """Calculate core KPIs."""
-        total_sales = self.df['sales'].sum()
-        total_profit = self.df['profit'].sum()
-        total_orders = self.df['order_id'].nunique()
+        if self.cube is not None:
+            totals = self.cube.totals()
+            total_sales = totals['sales']
+            total_profit = totals['profit']
+            total_orders = int(totals['orders'])
+        elif self.df is None:
+            totals = self.aggregates.totals()
+            total_sales = totals['sales']
+            total_profit = totals['profit']
+            total_orders = totals['orders']
+        else:
+            total_sales = self.df['sales'].sum()
+            total_profit = self.df['profit'].sum()
+            total_orders = self.df['order_id'].nunique()
         avg_order_value = total_sales / total_orders if total_orders > 0 else 0
         profit_margin = (total_profit / total_sales * 100) if total_sales > 0 else 0
         
@@ -21,36 +46,34 @@ class KPIEngine:
             'profit_margin': profit_margin
         }
         
+    def _growth_engine(self):
+        if self._growth is None:
+            self._growth = GrowthEngine(self.df, self.cube)
+        return self._growth
+
+    @profiled()
     def calculate_growth(self):
-        """Calculate MoM and YoY growth."""
-        # Monthly aggregation
-        monthly = self.df.groupby(self.df['order_date'].dt.to_period('M'))['sales'].sum()
-        
-        if len(monthly) < 2:
-            return {'mom_growth': 0, 'yoy_growth': 0}
-            
-        current_month = monthly.iloc[-1]
-        last_month = monthly.iloc[-2]
-        mom_growth = ((current_month - last_month) / last_month * 100) if last_month != 0 else 0
-        
-        # YoY (compare same month last year)
-        if len(monthly) > 12:
-            last_year_month = monthly.iloc[-13]
-            yoy_growth = ((current_month - last_year_month) / last_year_month * 100) if last_year_month != 0 else 0
+        """Calculate MoM and YoY growth of the latest month (calendar-aligned, 0 when undefined)."""
+        if self._rows() is None:
+            latest = monthly_growth(self.aggregates.monthly_sales())
         else:
-            yoy_growth = 0
-            
+            latest = self._growth_engine().latest()
         return {
-            'mom_growth': mom_growth,
-            'yoy_growth': yoy_growth
+            'mom_growth': 0 if np.isnan(latest['mom']) else latest['mom'],
+            'yoy_growth': 0 if np.isnan(latest['yoy']) else latest['yoy']
         }
-        
+
+    @profiled()
     def get_region_performance(self):
         """Calculate normalized region performance score."""
-        region_stats = self.df.groupby('region').agg({
-            'sales': 'sum',
-            'profit': 'sum'
-        }).reset_index()
+        rows = self._rows()
+        if rows is None:
+            region_stats = self.aggregates.dimension_totals('region')[['region', 'sales', 'profit']]
+        else:
+            region_stats = rows.groupby('region', observed=True).agg({
+                'sales': 'sum',
+                'profit': 'sum'
+            }).reset_index()
         
         # Simple normalization: (Sales / Max Sales) * 0.5 + (Profit / Max Profit) * 0.5
         max_sales = region_stats['sales'].max()
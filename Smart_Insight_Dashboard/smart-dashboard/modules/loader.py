@@ -1,99 +1,318 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import hashlib
+import json
 import os
-from .utils import logger
+from .utils import logger, day_index, read_chunks, sales_mean
+from .aggregates import StreamingAggregates
+from .storage import SQLiteStore
+from .shared import SharedFrameStore
+from .synthetic import SyntheticGenerator
+from .profiling import profiled
+
+# Bump whenever _preprocess changes the shape or dtypes of the frame so that
+# existing on-disk caches are rebuilt instead of served stale.
+CACHE_VERSION = 3
+
+# Rows per chunk in streaming mode, and the only columns it reads.
+STREAM_CHUNKSIZE = 250_000
+STREAM_COLUMNS = ['order_id', 'order_date', 'region', 'category', 'sales', 'profit', 'quantity']
+
+# Declared dtype plan for the loaded frame. Dimensions become categoricals
+# (int codes plus one copy of each distinct string). 'id' columns become
+# categoricals when values repeat enough to pay for the category table and
+# Arrow-backed strings otherwise. Currency measures stay float64: float32
+# sums drift by whole dollars at 10M+ rows.
+SCHEMA = {
+    'order_id': 'id',
+    'customer_id': 'id',
+    'product_id': 'id',
+    'customer_name': 'id',
+    'product_name': 'id',
+    'ship_mode': 'category',
+    'segment': 'category',
+    'region': 'category',
+    'state': 'category',
+    'city': 'category',
+    'category': 'category',
+    'sub_category': 'category',
+    'sales': 'float64',
+    'profit': 'float64',
+    'quantity': 'int32',
+    'discount': 'float32',
+    'year': 'int16',
+    'month': 'int8'
+}
+
+# Above this distinct/rows ratio an 'id' column is stored as Arrow strings.
+ID_CATEGORY_MAX_RATIO = 0.5
+
+def _resolve_dtype(series, dtype):
+    """Pick the concrete dtype for a schema entry, or None to leave the column alone."""
+    if dtype == 'id':
+        if isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            return None
+        ratio = series.nunique() / max(len(series), 1)
+        return 'category' if ratio <= ID_CATEGORY_MAX_RATIO else 'string[pyarrow]'
+    if series.dtype == dtype:
+        return None
+    if dtype != 'category' and np.dtype(dtype).kind == 'i':
+        info = np.iinfo(dtype)
+        if series.isna().any() or series.min() < info.min or series.max() > info.max:
+            logger.warning(f"Keeping {series.name} as {series.dtype}: values do not fit {dtype}")
+            return None
+    return dtype
+
+def apply_schema(df, schema=SCHEMA):
+    """Cast columns to the declared dtypes and report bytes saved per column."""
+    rows = []
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        dtype = _resolve_dtype(series, dtype)
+        if dtype is None:
+            continue
+        before = int(series.memory_usage(index=False, deep=True))
+        df[col] = series.astype(dtype)
+        after = int(df[col].memory_usage(index=False, deep=True))
+        rows.append({'column': col, 'dtype': dtype, 'before_bytes': before,
+                     'after_bytes': after, 'saved_bytes': before - after})
+
+    report = pd.DataFrame(rows, columns=['column', 'dtype', 'before_bytes', 'after_bytes', 'saved_bytes'])
+    return df, report
+
+def _arrow_types_mapper(arrow_type):
+    """Keep plain Arrow strings Arrow-backed when reading the cache back."""
+    import pyarrow as pa
+    if arrow_type == pa.string() or arrow_type == pa.large_string():
+        return pd.StringDtype('pyarrow')
+    return None
 
 class DataLoader:
-    def __init__(self, data_path='data/sample_superstore.csv'):
+    def __init__(self, data_path='data/sample_superstore.csv', cache_dir=None, use_cache=True):
         self.data_path = data_path
-        
-    def generate_synthetic_data(self):
-        """Generate synthetic Superstore data if file doesn't exist."""
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(data_path), '.cache')
+        self.use_cache = use_cache
+        self.memory_report = None
+        self.aggregates = None
+
+    @profiled()
+    def generate_synthetic_data(self, n_rows=5000, **kwargs):
+        """Write synthetic Superstore data to data_path (CSV, or Parquet for a .parquet path)."""
         logger.info("Generating synthetic data...")
-        np.random.seed(42)
-        
-        # Date range
-        start_date = datetime(2021, 1, 1)
-        end_date = datetime(2024, 12, 31)
-        days = (end_date - start_date).days
-        
-        n_rows = 5000
-        
-        # Generate data
-        dates = [start_date + timedelta(days=np.random.randint(0, days)) for _ in range(n_rows)]
-        
-        regions = ['North', 'South', 'East', 'West']
-        categories = ['Furniture', 'Office Supplies', 'Technology']
-        sub_categories = {
-            'Furniture': ['Bookcases', 'Chairs', 'Tables', 'Furnishings'],
-            'Office Supplies': ['Labels', 'Storage', 'Art', 'Binders', 'Appliances', 'Paper'],
-            'Technology': ['Phones', 'Accessories', 'Copiers', 'Machines']
-        }
-        
-        data = []
-        for date in dates:
-            cat = np.random.choice(categories)
-            sub_cat = np.random.choice(sub_categories[cat])
-            region = np.random.choice(regions)
-            sales = np.random.uniform(10, 5000)
-            quantity = np.random.randint(1, 15)
-            discount = np.random.choice([0, 0.1, 0.2, 0.3, 0.5], p=[0.5, 0.2, 0.15, 0.1, 0.05])
-            profit = sales * np.random.uniform(-0.2, 0.4) # Profit margin between -20% and 40%
-            
-            data.append({
-                'order_id': f'ORD-{np.random.randint(10000, 99999)}',
-                'order_date': date,
-                'ship_date': date + timedelta(days=np.random.randint(2, 7)),
-                'ship_mode': np.random.choice(['Standard Class', 'Second Class', 'First Class', 'Same Day']),
-                'customer_id': f'CUST-{np.random.randint(1000, 9999)}',
-                'customer_name': f'Customer {np.random.randint(1, 1000)}',
-                'segment': np.random.choice(['Consumer', 'Corporate', 'Home Office']),
-                'region': region,
-                'state': 'Sample State', # Simplified
-                'city': 'Sample City',   # Simplified
-                'product_id': f'PROD-{cat[:3]}-{np.random.randint(1000, 9999)}',
-                'category': cat,
-                'sub_category': sub_cat,
-                'product_name': f'{sub_cat} Product {np.random.randint(1, 100)}',
-                'sales': round(sales, 2),
-                'quantity': quantity,
-                'discount': discount,
-                'profit': round(profit, 2)
-            })
-            
-        df = pd.DataFrame(data)
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
-        df.to_csv(self.data_path, index=False)
-        logger.info(f"Synthetic data saved to {self.data_path}")
-        return df
+        return SyntheticGenerator(n_rows, **kwargs).write(self.data_path)
 
+    @profiled()
     def load_data(self):
-        """Load and preprocess data."""
+        """Load and preprocess data, serving the columnar cache when it is fresh."""
+        if not os.path.exists(self.data_path):
+            self.generate_synthetic_data()
+        elif self.use_cache:
+            cached = self._read_cache()
+            if cached is not None:
+                return cached
+
+        df = self._preprocess(self._read_source())
+        df, self.memory_report = apply_schema(df)
+        self._log_memory_report()
+
+        if self.use_cache:
+            self._write_cache(df)
+        return df
+
+    @profiled()
+    def load_shared(self, store=None):
+        """load_data() published once to shared memory and memory-mapped by every process.
+
+        The first worker to call this preprocesses and publishes the frame;
+        the rest attach the same read-only pages instead of holding a copy.
+        """
+        if not os.path.exists(self.data_path):
+            self.generate_synthetic_data()
+        store = store or SharedFrameStore()
+        return store.get_or_publish('rows', self.data_path, self.fingerprint(), self.load_data)
+
+    def _read_source(self):
+        """Read the whole source file, CSV or Parquet."""
+        if self.data_path.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            return pq.read_table(self.data_path).to_pandas(date_as_object=False,
+                                                           types_mapper=_arrow_types_mapper)
+        return pd.read_csv(self.data_path)
+
+    def _log_memory_report(self):
+        """Log per-column savings from the dtype plan."""
+        report = self.memory_report
+        if report is None or report.empty:
+            return
+        per_column = ', '.join(
+            f"{r.column}: {r.before_bytes / 1e6:.1f}MB -> {r.after_bytes / 1e6:.1f}MB"
+            for r in report.itertuples()
+        )
+        logger.info(f"Dtype plan saved {report['saved_bytes'].sum() / 1e6:.1f}MB ({per_column})")
+
+    @profiled()
+    def get_store(self, db_path=None):
+        """SQLite backend for the source file, (re)built when the source changes."""
         if not os.path.exists(self.data_path):
-            df = self.generate_synthetic_data()
-        else:
-            df = pd.read_csv(self.data_path)
-            
-        # Preprocessing
+            self.generate_synthetic_data()
+        if db_path is None:
+            stem = os.path.splitext(os.path.basename(self.data_path))[0]
+            db_path = os.path.join(self.cache_dir, f"{stem}.db")
+
+        store = SQLiteStore(db_path)
+        fingerprint = self.fingerprint()
+        if store.fingerprint() != fingerprint:
+            store.load_csv(self.data_path, fingerprint=fingerprint)
+        return store
+
+    def fingerprint(self):
+        """Content hash of the source file, reused from the cache metadata when unchanged."""
+        meta = self._read_cache_meta()
+        stat = os.stat(self.data_path)
+        if meta and meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+            return meta['sha256']
+        return self._hash_source()
+
+    def _hash_source(self):
+        """SHA-256 of the source file, read in 1 MiB blocks."""
+        digest = hashlib.sha256()
+        with open(self.data_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _cache_paths(self):
+        """Parquet and metadata paths for the cache of the current source file."""
+        stem = os.path.splitext(os.path.basename(self.data_path))[0]
+        base = os.path.join(self.cache_dir, stem)
+        return f"{base}.parquet", f"{base}.meta.json"
+
+    def _read_cache_meta(self):
+        """Return cache metadata if it exists and matches CACHE_VERSION."""
+        _, meta_path = self._cache_paths()
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        return meta
+
+    def _read_cache(self):
+        """Load the cached frame if it was built from the current source file."""
+        parquet_path, meta_path = self._cache_paths()
+        meta = self._read_cache_meta()
+        if meta is None or not os.path.exists(parquet_path):
+            return None
+
+        stat = os.stat(self.data_path)
+        if meta['size'] != stat.st_size:
+            return None
+        if meta['mtime_ns'] != stat.st_mtime_ns:
+            # Touched or copied (e.g. a fresh container image) but possibly
+            # identical content: only a hash mismatch invalidates the cache.
+            if self._hash_source() != meta['sha256']:
+                return None
+            meta['mtime_ns'] = stat.st_mtime_ns
+            self._write_json(meta_path, meta)
+        self.memory_report = pd.DataFrame(meta.get('memory_report', []))
+
+        try:
+            import pyarrow.parquet as pq
+            df = pq.read_table(parquet_path).to_pandas(types_mapper=_arrow_types_mapper)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable data cache {parquet_path}: {e}")
+            return None
+        logger.info(f"Loaded {len(df)} rows from cache {parquet_path}")
+        return df
+
+    def _write_cache(self, df):
+        """Persist the preprocessed frame and the fingerprint of its source."""
+        parquet_path, meta_path = self._cache_paths()
+        stat = os.stat(self.data_path)
+        meta = {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(self.data_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self._hash_source(),
+            'memory_report': [] if self.memory_report is None else
+                             self.memory_report.to_dict('records')
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Drop the old metadata first so a crash mid-write can never pair
+            # a new parquet file with a stale fingerprint.
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            tmp_path = f"{parquet_path}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, parquet_path)
+            self._write_json(meta_path, meta)
+        except Exception as e:
+            # Caching is an optimisation only (e.g. pyarrow missing, read-only disk).
+            logger.warning(f"Could not write data cache {parquet_path}: {e}")
+
+    @staticmethod
+    def _write_json(path, payload):
+        """Atomically write a JSON file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @profiled(rows=lambda aggregates: aggregates.rows)
+    def stream_data(self, chunksize=STREAM_CHUNKSIZE):
+        """Read the source in chunks, folding each into running aggregates."""
+        if not os.path.exists(self.data_path):
+            self.generate_synthetic_data()
+
+        aggregates = StreamingAggregates()
+        # Missing sales get the mean over the whole file, as load_data imputes them
+        fill = sales_mean(self.data_path, chunksize)
+        reader = read_chunks(self.data_path, chunksize, columns=STREAM_COLUMNS,
+                             dtype={'region': 'category', 'category': 'category'})
+        for chunk in reader:
+            chunk = self._preprocess(chunk, sales_fill=fill)
+            aggregates.update(chunk)
+
+        logger.info(f"Streamed {aggregates.rows} rows from {self.data_path}")
+        self.aggregates = aggregates
+        return aggregates
+
+    def _preprocess(self, df, sales_fill=None):
+        """Parse dates, impute missing measures and derive calendar features."""
         df['order_date'] = pd.to_datetime(df['order_date'])
-        df['ship_date'] = pd.to_datetime(df['ship_date'])
+        if 'ship_date' in df.columns:
+            df['ship_date'] = pd.to_datetime(df['ship_date'])
         
         # Handle missing values (simple imputation)
-        df['sales'] = df['sales'].fillna(df['sales'].mean())
+        if sales_fill is None:
+            sales_fill = df['sales'].mean()
+        df['sales'] = df['sales'].fillna(sales_fill)
         df['profit'] = df['profit'].fillna(0)
         
         # Feature Engineering
         df['year'] = df['order_date'].dt.year
         df['month'] = df['order_date'].dt.month
         df['month_year'] = df['order_date'].dt.to_period('M')
+
+        # Keep rows in date order with an integer day index so date ranges
+        # can be selected by binary search (utils.slice_by_date).
+        df = df.sort_values('order_date', kind='stable', ignore_index=True)
+        df['order_day'] = day_index(df['order_date'])
         
         return df
 
-    def get_monthly_aggregated(self, df):
-        """Get monthly aggregated data."""
+    def get_monthly_aggregated(self, df=None):
+        """Get monthly aggregated data, from the streamed aggregates when no frame is given."""
+        if df is None:
+            if self.aggregates is None:
+                raise ValueError("No data frame given and stream_data() has not been run.")
+            return self.aggregates.monthly_frame()
         monthly = df.groupby('month_year').agg({
             'sales': 'sum',
             'profit': 'sum',
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import pandas as pd
+from .cache import ResultCache
+from .utils import logger
+
+DEFAULT_MODEL_DIR = 'data/.cache/models'
+# Fitted SARIMAX results run to megabytes each; the store keeps the most
+# recently used ones in memory and prunes pickles past a count or an age.
+MAX_MODELS_IN_MEMORY = 64
+MAX_MODEL_BYTES = 256 * 1024 * 1024
+MAX_MODEL_FILES = 500
+MAX_MODEL_AGE = 30 * 24 * 3600
+
+def series_fingerprint(series):
+    """Stable content hash of a time series (index and values)."""
+    hashed = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:16]
+
+class ModelStore:
+    """Fitted-model cache kept in memory and pickled to disk across restarts.
+
+    Memory holds an LRU of the most recently used models; on disk the oldest
+    pickles beyond max_files, or unused for longer than max_age seconds, are
+    removed whenever a model is stored.
+    """
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, max_models=MAX_MODELS_IN_MEMORY,
+                 max_bytes=MAX_MODEL_BYTES, max_files=MAX_MODEL_FILES, max_age=MAX_MODEL_AGE):
+        self.model_dir = model_dir
+        self.max_files = max_files
+        self.max_age = max_age
+        self._models = ResultCache(max_entries=max_models, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(fingerprint, metric, *params):
+        """Cache key for a series fingerprint, metric and model parameters."""
+        return '-'.join([fingerprint, metric] + [str(p).replace(' ', '') for p in params])
+
+    def _path(self, key):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.model_dir, f"{name}.pkl")
+
+    def get(self, key):
+        """Return a fitted model from memory, falling back to disk, or None."""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            model = pickle.loads(payload)
+            # Mark the pickle as recently used so pruning keeps it
+            os.utime(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model cache {path}: {e}")
+            return None
+        return self._models.put(key, model, size=len(payload))
+
+    def put(self, key, model):
+        """Keep a fitted model in memory and persist it to disk."""
+        path = self._path(key)
+        try:
+            payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Could not persist model {key}: {e}")
+            return self._models.put(key, model)
+        self._models.put(key, model, size=len(payload))
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            self.prune()
+        except Exception as e:
+            logger.warning(f"Could not persist model {key}: {e}")
+        return model
+
+    def prune(self):
+        """Remove pickles unused for max_age seconds, then the oldest beyond max_files."""
+        try:
+            entries = [(e.stat().st_mtime, e.path) for e in os.scandir(self.model_dir)
+                       if e.is_file() and e.name.endswith('.pkl')]
+        except FileNotFoundError:
+            return 0
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.max_age
+        stale = [path for i, (mtime, path) in enumerate(entries) if i >= self.max_files or mtime < cutoff]
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if stale:
+            logger.info(f"Pruned {len(stale)} cached models from {self.model_dir}")
+        return len(stale)
+
+    def _orders_path(self):
+        return os.path.join(self.model_dir, 'orders.json')
+
+    def get_order(self, key):
+        """Previously selected (order, seasonal_order) for a key, or None."""
+        try:
+            with open(self._orders_path()) as f:
+                entry = json.load(f).get(key)
+        except (OSError, ValueError):
+            return None
+        return None if entry is None else (tuple(entry[0]), tuple(entry[1]))
+
+    def put_order(self, key, order, seasonal_order):
+        """Remember the selected orders for a key across restarts."""
+        with self._lock:
+            try:
+                with open(self._orders_path()) as f:
+                    orders = json.load(f)
+            except (OSError, ValueError):
+                orders = {}
+            orders[key] = [list(order), list(seasonal_order)]
+            try:
+                os.makedirs(self.model_dir, exist_ok=True)
+                tmp_path = f"{self._orders_path()}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(orders, f)
+                os.replace(tmp_path, self._orders_path())
+            except OSError as e:
+                logger.warning(f"Could not persist selected order for {key}: {e}")
+
+    def __contains__(self, key):
+        return key in self._models or os.path.exists(self._path(key))
+
+_default_store = None
+
+def default_model_store():
+    """Process-wide store shared by every ForecastEngine."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ModelStore()
+    return _default_store
@@ -0,0 +1,162 @@
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+import pandas as pd
+from .utils import logger
+
+MAX_RECORDS = 2000
+# tracemalloc slows allocation-heavy code several-fold, so peak memory is opt-in.
+TRACK_MEMORY = os.getenv('DASHBOARD_PROFILE_MEMORY') == '1'
+
+def _count_rows(args, result):
+    """Rows an engine call worked on: the engine's frame, else the size of the result."""
+    owner = args[0] if args else None
+    rows = owner._rows() if hasattr(owner, '_rows') else getattr(owner, 'df', None)
+    if isinstance(rows, pd.DataFrame):
+        return len(rows)
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return len(result)
+    return None
+
+class Profiler:
+    """Bounded, thread-safe log of timed calls: wall time, rows and peak memory.
+
+    Records made on a thread after begin_run() carry that run id, so a
+    Streamlit session can show the cost of its own rerun. Peak memory comes
+    from tracemalloc, which is process-wide: concurrent sessions inflate it.
+    """
+
+    def __init__(self, max_records=MAX_RECORDS, track_memory=TRACK_MEMORY):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._runs = itertools.count(1)
+        self.track_memory = False
+        self.set_memory_tracking(track_memory)
+
+    def set_memory_tracking(self, enabled):
+        """Start or stop recording peak memory per call."""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.track_memory = enabled
+
+    def begin_run(self):
+        """Tag this thread's following records with a fresh run id."""
+        self._local.run = next(self._runs)
+        return self._local.run
+
+    def _memory_stack(self):
+        if not hasattr(self._local, 'memory'):
+            self._local.memory = []
+        return self._local.memory
+
+    @contextmanager
+    def measure(self, name, rows=None):
+        """Time a block; the yielded record can be updated (e.g. rows) before it closes."""
+        record = {'name': name, 'rows': rows, 'run': getattr(self._local, 'run', None),
+                  'thread': threading.current_thread().name, 'started': time.time(),
+                  'ms': None, 'peak_bytes': None, 'error': None}
+        # tracemalloc has a single peak counter: each nested block resets it
+        # and hands its own peak back to the enclosing block on exit.
+        stack = self._memory_stack()
+        tracking = self.track_memory and tracemalloc.is_tracing()
+        if tracking:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, current])
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            if tracking and tracemalloc.is_tracing():
+                base, running_peak = stack.pop()
+                peak = max(running_peak, tracemalloc.get_traced_memory()[1])
+                record['peak_bytes'] = peak - base
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+            elif tracking:
+                stack.pop()
+            with self._lock:
+                self._records.append(record)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"profile {json.dumps(record)}")
+
+    def profiled(self, name=None, rows=None):
+        """Decorator form of measure(); rows(result) overrides the row count."""
+        def decorator(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.measure(label) as record:
+                    result = func(*args, **kwargs)
+                    record['rows'] = rows(result) if rows else _count_rows(args, result)
+                    return result
+            return wrapper
+        return decorator
+
+    def records(self, run=None):
+        """Copies of the kept records, optionally for one run only."""
+        with self._lock:
+            records = list(self._records)
+        return [dict(r) for r in records if run is None or r['run'] == run]
+
+    def frame(self, run=None):
+        """Records as a DataFrame, oldest first."""
+        columns = ['name', 'rows', 'ms', 'peak_bytes', 'error', 'run', 'thread', 'started']
+        return pd.DataFrame(self.records(run), columns=columns)
+
+    def summary(self, run=None):
+        """Calls, total/mean/max wall time, rows and peak memory per name, slowest first."""
+        df = self.frame(run)
+        if df.empty:
+            return pd.DataFrame(columns=['name', 'calls', 'total_ms', 'mean_ms', 'max_ms', 'rows', 'peak_bytes'])
+        summary = df.groupby('name').agg(
+            calls=('ms', 'size'),
+            total_ms=('ms', 'sum'),
+            mean_ms=('ms', 'mean'),
+            max_ms=('ms', 'max'),
+            rows=('rows', 'max'),
+            peak_bytes=('peak_bytes', 'max')
+        ).reset_index()
+        return summary.sort_values('total_ms', ascending=False, ignore_index=True)
+
+    def log_records(self, run=None):
+        """Emit records as one JSON object per line through the shared logger."""
+        records = self.records(run)
+        for record in records:
+            logger.info(f"profile {json.dumps(record)}")
+        return len(records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+_profiler = Profiler()
+
+def get_profiler():
+    """Process-wide profiler that the module decorators report to."""
+    return _profiler
+
+def profiled(name=None, rows=None):
+    """Record wall time, rows and (optionally) peak memory for every call."""
+    return _profiler.profiled(name, rows)
+
+def profile_block(name, rows=None):
+    """Context manager form of profiled for code that is not a single call."""
+    return _profiler.measure(name, rows)
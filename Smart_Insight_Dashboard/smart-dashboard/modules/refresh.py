@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+import pandas as pd
+from .cube import SalesCube
+from .loader import DataLoader, apply_schema
+from .utils import logger, concat_rows
+from .profiling import profiled
+
+DEFAULT_BATCH_DIR = 'data/incoming'
+BATCH_EXTENSIONS = ('.csv', '.parquet')
+# Sessions call refresh() on every rerun; the directory is scanned at most this often.
+MIN_SCAN_INTERVAL = 5.0
+
+class IncrementalDataset:
+    """The loaded frame plus order batches appended as they land in batch_dir.
+
+    Each new file is read, preprocessed and merged into the date-sorted
+    frame; the cube is updated from the new rows only. Missing sales in a
+    batch are filled with the base dataset's mean, as the initial load did. `version` increments with every applied batch so result caches
+    keyed on it stay valid. Readers take snapshot() and keep a consistent
+    view while a refresh swaps in new objects.
+
+    Writers should drop complete files (write elsewhere, then move them in);
+    dot-files and *.tmp are ignored.
+    """
+
+    def __init__(self, df, cube=None, batch_dir=DEFAULT_BATCH_DIR, min_interval=MIN_SCAN_INTERVAL):
+        self.batch_dir = batch_dir
+        self.min_interval = min_interval
+        self.df = df
+        self.cube = cube if cube is not None else SalesCube.from_frame(df)
+        # The base frame's NaNs were filled with its mean, which leaves it unchanged
+        self.sales_fill = df['sales'].mean()
+        self.version = 0
+        self.applied = []
+        self._seen = set()
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """(version, df, cube) as of the last applied batch."""
+        with self._lock:
+            return self.version, self.df, self.cube
+
+    def pending_files(self):
+        """Batch files not applied yet, oldest first."""
+        try:
+            entries = [e for e in os.scandir(self.batch_dir) if e.is_file()
+                       and e.name.endswith(BATCH_EXTENSIONS) and not e.name.startswith('.')]
+        except FileNotFoundError:
+            return []
+        pending = []
+        for entry in entries:
+            stat = entry.stat()
+            key = (entry.name, stat.st_size, stat.st_mtime_ns)
+            if key not in self._seen:
+                pending.append((stat.st_mtime_ns, entry.name, entry.path, key))
+        return [(path, key) for _, _, path, key in sorted(pending)]
+
+    def _read_batch(self, path):
+        """A batch file preprocessed like the main dataset and cast to its dtypes."""
+        loader = DataLoader(path, use_cache=False)
+        batch, _ = apply_schema(loader._preprocess(loader._read_source(), sales_fill=self.sales_fill))
+        batch = batch[[c for c in self.df.columns if c in batch.columns]]
+        for col in batch.columns:
+            dtype = self.df[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                # The schema may have picked another dtype for this (smaller)
+                # batch; categories must match the base ones to be unioned.
+                if batch[col].dtype != dtype:
+                    batch[col] = batch[col].astype(dtype.categories.dtype).astype('category')
+            elif batch[col].dtype != dtype:
+                batch[col] = batch[col].astype(dtype)
+        return batch
+
+    def _merge(self, batch):
+        """The frame with batch rows inserted in date order.
+
+        Batches usually start after the last loaded day and are appended;
+        otherwise only the overlapping tail of the frame is re-sorted.
+        """
+        days = self.df['order_day'].to_numpy()
+        start = days.searchsorted(batch['order_day'].to_numpy()[0], side='right')
+        if start == len(days):
+            return concat_rows([self.df, batch])
+        tail = concat_rows([self.df.iloc[start:], batch]).sort_values('order_day', kind='stable')
+        return concat_rows([self.df.iloc[:start], tail])
+
+    @profiled(rows=lambda added: added)
+    def refresh(self, force=False):
+        """Apply new batch files; returns the number of rows added."""
+        now = time.monotonic()
+        if not force and now - self._last_scan < self.min_interval:
+            return 0
+        added = 0
+        with self._lock:
+            self._last_scan = now
+            for path, key in self.pending_files():
+                try:
+                    batch = self._read_batch(path)
+                except Exception as e:
+                    logger.error(f"Skipping unreadable batch {path}: {e}")
+                    self._seen.add(key)
+                    continue
+                self._seen.add(key)
+                if batch.empty:
+                    continue
+                # Late lines of orders already loaded re-count those orders
+                self.cube = self.cube.append(batch, existing=self.df)
+                self.df = self._merge(batch)
+                self.version += 1
+                self.applied.append(os.path.basename(path))
+                added += len(batch)
+                logger.info(f"Appended {len(batch)} rows from {path} (version {self.version})")
+        return added
@@ -0,0 +1,249 @@
+"""Headless report pack: every dashboard page's KPIs and charts, per slice.
+
+    python -m modules.report --data data/sample_superstore.csv --out reports/nightly \\
+        --dimension region --dimension region,category
+
+Each slice (the whole dataset, every region, ...) gets a directory with
+kpis.json and one static figure per chart; manifest.json at the top lists
+them all. Slices are rendered on a process pool whose workers memory-map one
+shared copy of the dataset and cube (SharedFrameStore).
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import time
+from concurrent.futures import as_completed
+from datetime import datetime, timezone
+import plotly.express as px
+from .cube import SalesCube, CUBE_DIMENSIONS
+from .forecasting import ForecastEngine
+from .kpi import KPIEngine
+from .loader import DataLoader
+from .rfm import RFMEngine
+from .shared import SharedFrameStore
+from .utils import logger, available_cpus, process_pool, slice_by_date
+from .visualization import Visualizer
+
+# The whole dataset plus one slice per region.
+DEFAULT_DIMENSIONS = [(), ('region',)]
+# (file name, Visualizer method, kwargs), grouped by dashboard page
+FIGURES = [
+    ('overview_sales_over_time', 'plot_sales_over_time', {'anomalies': True}),
+    ('overview_category_sales', 'plot_category_sales', {}),
+    ('overview_region_sales', 'plot_region_map', {}),
+    ('overview_top_products', 'plot_top_products', {}),
+    ('sales_profit_over_time', 'plot_profit_over_time', {'anomalies': True}),
+    ('sales_monthly_trends', 'plot_monthly_trends', {}),
+    ('sales_profitability_heatmap', 'plot_profitability_heatmap', {}),
+    ('customers_discount_vs_sales', 'plot_discount_vs_sales', {})
+]
+IMAGE_FORMATS = ('png', 'svg', 'pdf', 'html')
+
+# Frames attached by each pool worker (see _attach_frames)
+_frames = {}
+
+def image_export_available():
+    """Static image export needs the optional kaleido package."""
+    return importlib.util.find_spec('kaleido') is not None
+
+def write_figure(fig, path, fmt='png'):
+    """Write fig to path.<fmt>; falls back to standalone HTML when images cannot be exported."""
+    if fmt != 'html' and image_export_available():
+        fig.write_image(f"{path}.{fmt}")
+        return f"{path}.{fmt}"
+    # plotly.js from the CDN keeps each file a few KB instead of ~4 MB
+    fig.write_html(f"{path}.html", include_plotlyjs='cdn')
+    return f"{path}.html"
+
+def _records(frame):
+    """JSON-ready records (dates as ISO strings, numpy scalars as numbers)."""
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+def _scalars(values):
+    return {k: v.item() if hasattr(v, 'item') else v for k, v in values.items()}
+
+def slice_name(labels):
+    """Directory name for a slice: 'all' or e.g. 'region=East__category=Furniture'."""
+    if not labels:
+        return 'all'
+    return '__'.join(re.sub(r'[^\w.=-]+', '-', f"{dim}={value}") for dim, value in labels.items())
+
+def report_slices(cube, dimensions=DEFAULT_DIMENSIONS):
+    """{dim: value} filters for every observed value combination of each dimension set."""
+    slices = []
+    for dims in dimensions:
+        if not dims:
+            slices.append({})
+            continue
+        combos = cube.frame[list(dims)].drop_duplicates().sort_values(list(dims))
+        slices.extend(dict(zip(dims, map(str, values))) for values in combos.itertuples(index=False))
+    return slices
+
+def select_slice(df, cube, labels, start_date=None, end_date=None):
+    """Rows and cube cells of one slice (and date range)."""
+    if start_date is not None or end_date is not None:
+        start_date = start_date or df['order_date'].iloc[0]
+        end_date = end_date or df['order_date'].iloc[-1]
+        df, cube = slice_by_date(df, start_date, end_date), cube.slice(start_date, end_date)
+    cells = cube.frame
+    for dim, value in labels.items():
+        df = df[df[dim] == value]
+        cells = cells[cells[dim] == value]
+    return df, SalesCube(cells)
+
+def render_slice(df, cube, labels, out_dir, fmt='png', periods=12, forecast=True):
+    """Write kpis.json and every figure for one slice; returns its manifest entry."""
+    started = time.perf_counter()
+    name = slice_name(labels)
+    entry = {'slice': name, 'filters': labels, 'rows': len(df), 'files': []}
+    if df.empty:
+        entry['error'] = 'no rows'
+        return entry
+    slice_dir = os.path.join(out_dir, name)
+    os.makedirs(slice_dir, exist_ok=True)
+
+    kpi_engine = KPIEngine(df, cube=cube)
+    visualizer = Visualizer(df, cube=cube)
+    rfm = RFMEngine(df)
+    segments = rfm.segment_summary()
+    report = {
+        'slice': name,
+        'filters': labels,
+        'rows': len(df),
+        'period': [df['order_date'].iloc[0].isoformat(), df['order_date'].iloc[-1].isoformat()],
+        'kpis': _scalars(kpi_engine.calculate_kpis()),
+        'growth': _scalars(kpi_engine.calculate_growth()),
+        'region_performance': _records(kpi_engine.get_region_performance()),
+        'segments': _records(segments),
+        'top_customers': _records(rfm.top_customers(10))
+    }
+
+    for file_name, method, kwargs in FIGURES:
+        fig = getattr(visualizer, method)(**kwargs)
+        entry['files'].append(write_figure(fig, os.path.join(slice_dir, file_name), fmt))
+    fig = px.bar(segments, x='segment', y='customers', color='total_sales',
+                 title='Customers per Segment')
+    entry['files'].append(write_figure(fig, os.path.join(slice_dir, 'customers_segments'), fmt))
+
+    if forecast:
+        engine = ForecastEngine(df, cube=cube)
+        forecast_df = engine.sarima_forecast(periods=periods)
+        report['forecast'] = _records(forecast_df.rename_axis('order_date').reset_index())
+        report['linear_trend'] = _records(engine.linear_trend(periods=periods))
+        if not forecast_df.empty:
+            fig = visualizer.plot_forecast(engine.prepare_data(), forecast_df)
+            entry['files'].append(write_figure(fig, os.path.join(slice_dir, 'forecast_sarima'), fmt))
+
+    kpi_path = os.path.join(slice_dir, 'kpis.json')
+    with open(kpi_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    entry['files'].insert(0, kpi_path)
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    return entry
+
+def _attach_frames(root, data_path, fingerprint):
+    """Pool initializer: memory-map the published rows and cube once per worker."""
+    store = SharedFrameStore(root)
+    _frames['rows'] = store.attach('rows', data_path, fingerprint)
+    _frames['cube'] = SalesCube(store.attach('cube', data_path, fingerprint),
+                                store.attach('cube_repeats', data_path, fingerprint))
+
+def _render_slice_worker(labels, out_dir, options):
+    """Render one slice from the worker's attached frames; errors are reported, not raised."""
+    try:
+        df, cube = select_slice(_frames['rows'], _frames['cube'], labels,
+                                options.pop('start_date'), options.pop('end_date'))
+        return render_slice(df, cube, labels, out_dir, **options)
+    except Exception as e:
+        logger.error(f"Report slice {slice_name(labels)} failed: {e}")
+        return {'slice': slice_name(labels), 'filters': labels, 'files': [],
+                'error': f"{type(e).__name__}: {e}"}
+
+def generate_report(data_path, out_dir, dimensions=DEFAULT_DIMENSIONS, start_date=None, end_date=None,
+                    fmt='png', periods=12, forecast=True, max_workers=None, store=None):
+    """Render every slice of every dimension set into out_dir; returns the manifest.
+
+    The dataset is loaded (or attached) once and published with its cube to
+    shared memory; each worker maps the same pages, so memory does not grow
+    with the number of workers.
+    """
+    started = time.perf_counter()
+    loader = DataLoader(data_path)
+    store = store or SharedFrameStore()
+    df = loader.load_shared(store)
+    fingerprint = loader.fingerprint()
+    cube = SalesCube.get_or_publish(store, data_path, fingerprint, lambda: df)
+    slices = report_slices(cube, dimensions)
+    os.makedirs(out_dir, exist_ok=True)
+    if fmt != 'html' and not image_export_available():
+        logger.warning(f"kaleido is not installed; writing figures as HTML instead of {fmt}")
+
+    options = {'start_date': start_date, 'end_date': end_date, 'fmt': fmt,
+               'periods': periods, 'forecast': forecast}
+    workers = max_workers or min(available_cpus(), len(slices))
+    entries = []
+    if workers > 1:
+        with process_pool(workers, initializer=_attach_frames,
+                          initargs=(store.root, data_path, fingerprint)) as executor:
+            futures = [executor.submit(_render_slice_worker, labels, out_dir, dict(options))
+                       for labels in slices]
+            for done, future in enumerate(as_completed(futures), 1):
+                entries.append(future.result())
+                logger.info(f"Report slice {entries[-1]['slice']} done ({done}/{len(slices)})")
+    else:
+        _frames.update(rows=df, cube=cube)
+        entries = [_render_slice_worker(labels, out_dir, dict(options)) for labels in slices]
+
+    entries.sort(key=lambda entry: entry['slice'])
+    manifest = {
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'data_path': data_path,
+        'fingerprint': fingerprint,
+        'date_range': [str(start_date) if start_date else None, str(end_date) if end_date else None],
+        'format': fmt if fmt == 'html' or image_export_available() else 'html',
+        'workers': workers,
+        'seconds': round(time.perf_counter() - started, 3),
+        'slices': entries,
+        'failures': {e['slice']: e['error'] for e in entries if 'error' in e}
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+    logger.info(f"Report: {len(entries)} slices ({len(manifest['failures'])} failed) in "
+                f"{manifest['seconds']:.1f}s with {workers} workers -> {out_dir}")
+    return manifest
+
+def parse_dimensions(values):
+    """'region,category' -> ('region', 'category'); 'all' -> () (the whole dataset)."""
+    dimensions = []
+    for value in values:
+        dims = () if value == 'all' else tuple(d.strip() for d in value.split(','))
+        unknown = [d for d in dims if d not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown report dimension(s) {unknown}; choose from {CUBE_DIMENSIONS}")
+        dimensions.append(dims)
+    return dimensions
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the dashboard report pack for every slice.')
+    parser.add_argument('--data', default='data/sample_superstore.csv')
+    parser.add_argument('--out', default=os.path.join('reports', datetime.now().strftime('%Y-%m-%d')))
+    parser.add_argument('--dimension', action='append', dest='dimensions',
+                        help="Slice by these columns, e.g. 'region' or 'region,category'; "
+                             "'all' is the whole dataset. Repeatable (default: all, region).")
+    parser.add_argument('--start-date')
+    parser.add_argument('--end-date')
+    parser.add_argument('--format', default='png', choices=IMAGE_FORMATS)
+    parser.add_argument('--periods', type=int, default=12, help='Forecast horizon in months')
+    parser.add_argument('--no-forecast', action='store_true')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    dimensions = parse_dimensions(args.dimensions) if args.dimensions else DEFAULT_DIMENSIONS
+    manifest = generate_report(args.data, args.out, dimensions, args.start_date, args.end_date,
+                               args.format, args.periods, not args.no_forecast, args.workers)
+    raise SystemExit(1 if manifest['failures'] else 0)
+
+if __name__ == '__main__':
+    main()
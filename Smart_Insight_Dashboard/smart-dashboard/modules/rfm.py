@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from .profiling import profiled
+
+RFM_BINS = 5
+# Row columns update() reads
+RFM_COLUMNS = ['customer_id', 'customer_name', 'order_id', 'order_date', 'sales']
+SCORE_COLUMNS = ['customer_id', 'customer_name', 'recency_days', 'frequency', 'monetary',
+                 'r_score', 'f_score', 'm_score', 'rfm', 'segment']
+# (segment, rule on r/f scores), first match wins; everyone else 'Needs Attention'.
+SEGMENT_RULES = [
+    ('Champions', lambda r, f: (r >= 4) & (f >= 4)),
+    ('Loyal Customers', lambda r, f: (r >= 3) & (f >= 4)),
+    ('New Customers', lambda r, f: (r >= 4) & (f <= 1)),
+    ('Potential Loyalists', lambda r, f: (r >= 4) & (f <= 3)),
+    ("Can't Lose Them", lambda r, f: (r <= 1) & (f >= 4)),
+    ('At Risk', lambda r, f: (r <= 2) & (f >= 3)),
+    ('Hibernating', lambda r, f: (r <= 2) & (f <= 2))
+]
+DEFAULT_SEGMENT = 'Needs Attention'
+
+def quantile_scores(values, n_bins=RFM_BINS):
+    """1..n_bins by percentile rank; tied values share a score, higher values score higher."""
+    pct = pd.Series(values).rank(method='average', pct=True).to_numpy()
+    return np.clip(np.ceil(pct * n_bins), 1, n_bins).astype('int8')
+
+class RFMEngine:
+    """Recency / frequency / monetary scores per customer_id.
+
+    Per-customer state (last order, distinct orders, spend) is folded in
+    chunk by chunk, so new rows update it without rescanning history; only
+    the quantile scores, which depend on every customer, are recomputed.
+    """
+
+    def __init__(self, df=None, n_bins=RFM_BINS):
+        self.n_bins = n_bins
+        self.rows = 0
+        self.as_of = None
+        self._ids = np.array([], dtype='object')
+        # uint64 hashes of the ids: a numeric index is much cheaper to probe than strings
+        self._keys = pd.Index([], dtype='uint64')
+        self._names = np.array([], dtype='object')
+        self._last = np.array([], dtype='datetime64[ns]')
+        self._frequency = np.array([], dtype='int64')
+        self._monetary = np.array([], dtype='float64')
+        # Hashes of every order already counted, so an order whose lines
+        # span two updates is counted once.
+        self._seen_orders = np.array([], dtype='uint64')
+        self._scores = None
+        if df is not None:
+            self.update(df)
+
+    def __len__(self):
+        return len(self._ids)
+
+    @profiled(rows=lambda engine: engine.rows)
+    def update(self, chunk):
+        """Fold new rows (customer_id, customer_name, order_id, order_date, sales) into the state."""
+        if chunk is None or chunk.empty:
+            return self
+        self.rows += len(chunk)
+        # Codes number customers in order of first appearance
+        codes, ids = pd.factorize(chunk['customer_id'], use_na_sentinel=False)
+        ids = np.asarray(ids, dtype='object')
+        keys = pd.util.hash_array(ids)
+        n = len(ids)
+        first_rows = np.flatnonzero(~pd.Series(codes).duplicated().to_numpy())
+
+        # One hashed grouping pass per measure: spend and latest order date
+        monetary = np.bincount(codes, weights=chunk['sales'].to_numpy(dtype='float64'), minlength=n)
+        dates = chunk['order_date'].to_numpy(dtype='datetime64[ns]')
+        last = pd.Series(dates).groupby(codes).max().to_numpy()
+        names = chunk['customer_name'].iloc[first_rows].to_numpy(dtype='object')
+
+        # Distinct orders not counted by an earlier update
+        hashes = pd.Series(pd.util.hash_pandas_object(chunk['order_id'], index=False).to_numpy())
+        first = ~hashes.duplicated().to_numpy()
+        fresh = first & ~hashes.isin(self._seen_orders).to_numpy()
+        frequency = np.bincount(codes[fresh], minlength=n)
+        self._seen_orders = np.concatenate([self._seen_orders, hashes.to_numpy()[fresh]])
+
+        # Merge: existing customers are updated in place, new ones appended
+        at = self._keys.get_indexer(keys)
+        old = at >= 0
+        self._last[at[old]] = np.maximum(self._last[at[old]], last[old])
+        self._frequency[at[old]] += frequency[old]
+        self._monetary[at[old]] += monetary[old]
+        self._names[at[old]] = names[old]
+        new = ~old
+        self._ids = np.concatenate([self._ids, ids[new]])
+        self._keys = self._keys.append(pd.Index(keys[new]))
+        self._names = np.concatenate([self._names, names[new]])
+        self._last = np.concatenate([self._last, last[new]])
+        self._frequency = np.concatenate([self._frequency, frequency[new]])
+        self._monetary = np.concatenate([self._monetary, monetary[new]])
+
+        chunk_end = dates.max()
+        self.as_of = chunk_end if self.as_of is None else max(self.as_of, chunk_end)
+        self._scores = None
+        return self
+
+    @profiled()
+    def scores(self):
+        """One row per customer with raw R/F/M, 1..n_bins scores and a segment (SCORE_COLUMNS)."""
+        if self._scores is not None:
+            return self._scores
+        if not len(self):
+            return pd.DataFrame(columns=SCORE_COLUMNS)
+        recency = ((self.as_of - self._last) // np.timedelta64(1, 'D')).astype('int64')
+        # Recent buyers score high, so rank the negated recency
+        r = quantile_scores(-recency, self.n_bins)
+        f = quantile_scores(self._frequency, self.n_bins)
+        m = quantile_scores(self._monetary, self.n_bins)
+        # Segment rules are written for five bins; rescale other bin counts onto 1..5
+        r5, f5 = np.ceil(r * 5 / self.n_bins), np.ceil(f * 5 / self.n_bins)
+        segment = np.select([rule(r5, f5) for _, rule in SEGMENT_RULES],
+                            np.arange(len(SEGMENT_RULES)), len(SEGMENT_RULES))
+        self._scores = pd.DataFrame({
+            'customer_id': self._ids,
+            'customer_name': self._names,
+            'recency_days': recency,
+            'frequency': self._frequency,
+            'monetary': self._monetary,
+            'r_score': r,
+            'f_score': f,
+            'm_score': m,
+            # Three-digit code, e.g. 545 for R=5, F=4, M=5
+            'rfm': r.astype('int16') * 100 + f.astype('int16') * 10 + m,
+            'segment': pd.Categorical.from_codes(segment, [name for name, _ in SEGMENT_RULES] + [DEFAULT_SEGMENT])
+        })
+        return self._scores
+
+    def segment_summary(self):
+        """Customers, share and average R/F/M per segment, largest first."""
+        scores = self.scores()
+        summary = scores.groupby('segment', observed=True).agg(
+            customers=('customer_id', 'size'),
+            recency_days=('recency_days', 'mean'),
+            frequency=('frequency', 'mean'),
+            monetary=('monetary', 'mean'),
+            total_sales=('monetary', 'sum')
+        )
+        summary['share'] = summary['customers'] / max(len(scores), 1)
+        return summary.sort_values('customers', ascending=False).reset_index()
+
+    def top_customers(self, n=10):
+        """Top n customers by spend."""
+        scores = self.scores()
+        return scores.nlargest(n, 'monetary')[
+            ['customer_id', 'customer_name', 'monetary', 'frequency', 'recency_days', 'segment']]
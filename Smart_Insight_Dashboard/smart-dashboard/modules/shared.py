@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from .utils import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: publishing still works, builds are just not deduplicated
+    fcntl = None
+
+# RAM-backed tmpfs when available, so attached pages never touch the disk.
+DEFAULT_SHARED_DIR = os.getenv('DASHBOARD_SHARED_DIR') or (
+    '/dev/shm/smart-dashboard' if os.path.isdir('/dev/shm') else 'data/.cache/shared')
+MANIFEST = 'manifest.json'
+SHARED_VERSION = 1
+
+def _save(directory, name, values):
+    np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(values), allow_pickle=False)
+
+def _load(directory, name):
+    """Read-only ndarray view of a memory-mapped .npy file."""
+    return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r', allow_pickle=False).view(np.ndarray)
+
+def _save_strings(directory, name, values):
+    """Strings as the offsets/data(/validity) buffers of an Arrow large_string array."""
+    import pyarrow as pa
+    array = pa.array(values, type=pa.large_string(), from_pandas=True)
+    if array.offset:
+        array = pa.concat_arrays([array])  # drop a slice offset so the buffers start at row 0
+    validity, offsets, data = array.buffers()
+    _save(directory, f"{name}.offsets", np.frombuffer(offsets, dtype='int64')[:len(array) + 1])
+    _save(directory, f"{name}.data", np.frombuffer(data, dtype='uint8') if data is not None else
+          np.array([], dtype='uint8'))
+    if array.null_count:
+        _save(directory, f"{name}.validity", np.frombuffer(validity, dtype='uint8'))
+    return {'length': len(array), 'null_count': array.null_count}
+
+def _load_strings(directory, name, length, null_count):
+    """Arrow string array over the mapped buffers (no copy)."""
+    import pyarrow as pa
+    validity = pa.py_buffer(_load(directory, f"{name}.validity")) if null_count else None
+    return pa.LargeStringArray.from_buffers(
+        length, pa.py_buffer(_load(directory, f"{name}.offsets")),
+        pa.py_buffer(_load(directory, f"{name}.data")), validity, null_count=null_count)
+
+def write_frame(df, directory):
+    """Write df as one .npy file (or Arrow buffer set) per column plus a manifest.
+
+    Numbers and datetimes are stored as-is, categoricals as codes plus
+    categories, periods as ordinals and strings as Arrow buffers, so every
+    column can be memory-mapped back without parsing or copying.
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        dtype = series.dtype
+        key = f"c{i}"
+        spec = {'name': col, 'key': key}
+        if isinstance(dtype, pd.CategoricalDtype):
+            spec['kind'] = 'category'
+            spec['ordered'] = bool(dtype.ordered)
+            _save(directory, f"{key}.codes", series.cat.codes.to_numpy())
+            categories = dtype.categories
+            if categories.dtype.kind in 'biufcmM':
+                spec['categories'] = 'array'
+                _save(directory, f"{key}.categories", categories.to_numpy())
+            else:
+                spec['categories'] = _save_strings(directory, f"{key}.categories", categories.astype(str))
+        elif isinstance(dtype, pd.PeriodDtype):
+            spec['kind'] = 'period'
+            spec['dtype'] = dtype.name
+            _save(directory, key, series.array.asi8)
+        elif isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+            spec['kind'] = 'array'
+            _save(directory, key, series.to_numpy())
+        elif dtype == object or isinstance(dtype, pd.StringDtype):
+            spec['kind'] = 'string'
+            spec.update(_save_strings(directory, key, series))
+        else:
+            raise TypeError(f"Cannot share column {col!r} of dtype {dtype}")
+        columns.append(spec)
+
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump({'version': SHARED_VERSION, 'rows': len(df), 'columns': columns}, f)
+    return directory
+
+def read_frame(directory):
+    """DataFrame whose columns are read-only views of the memory-mapped files.
+
+    Every process that attaches the same directory shares one copy of the
+    data through the page cache; nothing is copied into the process.
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SHARED_VERSION:
+        raise ValueError(f"Shared frame {directory} has version {manifest.get('version')}")
+
+    data = {}
+    for spec in manifest['columns']:
+        key, kind = spec['key'], spec['kind']
+        if kind == 'array':
+            data[spec['name']] = _load(directory, key)
+        elif kind == 'period':
+            data[spec['name']] = pd.arrays.PeriodArray(_load(directory, key),
+                                                       dtype=pd.api.types.pandas_dtype(spec['dtype']))
+        elif kind == 'string':
+            data[spec['name']] = pd.arrays.ArrowStringArray(
+                _load_strings(directory, key, spec['length'], spec['null_count']))
+        elif kind == 'category':
+            if spec['categories'] == 'array':
+                categories = _load(directory, f"{key}.categories")
+            else:
+                meta = spec['categories']
+                categories = _load_strings(directory, f"{key}.categories", meta['length'],
+                                           meta['null_count']).to_numpy(zero_copy_only=False)
+            data[spec['name']] = pd.Categorical.from_codes(
+                _load(directory, f"{key}.codes"), categories=categories, ordered=spec['ordered'])
+    # copy=False keeps one block per column instead of consolidating (copying) them
+    return pd.DataFrame(data, copy=False)
+
+def source_id(source):
+    """Short stable id of a data source (its absolute path) for frame names."""
+    return hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:12]
+
+class SharedFrameStore:
+    """Named, versioned frames published once and attached by every worker process.
+
+    Frames live under root/<name>-<source id>-<fingerprint>/, so dashboards
+    and report runs over different data files can share one root. The first
+    process to ask for a missing frame builds and publishes it under a file
+    lock; the others wait for it and attach the same files.
+    """
+
+    def __init__(self, root=DEFAULT_SHARED_DIR):
+        self.root = root
+
+    def _prefix(self, name, source):
+        return f"{name}-{source_id(source)}-"
+
+    def path(self, name, source, fingerprint):
+        return os.path.join(self.root, f"{self._prefix(name, source)}{fingerprint}")
+
+    def attach(self, name, source, fingerprint):
+        """The published frame, memory-mapped, or None if it is not published."""
+        path = self.path(name, source, fingerprint)
+        if not os.path.exists(os.path.join(path, MANIFEST)):
+            return None
+        try:
+            return read_frame(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable shared frame {path}: {e}")
+            return None
+
+    def publish(self, df, name, source, fingerprint):
+        """Write df and make it visible atomically (rename of a complete directory)."""
+        path = self.path(name, source, fingerprint)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        write_frame(df, tmp_path)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another process published it first; its copy is identical.
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.prune(name, source, keep=fingerprint)
+        return path
+
+    def get_or_publish(self, name, source, fingerprint, build):
+        """Attach the frame, building and publishing it with build() if nobody has yet."""
+        df = self.attach(name, source, fingerprint)
+        if df is not None:
+            return df
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, f"{name}-{source_id(source)}.lock"), 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                df = self.attach(name, source, fingerprint)
+                if df is None:
+                    built = build()
+                    self.publish(built, name, source, fingerprint)
+                    logger.info(f"Published shared frame {name} of {source} ({len(built)} rows) to {self.root}")
+                    df = self.attach(name, source, fingerprint)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        return df
+
+    def prune(self, name, source, keep):
+        """Remove older versions of one source's frame; processes still mapping them keep their pages.
+
+        Frames of other sources under the same root are left alone.
+        """
+        if not os.path.isdir(self.root):
+            return
+        prefix = self._prefix(name, source)
+        for entry in os.listdir(self.root):
+            if entry.startswith(prefix) and entry != f"{prefix}{keep}" and '.tmp-' not in entry:
+                shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
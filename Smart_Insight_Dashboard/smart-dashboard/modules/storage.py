@@ -0,0 +1,271 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+import pandas as pd
+from .cube import CUBE_DIMENSIONS
+from .utils import logger, read_chunks, sales_mean
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql')
+
+SALES_COLUMNS = [
+    'order_id', 'order_date', 'ship_date', 'ship_mode', 'customer_id', 'customer_name',
+    'segment', 'region', 'state', 'city', 'product_id', 'category', 'sub_category',
+    'product_name', 'sales', 'quantity', 'discount', 'profit'
+]
+CUSTOMER_COLUMNS = ['customer_id', 'customer_name', 'segment', 'region', 'city', 'state']
+PRODUCT_COLUMNS = ['product_id', 'category', 'sub_category', 'product_name']
+
+# Whitelists: identifiers are interpolated into SQL, values are always bound.
+GROUP_COLUMNS = {
+    'region', 'category', 'sub_category', 'segment', 'ship_mode', 'state', 'city',
+    'customer_id', 'customer_name', 'product_id', 'product_name'
+}
+TIME_GRAINS = {
+    'D': 'order_date',
+    'M': "substr(order_date, 1, 7) || '-01'",
+    'Y': "substr(order_date, 1, 4) || '-01-01'"
+}
+MEASURES = {
+    'sales': 'SUM(sales)',
+    'profit': 'SUM(profit)',
+    'quantity': 'SUM(quantity)',
+    'orders': 'COUNT(DISTINCT order_id)',
+    'lines': 'COUNT(*)'
+}
+
+class SQLiteStore:
+    """SQLite storage for sql/schema.sql with filters and group-bys pushed down."""
+
+    def __init__(self, db_path='data/.cache/superstore.db'):
+        self.db_path = db_path
+
+    def connect(self):
+        """Open a connection; one per call keeps the store safe across Streamlit threads."""
+        return sqlite3.connect(self.db_path)
+
+    @contextmanager
+    def transaction(self):
+        """Connection that commits on success and is always closed."""
+        conn = self.connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _run_script(self, conn, name):
+        with open(os.path.join(SQL_DIR, name)) as f:
+            conn.executescript(f.read())
+
+    def load_csv(self, csv_path, fingerprint=None, chunksize=200_000, sales_fill=None):
+        """Bulk-load a Superstore CSV (or Parquet file), replacing any previous contents.
+
+        Missing sales are filled with sales_fill, by default the mean over the
+        whole file (as DataLoader.load_data imputes them), not per chunk.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        tmp_path = f"{self.db_path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        if sales_fill is None:
+            sales_fill = sales_mean(csv_path, chunksize)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            # Durability is irrelevant while building a throwaway file.
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            self._run_script(conn, 'schema.sql')
+
+            rows = 0
+            for chunk in read_chunks(csv_path, chunksize):
+                for col in ('order_date', 'ship_date'):
+                    chunk[col] = pd.to_datetime(chunk[col]).dt.strftime('%Y-%m-%d')
+                chunk['sales'] = chunk['sales'].fillna(sales_fill)
+                chunk['profit'] = chunk['profit'].fillna(0)
+                chunk = chunk.reindex(columns=SALES_COLUMNS)
+
+                conn.executemany(
+                    f"INSERT INTO sales ({', '.join(SALES_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(SALES_COLUMNS))})",
+                    chunk.itertuples(index=False, name=None)
+                )
+                for table, cols, key in (('customers', CUSTOMER_COLUMNS, 'customer_id'),
+                                         ('products', PRODUCT_COLUMNS, 'product_id')):
+                    dims = chunk[cols].drop_duplicates(key)
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO {table} ({', '.join(cols)}) "
+                        f"VALUES ({', '.join('?' * len(cols))})",
+                        dims.itertuples(index=False, name=None)
+                    )
+                rows += len(chunk)
+
+            self._run_script(conn, 'indexes.sql')
+            conn.execute('ANALYZE')
+            conn.executemany(
+                'INSERT OR REPLACE INTO load_metadata (key, value) VALUES (?, ?)',
+                [('fingerprint', fingerprint or ''), ('source', os.path.abspath(csv_path)),
+                 ('rows', str(rows))]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.db_path)
+        with self.transaction() as conn:
+            conn.execute('PRAGMA journal_mode = WAL')
+        logger.info(f"Loaded {rows} rows from {csv_path} into {self.db_path}")
+        return rows
+
+    def fingerprint(self):
+        """Fingerprint of the source the database was built from, or None."""
+        if not os.path.exists(self.db_path):
+            return None
+        try:
+            with self.transaction() as conn:
+                row = conn.execute("SELECT value FROM load_metadata WHERE key = 'fingerprint'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return row[0] if row else None
+
+    def query(self, sql, params=()):
+        """Run a read query and return a DataFrame."""
+        conn = self.connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _date_filter(start_date=None, end_date=None):
+        """WHERE clause and parameters for an inclusive order_date range."""
+        clauses, params = [], []
+        if start_date is not None:
+            clauses.append('order_date >= ?')
+            params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        if end_date is not None:
+            clauses.append('order_date <= ?')
+            params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def aggregate(self, by=(), grain=None, start_date=None, end_date=None,
+                  measures=('sales', 'profit', 'quantity', 'orders')):
+        """Group sales by dimension columns and/or a time grain ('D', 'M', 'Y')."""
+        by = list(by)
+        unknown = set(by) - GROUP_COLUMNS
+        if unknown:
+            raise ValueError(f"Cannot group by {sorted(unknown)}")
+        if grain is not None and grain not in TIME_GRAINS:
+            raise ValueError(f"Unknown time grain {grain!r}")
+
+        keys = ([f"{TIME_GRAINS[grain]} AS order_date"] if grain else []) + by
+        key_names = (['order_date'] if grain else []) + by
+        select = keys + [f"{MEASURES[m]} AS {m}" for m in measures]
+        where, params = self._date_filter(start_date, end_date)
+        sql = f"SELECT {', '.join(select)} FROM sales {where}"
+        if key_names:
+            positions = ', '.join(str(i + 1) for i in range(len(key_names)))
+            sql += f" GROUP BY {positions} ORDER BY {positions}"
+
+        df = self.query(sql, params)
+        if grain:
+            df['order_date'] = pd.to_datetime(df['order_date'])
+        return df
+
+    def kpis(self, start_date=None, end_date=None):
+        """Same dict as KPIEngine.calculate_kpis, computed inside SQLite."""
+        row = self.aggregate(start_date=start_date, end_date=end_date).iloc[0]
+        total_sales = 0 if pd.isna(row['sales']) else row['sales']
+        total_profit = 0 if pd.isna(row['profit']) else row['profit']
+        total_orders = int(row['orders'])
+        return {
+            'total_sales': total_sales,
+            'total_profit': total_profit,
+            'total_orders': total_orders,
+            'avg_order_value': total_sales / total_orders if total_orders > 0 else 0,
+            'profit_margin': (total_profit / total_sales * 100) if total_sales > 0 else 0
+        }
+
+    def monthly(self, start_date=None, end_date=None):
+        """Same frame as DataLoader.get_monthly_aggregated, computed inside SQLite."""
+        monthly = self.aggregate(grain='M', start_date=start_date, end_date=end_date)
+        return monthly.rename(columns={'order_date': 'month_year', 'orders': 'order_id'})
+
+    def cube_frame(self, start_date=None, end_date=None):
+        """SalesCube frame for an order_date range, aggregated inside SQLite.
+
+        As in SalesCube.from_frame, each order counts once, on its first line
+        in the range, so the cube's totals are the range's KPIs.
+        """
+        dims = ', '.join(CUBE_DIMENSIONS)
+        positions = ', '.join(str(i + 1) for i in range(len(CUBE_DIMENSIONS) + 1))
+        where, params = self._date_filter(start_date, end_date)
+        sql = (f"SELECT order_date, {dims}, SUM(sales) AS sales, SUM(profit) AS profit, "
+               f"SUM(quantity) AS quantity, SUM(first_line) AS orders, COUNT(*) AS lines "
+               f"FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY order_id ORDER BY order_date, rowid) = 1 "
+               f"AS first_line FROM sales {where}) "
+               f"GROUP BY {positions} ORDER BY {positions}")
+        df = self.query(sql, params)
+        df['order_date'] = pd.to_datetime(df['order_date'])
+        return df.astype({d: 'category' for d in CUBE_DIMENSIONS})
+
+    def date_bounds(self):
+        """Earliest and latest order dates."""
+        row = self.query('SELECT MIN(order_date) AS lo, MAX(order_date) AS hi FROM sales').iloc[0]
+        return pd.Timestamp(row['lo']), pd.Timestamp(row['hi'])
+
+    def fetch_rows(self, start_date=None, end_date=None, limit=None, offset=0):
+        """Raw order lines in a date range, one page at a time when limit is set."""
+        where, params = self._date_filter(start_date, end_date)
+        sql = f"SELECT {', '.join(SALES_COLUMNS)} FROM sales {where} ORDER BY order_date"
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [int(limit), int(offset)]
+        df = self.query(sql, params)
+        for col in ('order_date', 'ship_date'):
+            df[col] = pd.to_datetime(df[col])
+        return df
+
+    def iter_rows(self, start_date=None, end_date=None, columns=SALES_COLUMNS, chunksize=100_000):
+        """Order lines in a date range as frames of at most chunksize rows, read by one query."""
+        unknown = set(columns) - set(SALES_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown columns {sorted(unknown)}")
+        where, params = self._date_filter(start_date, end_date)
+        sql = f"SELECT {', '.join(columns)} FROM sales {where} ORDER BY order_date"
+        conn = self.connect()
+        try:
+            for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunksize):
+                for col in ('order_date', 'ship_date'):
+                    if col in chunk.columns:
+                        chunk[col] = pd.to_datetime(chunk[col])
+                yield chunk
+        finally:
+            conn.close()
+
+    def save_forecast(self, forecast_df, metric='sales', model_name='sarima'):
+        """Store a forecast frame (predicted/lower_ci/upper_ci indexed by date)."""
+        rows = [
+            (pd.Timestamp(date).strftime('%Y-%m-%d'), metric, float(r['predicted']),
+             float(r['lower_ci']), float(r['upper_ci']), model_name)
+            for date, r in forecast_df.iterrows()
+        ]
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM forecast_results WHERE metric = ? AND model_name = ?',
+                         (metric, model_name))
+            conn.executemany(
+                'INSERT INTO forecast_results (forecast_date, metric, predicted_value, lower_ci, '
+                'upper_ci, model_name) VALUES (?, ?, ?, ?, ?, ?)', rows
+            )
+
+    def load_forecast(self, metric='sales', model_name='sarima'):
+        """Read back a forecast stored by save_forecast."""
+        df = self.query(
+            'SELECT forecast_date, predicted_value AS predicted, lower_ci, upper_ci '
+            'FROM forecast_results WHERE metric = ? AND model_name = ? ORDER BY forecast_date',
+            (metric, model_name)
+        )
+        df['forecast_date'] = pd.to_datetime(df['forecast_date'])
+        return df.set_index('forecast_date')
@@ -0,0 +1,218 @@
+"""Vectorized Superstore-shaped data generator for demos and capacity tests.
+
+    python -m modules.synthetic --rows 100000000 --out data/orders_100m.parquet
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from .utils import logger
+
+REGIONS = ['North', 'South', 'East', 'West']
+SEGMENTS = ['Consumer', 'Corporate', 'Home Office']
+SEGMENT_SHARES = [0.52, 0.30, 0.18]
+SHIP_MODES = ['Standard Class', 'Second Class', 'First Class', 'Same Day']
+SHIP_MODE_SHARES = [0.60, 0.20, 0.15, 0.05]
+# Days from order to shipment per ship mode, as [low, high).
+SHIP_DAYS = [(4, 7), (2, 4), (1, 3), (0, 1)]
+DISCOUNTS = [0, 0.1, 0.2, 0.3, 0.5]
+DISCOUNT_SHARES = [0.5, 0.2, 0.15, 0.1, 0.05]
+
+# category -> (sub-categories, share of the product catalog, median unit price, base margin)
+CATALOG = {
+    'Furniture': (['Bookcases', 'Chairs', 'Tables', 'Furnishings'], 0.2, 180.0, 0.05),
+    'Office Supplies': (['Labels', 'Storage', 'Art', 'Binders', 'Appliances', 'Paper'], 0.6, 20.0, 0.17),
+    'Technology': (['Phones', 'Accessories', 'Copiers', 'Machines'], 0.2, 250.0, 0.17)
+}
+
+COLUMNS = [
+    'order_id', 'order_date', 'ship_date', 'ship_mode', 'customer_id', 'customer_name',
+    'segment', 'region', 'state', 'city', 'product_id', 'category', 'sub_category',
+    'product_name', 'sales', 'quantity', 'discount', 'profit'
+]
+
+def _zipf_cdf(n, exponent):
+    """Cumulative popularity of n ranked items with Zipf-like skew."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    cdf = np.cumsum(weights)
+    return cdf / cdf[-1]
+
+def _draw(rng, cdf, size):
+    """Indices drawn from a precomputed CDF (cheaper than rng.choice(p=...) per chunk)."""
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side='right'), len(cdf) - 1)
+
+class SyntheticGenerator:
+    """Order lines with trend, yearly and weekly seasonality and skewed popularity.
+
+    Customers and products are drawn from Zipf-like distributions so a few of
+    each dominate revenue; orders carry 1.8 lines on average and share their
+    date, customer and ship mode. Every chunk is generated from its own seeded
+    stream, so output is reproducible and memory is bounded by the chunk size.
+    """
+
+    def __init__(self, n_rows=5000, start_date='2021-01-01', end_date='2024-12-31',
+                 n_customers=800, n_products=2000, n_regions=4, seed=42,
+                 growth=0.15, seasonality=0.25, skew=0.6):
+        self.n_rows = int(n_rows)
+        self.seed = seed
+        self.skew = skew
+        self.days = pd.date_range(start_date, end_date, freq='D')
+        self._day_cdf = self._calendar_cdf(growth, seasonality)
+        rng = np.random.default_rng(seed)
+        self._build_customers(rng, n_customers, n_regions)
+        self._build_products(rng, n_products)
+
+    def _calendar_cdf(self, growth, seasonality):
+        """Order volume per day: linear growth x year-end peak x quieter weekends."""
+        years = (self.days - self.days[0]).days.to_numpy() / 365.25
+        trend = 1 + growth * years
+        yearly = 1 + seasonality * np.cos(2 * np.pi * (self.days.dayofyear.to_numpy() - 340) / 365.25)
+        weekly = np.array([1.0, 1.05, 1.05, 1.0, 0.95, 0.7, 0.6])[self.days.dayofweek.to_numpy()]
+        cdf = np.cumsum(trend * yearly * weekly)
+        return cdf / cdf[-1]
+
+    def _build_customers(self, rng, n_customers, n_regions):
+        regions = REGIONS[:n_regions] if n_regions <= len(REGIONS) else \
+            [f'Region {i + 1}' for i in range(n_regions)]
+        region_codes = rng.choice(len(regions), n_customers, p=rng.dirichlet(np.full(len(regions), 5.0)))
+        state_codes = rng.integers(0, 5, n_customers)
+        ids = np.arange(n_customers)
+        self.customers = pd.DataFrame({
+            'customer_id': pd.Series(ids).map('CUST-{:06d}'.format),
+            'customer_name': pd.Series(ids + 1).map('Customer {}'.format),
+            'segment': pd.Categorical.from_codes(
+                rng.choice(len(SEGMENTS), n_customers, p=SEGMENT_SHARES), SEGMENTS),
+            'region': pd.Categorical.from_codes(region_codes, regions),
+            'state': [f'{regions[r]} State {s + 1}' for r, s in zip(region_codes, state_codes)],
+            'city': [f'{regions[r]} City {s + 1}{chr(65 + c)}'
+                     for r, s, c in zip(region_codes, state_codes, rng.integers(0, 4, n_customers))]
+        })
+        self._customer_cdf = _zipf_cdf(n_customers, self.skew)
+
+    def _build_products(self, rng, n_products):
+        names = list(CATALOG)
+        shares = np.array([CATALOG[c][1] for c in names])
+        cat_codes = rng.choice(len(names), n_products, p=shares / shares.sum())
+        sub_names = [s for c in names for s in CATALOG[c][0]]
+        sub_counts = np.array([len(CATALOG[c][0]) for c in names])
+        offsets = np.cumsum(sub_counts) - sub_counts
+        sub_codes = offsets[cat_codes] + rng.integers(0, sub_counts[cat_codes])
+        median_price = np.array([CATALOG[c][2] for c in names])[cat_codes]
+        ids = np.arange(n_products)
+        self.products = pd.DataFrame({
+            'product_id': [f'PROD-{names[c][:3].upper()}-{i:06d}' for c, i in zip(cat_codes, ids)],
+            'category': pd.Categorical.from_codes(cat_codes, names),
+            'sub_category': pd.Categorical.from_codes(sub_codes, sub_names),
+            'product_name': [f'{sub_names[s]} Product {i + 1}' for s, i in zip(sub_codes, ids)]
+        })
+        self._unit_price = median_price * rng.lognormal(0, 0.6, n_products)
+        self._margin = np.array([CATALOG[c][3] for c in names])[cat_codes]
+        # Shuffle popularity so product IDs do not sort by rank.
+        self._product_rank = rng.permutation(n_products)
+        self._product_cdf = _zipf_cdf(n_products, self.skew)
+
+    def generate_chunk(self, n_rows, chunk_index=0, first_order=0):
+        """One chunk of order lines; order numbers start at first_order + 1."""
+        rng = np.random.default_rng([self.seed, chunk_index])
+        new_order = rng.random(n_rows) < 0.55
+        new_order[0] = True
+        line_order = np.cumsum(new_order) - 1
+        n_orders = int(line_order[-1]) + 1
+
+        # Per-order attributes, broadcast to their lines
+        day = _draw(rng, self._day_cdf, n_orders)
+        customer = _draw(rng, self._customer_cdf, n_orders)
+        ship_mode = rng.choice(len(SHIP_MODES), n_orders, p=SHIP_MODE_SHARES)
+        low, high = np.array(SHIP_DAYS).T
+        ship_delay = low[ship_mode] + (rng.random(n_orders) * (high - low)[ship_mode]).astype(int)
+        order_date = self.days.to_numpy()[day]
+        ship_date = order_date + ship_delay.astype('timedelta64[D]')
+        order_ids = np.array([f'ORD-{i:09d}' for i in range(first_order + 1, first_order + n_orders + 1)],
+                             dtype=object)
+
+        product = self._product_rank[_draw(rng, self._product_cdf, n_rows)]
+        quantity = np.minimum(rng.geometric(0.3, n_rows), 14).astype('int32')
+        discount = np.array(DISCOUNTS)[rng.choice(len(DISCOUNTS), n_rows, p=DISCOUNT_SHARES)]
+        sales = self._unit_price[product] * quantity * (1 - discount) * rng.lognormal(0, 0.1, n_rows)
+        margin = self._margin[product] - 0.8 * discount + rng.normal(0, 0.05, n_rows)
+
+        customers = self.customers.iloc[customer[line_order]].reset_index(drop=True)
+        products = self.products.iloc[product].reset_index(drop=True)
+        chunk = pd.concat([customers, products], axis=1).assign(
+            order_id=order_ids[line_order],
+            order_date=order_date[line_order],
+            ship_date=ship_date[line_order],
+            ship_mode=pd.Categorical.from_codes(ship_mode[line_order], SHIP_MODES),
+            sales=sales.round(2),
+            quantity=quantity,
+            discount=discount,
+            profit=(sales * margin).round(2)
+        )
+        return chunk[COLUMNS], n_orders
+
+    def chunks(self, chunksize=1_000_000):
+        """Yield the dataset as frames of at most chunksize rows."""
+        first_order = 0
+        for index, start in enumerate(range(0, self.n_rows, chunksize)):
+            chunk, n_orders = self.generate_chunk(min(chunksize, self.n_rows - start), index, first_order)
+            first_order += n_orders
+            yield chunk
+
+    def generate(self):
+        """The whole dataset as one frame; use write() for large row counts."""
+        return pd.concat(self.chunks(), ignore_index=True)
+
+    @staticmethod
+    def _to_arrow(chunk):
+        """Arrow table with plain strings and calendar dates, so every chunk shares one schema."""
+        import pyarrow as pa
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        fields = []
+        for field in table.schema:
+            if pa.types.is_dictionary(field.type):
+                field = field.with_type(pa.string())
+            elif pa.types.is_timestamp(field.type):
+                field = field.with_type(pa.date32())
+            fields.append(field)
+        return table.cast(pa.schema(fields))
+
+    def write(self, path, chunksize=1_000_000):
+        """Write CSV or, for a .parquet path, Parquet one chunk at a time."""
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        # Arrow's writers are several times faster than DataFrame.to_csv.
+        writer_cls = pq.ParquetWriter if path.endswith('.parquet') else pa_csv.CSVWriter
+        writer = None
+        try:
+            for chunk in self.chunks(chunksize):
+                table = self._to_arrow(chunk)
+                if writer is None:
+                    writer = writer_cls(tmp_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote {self.n_rows} synthetic rows to {path}")
+        return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic Superstore dataset.')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--out', default='data/synthetic_superstore.parquet')
+    parser.add_argument('--start-date', default='2021-01-01')
+    parser.add_argument('--end-date', default='2024-12-31')
+    parser.add_argument('--customers', type=int, default=800)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--regions', type=int, default=4)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    SyntheticGenerator(args.rows, args.start_date, args.end_date, args.customers, args.products,
+                       args.regions, args.seed).write(args.out, args.chunksize)
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import logging
@@ -10,6 +13,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def available_cpus():
+    """CPUs this process may run on (respects affinity masks / container cpusets)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+_process_context = None
+
+def process_pool(max_workers, **kwargs):
+    """A ProcessPoolExecutor whose workers are not forked from this process.
+
+    Pools are opened from threaded code (Streamlit sessions, the fit
+    executor), and a forked child can inherit locks held by other threads.
+    Workers start from a forkserver where available, else are spawned.
+    """
+    global _process_context
+    if _process_context is None:
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _process_context = multiprocessing.get_context(method)
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_process_context, **kwargs)
+
 def format_currency(value):
     """Format number as currency string."""
     return f"${value:,.2f}"
@@ -22,7 +46,64 @@ def get_date_range(df, date_col='order_date'):
     """Get min and max date from dataframe."""
     return df[date_col].min(), df[date_col].max()
 
+def read_chunks(path, chunksize, columns=None, dtype=None):
+    """Iterate a CSV or Parquet file as frames of at most chunksize rows."""
+    if not path.endswith('.parquet'):
+        yield from pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunksize)
+        return
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+        chunk = batch.to_pandas(date_as_object=False)
+        yield chunk.astype(dtype) if dtype else chunk
+
+def sales_mean(path, chunksize):
+    """Mean of the observed sales over the whole file, from a sales-only pass."""
+    total, count = 0.0, 0
+    for chunk in read_chunks(path, chunksize, columns=['sales']):
+        observed = chunk['sales'].dropna()
+        total += observed.sum()
+        count += len(observed)
+    return total / count if count else 0
+
+def to_day_number(value):
+    """Days since 1970-01-01 for a date, datetime or Timestamp."""
+    return pd.Timestamp(value).normalize().value // 86_400_000_000_000
+
+def day_index(dates):
+    """int64 days since 1970-01-01 for a datetime64 series."""
+    return dates.to_numpy().astype('datetime64[D]').astype('int64')
+
+def slice_by_date(df, start_date, end_date, day_col='order_day'):
+    """Rows whose day falls in [start_date, end_date], as a zero-copy positional slice.
+
+    `df` must be sorted by `day_col`; DataLoader.load_data guarantees this.
+    """
+    days = df[day_col].to_numpy()
+    lo = days.searchsorted(to_day_number(start_date), side='left')
+    hi = days.searchsorted(to_day_number(end_date), side='right')
+    return df.iloc[lo:hi]
+
+def concat_rows(frames):
+    """Row-wise concat that keeps categorical columns categorical.
+
+    pd.concat falls back to object dtype when the category sets differ; here
+    categories are unioned (existing ones first, so old codes keep meaning).
+    """
+    columns = {}
+    for col in frames[0].columns:
+        parts = [f[col] for f in frames]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            columns[col] = pd.api.types.union_categoricals(parts)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
 def filter_data_by_date(df, start_date, end_date, date_col='order_date'):
     """Filter dataframe by date range."""
-    mask = (df[date_col].dt.date >= start_date) & (df[date_col].dt.date <= end_date)
+    if date_col == 'order_date' and 'order_day' in df.columns and df['order_day'].is_monotonic_increasing:
+        return slice_by_date(df, start_date, end_date)
+    # Compare datetime64 values directly instead of materialising .dt.date
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    mask = (df[date_col] >= start) & (df[date_col] < end)
     return df.loc[mask]
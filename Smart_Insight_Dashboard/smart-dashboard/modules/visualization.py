@@ -1,74 +1,193 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from .downsample import (MAX_LINE_POINTS, MAX_SCATTER_POINTS, density_grid, downsample_frame,
+                         stratified_sample)
+from .anomaly import AnomalyDetector
+from .growth import GrowthEngine, GROWTH_LABELS
+from .profiling import profiled
 
 class Visualizer:
-    def __init__(self, df):
+    def __init__(self, df=None, cube=None, aggregates=None, growth=None):
         self.df = df
+        # SalesCube covering the same rows as df; aggregate charts read from it
+        self.cube = cube
+        # StreamingAggregates from DataLoader.stream_data, used when no frame is held
+        self.aggregates = aggregates
+        # GrowthEngine over the same rows (the app shares its cached one);
+        # created on first use when not given
+        self._growth = growth
+
+    def _rows(self):
+        """Cube cells when a cube is attached, raw rows otherwise."""
+        return self.cube.frame if self.cube is not None else self.df
+
+    def _over_time(self, metric, freq):
+        """order_date/metric totals per freq period; streamed aggregates are always monthly."""
+        rows = self._rows()
+        if rows is None:
+            monthly = self.aggregates.monthly_frame()
+            # Month-end labels, as pd.Grouper(freq='M') gives the row path
+            return pd.DataFrame({'order_date': monthly['month_year'] + pd.offsets.MonthEnd(0),
+                                 metric: monthly[metric]})
+        return rows.groupby(pd.Grouper(key='order_date', freq=freq))[metric].sum().reset_index()
+
+    def _sales_by(self, dim):
+        """Sales per value of dim."""
+        rows = self._rows()
+        if rows is None:
+            return self.aggregates.dimension_totals(dim)[[dim, 'sales']]
+        return rows.groupby(dim, observed=True)['sales'].sum().reset_index()
+
+    def _add_anomaly_markers(self, fig, points, name='Anomaly'):
+        """Red markers at flagged points (AnomalyDetector frames); drawn from the
+        full series, so downsampling the line never hides them."""
+        if points is None or points.empty:
+            return fig
+        fig.add_trace(go.Scatter(
+            x=points['order_date'], y=points['value'], mode='markers', name=name,
+            marker=dict(color='#d62728', size=10, symbol='circle-open', line=dict(width=2)),
+            customdata=points[['expected', 'score']].to_numpy(),
+            hovertemplate='%{y:,.0f} (expected %{customdata[0]:,.0f}, score %{customdata[1]:+.1f})'
+        ))
+        return fig
         
-    def plot_sales_over_time(self, freq='M'):
-        """Sales over time line chart."""
-        data = self.df.groupby(pd.Grouper(key='order_date', freq=freq))['sales'].sum().reset_index()
+    @profiled()
+    def plot_sales_over_time(self, freq='M', max_points=MAX_LINE_POINTS, method='lttb', anomalies=False):
+        """Sales over time line chart, downsampled to max_points ('lttb' or 'minmax').
+
+        anomalies=True marks points flagged by AnomalyDetector on the total series.
+        """
+        data = self._over_time('sales', freq)
+        data = downsample_frame(data, 'order_date', 'sales', max_points, method)
         fig = px.line(data, x='order_date', y='sales', title='Sales Over Time',
                      template='plotly_white')
         fig.update_layout(hovermode="x unified")
+        if anomalies and self._rows() is not None:
+            self._add_anomaly_markers(fig, AnomalyDetector(self.df, self.cube).detect([()], 'sales', freq))
         return fig
         
-    def plot_profit_over_time(self, freq='M'):
-        """Profit over time line chart."""
-        data = self.df.groupby(pd.Grouper(key='order_date', freq=freq))['profit'].sum().reset_index()
+    @profiled()
+    def plot_profit_over_time(self, freq='M', max_points=MAX_LINE_POINTS, method='lttb', anomalies=False):
+        """Profit over time line chart, downsampled to max_points ('lttb' or 'minmax').
+
+        anomalies=True marks points flagged by AnomalyDetector on the total series.
+        """
+        data = self._over_time('profit', freq)
+        data = downsample_frame(data, 'order_date', 'profit', max_points, method)
         fig = px.line(data, x='order_date', y='profit', title='Profit Over Time',
                      line_shape='spline', color_discrete_sequence=['#2ca02c'])
+        if anomalies and self._rows() is not None:
+            self._add_anomaly_markers(fig, AnomalyDetector(self.df, self.cube).detect([()], 'profit', freq))
         return fig
         
+    @profiled()
     def plot_category_sales(self):
         """Category-wise sales pie/bar chart."""
-        data = self.df.groupby('category')['sales'].sum().reset_index()
+        data = self._sales_by('category')
         fig = px.pie(data, values='sales', names='category', title='Sales by Category',
                     hole=0.4)
         return fig
         
+    @profiled()
     def plot_region_map(self):
         """Region revenue bar chart (Map placeholder as we don't have lat/lon)."""
-        data = self.df.groupby('region')['sales'].sum().reset_index()
+        data = self._sales_by('region')
         fig = px.bar(data, x='region', y='sales', color='sales', title='Revenue by Region',
                     color_continuous_scale='Viridis')
         return fig
         
-    def plot_top_products(self, n=10):
-        """Top N products by sales."""
-        data = self.df.groupby('product_name')['sales'].sum().nlargest(n).reset_index()
+    @profiled()
+    def plot_top_products(self, n=10, product_sales=None):
+        """Top N products by sales; product_sales (product_name, sales per product) replaces the raw rows."""
+        if product_sales is None:
+            product_sales = self.df.groupby('product_name', observed=True)['sales'].sum()
+        else:
+            product_sales = product_sales.set_index('product_name')['sales']
+        data = product_sales.nlargest(n).reset_index()
         fig = px.bar(data, x='sales', y='product_name', orientation='h', 
                     title=f'Top {n} Products', color='sales')
         fig.update_layout(yaxis={'categoryorder':'total ascending'})
         return fig
         
-    def plot_discount_vs_sales(self):
-        """Scatter plot of discount vs sales."""
-        fig = px.scatter(self.df, x='discount', y='sales', color='category',
-                        title='Discount vs Sales Correlation', opacity=0.6)
-        return fig
+    @profiled()
+    def plot_discount_vs_sales(self, max_points=MAX_SCATTER_POINTS, mode='sample'):
+        """Scatter plot of discount vs sales.
+
+        Above max_points rows only a per-category stratified sample is plotted
+        (mode='sample'), or a server-side 2D histogram (mode='density'), so the
+        browser never receives every row.
+        """
+        n_rows = len(self.df)
+        if n_rows <= max_points:
+            return px.scatter(self.df, x='discount', y='sales', color='category',
+                              title='Discount vs Sales Correlation', opacity=0.6)
+        if mode == 'density':
+            counts, x, y = density_grid(self.df, 'discount', 'sales')
+            fig = go.Figure(go.Heatmap(x=x, y=y, z=counts, colorscale='Viridis',
+                                       colorbar=dict(title='Rows'),
+                                       hovertemplate='discount %{x}<br>sales %{y:,.0f}<br>%{z:,} rows<extra></extra>'))
+            fig.update_layout(title=f'Discount vs Sales Density ({n_rows:,} rows)',
+                              xaxis_title='discount', yaxis_title='sales')
+            return fig
+        sample = stratified_sample(self.df, 'category', max_points)
+        return px.scatter(sample, x='discount', y='sales', color='category', opacity=0.6,
+                          title=f'Discount vs Sales Correlation (sample of {len(sample):,} / {n_rows:,} rows)')
         
+    @profiled()
     def plot_profitability_heatmap(self):
         """Heatmap of profit by Category and Region."""
-        data = self.df.pivot_table(values='profit', index='category', columns='region', aggfunc='sum')
+        data = self._rows().pivot_table(values='profit', index='category', columns='region',
+                                        aggfunc='sum', observed=True)
         fig = px.imshow(data, title='Profitability Heatmap (Category vs Region)',
                        color_continuous_scale='RdBu')
         return fig
         
+    @profiled()
     def plot_monthly_trends(self):
         """Monthly seasonality."""
-        df_copy = self.df.copy()
-        df_copy['month_name'] = df_copy['order_date'].dt.month_name()
-        df_copy['month_num'] = df_copy['order_date'].dt.month
-        data = df_copy.groupby(['month_num', 'month_name'])['sales'].mean().reset_index()
-        data = data.sort_values('month_num')
+        # Group on the derived month series directly rather than copying the
+        # whole frame to attach helper columns.
+        rows = self._rows()
+        month_num = rows['order_date'].dt.month.rename('month_num')
+        if self.cube is not None:
+            # Mean sale per order line, recovered from the cube's sums
+            totals = rows[['sales', 'lines']].groupby(month_num).sum()
+            data = (totals['sales'] / totals['lines']).rename('sales').reset_index()
+        else:
+            data = rows['sales'].groupby(month_num).mean().reset_index()
+        data['month_name'] = pd.to_datetime(data['month_num'], format='%m').dt.month_name()
         
         fig = px.bar(data, x='month_name', y='sales', title='Average Monthly Sales Trend')
         return fig
 
-    def plot_forecast(self, history_df, forecast_df):
-        """Plot historical data and forecast."""
+    @profiled()
+    def plot_growth(self, rate='yoy', dimension='region', timeline=None):
+        """Growth rate (GrowthEngine column, e.g. 'mom', 'yoy', 'rolling_3') per month for each slice.
+
+        Pass a timeline already computed by GrowthEngine to avoid recomputing it.
+        """
+        if timeline is None:
+            if self._growth is None:
+                self._growth = GrowthEngine(self.df, self.cube)
+            dims = () if dimension == 'total' else tuple(dimension.split(' x '))
+            timeline = self._growth.timeline([dims])
+        data = timeline[timeline['dimension'] == dimension].dropna(subset=[rate])
+        data = data.assign(month=data['month'].dt.to_timestamp())
+        fig = px.line(data, x='month', y=rate, color='slice', template='plotly_white',
+                      title=f"{GROWTH_LABELS.get(rate, rate)} Growth by {dimension.title()} (%)")
+        fig.add_hline(y=0, line_dash='dot', line_color='grey')
+        fig.update_layout(hovermode="x unified", yaxis_ticksuffix='%')
+        return fig
+
+    @profiled()
+    def plot_forecast(self, history_df, forecast_df, max_points=MAX_LINE_POINTS, method='lttb', anomalies=None):
+        """Plot historical data and forecast, each downsampled to max_points.
+
+        anomalies: optional flagged points (e.g. AnomalyDetector.residual_outliers) to mark.
+        """
+        history_df = downsample_frame(history_df, 'index', 'sales', max_points, method)
+        forecast_df = downsample_frame(forecast_df, 'index', 'predicted', max_points, method)
         fig = go.Figure()
         
         # Historical
@@ -92,5 +211,6 @@ class Visualizer:
                 name='Confidence Interval'
             ))
             
+        self._add_anomaly_markers(fig, anomalies, name='Model outlier')
         fig.update_layout(title='Sales Forecast with Confidence Intervals')
         return fig
@@ -0,0 +1,11 @@
+-- Created after the bulk load; building them up front slows inserts.
+-- Covering index: date-range aggregates are answered from the index alone,
+-- without a table lookup per matching row.
+CREATE INDEX IF NOT EXISTS idx_sales_date_covering
+    ON sales(order_date, region, category, segment, sales, profit, quantity, order_id);
+CREATE INDEX IF NOT EXISTS idx_sales_region_date ON sales(region, order_date);
+CREATE INDEX IF NOT EXISTS idx_sales_category_date ON sales(category, order_date);
+CREATE INDEX IF NOT EXISTS idx_sales_segment_date ON sales(segment, order_date);
+CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id);
+CREATE INDEX IF NOT EXISTS idx_sales_product ON sales(product_id);
+CREATE INDEX IF NOT EXISTS idx_forecast_metric_date ON forecast_results(metric, forecast_date);
@@ -15,13 +15,24 @@ CREATE TABLE IF NOT EXISTS customers (
     postal_code TEXT
 );
 
+-- Dimension attributes are denormalized onto each order line so that
+-- date-range group-bys need no joins; customers/products hold the first
+-- record seen for each id.
 CREATE TABLE IF NOT EXISTS sales (
     order_id TEXT,
     order_date DATE,
     ship_date DATE,
     ship_mode TEXT,
     customer_id TEXT,
+    customer_name TEXT,
+    segment TEXT,
+    region TEXT,
+    state TEXT,
+    city TEXT,
     product_id TEXT,
+    category TEXT,
+    sub_category TEXT,
+    product_name TEXT,
     sales REAL,
     quantity INTEGER,
     discount REAL,
@@ -39,3 +50,8 @@ CREATE TABLE IF NOT EXISTS forecast_results (
     model_name TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+CREATE TABLE IF NOT EXISTS load_metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+from modules.loader import DataLoader
+from modules.kpi import KPIEngine
+from modules.visualization import Visualizer
+
+@pytest.fixture
+def csv_path(tmp_path):
+    dates = pd.date_range('2022-01-01', '2023-06-30', freq='D')
+    n = len(dates)
+    df = pd.DataFrame({
+        # Orders span two lines each, and one id repeats in a later month
+        'order_id': [f'O{i // 2}' for i in range(n - 1)] + ['O0'],
+        'order_date': dates.strftime('%Y-%m-%d'),
+        'ship_date': dates.strftime('%Y-%m-%d'),
+        'region': ['North', 'South', 'East'] * (n // 3) + ['West'] * (n % 3),
+        'category': ['Furniture', 'Technology'] * (n // 2) + ['Furniture'] * (n % 2),
+        'sales': [float(i % 50 + 1) for i in range(n)],
+        'profit': [float(i % 7) for i in range(n)],
+        'quantity': [i % 5 + 1 for i in range(n)]
+    })
+    path = tmp_path / 'orders.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+def test_streamed_aggregates_match_in_memory(csv_path):
+    loader = DataLoader(csv_path, use_cache=False)
+    df = loader.load_data()
+    loader.stream_data(chunksize=37)
+
+    expected = loader.get_monthly_aggregated(df)
+    streamed = loader.get_monthly_aggregated()
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+def test_streamed_sales_are_filled_with_the_file_mean(csv_path, tmp_path):
+    raw = pd.read_csv(csv_path)
+    # Gaps early and late in the file, where a running mean would differ
+    raw.loc[[3, 40, len(raw) - 5], 'sales'] = None
+    path = str(tmp_path / 'gaps.csv')
+    raw.to_csv(path, index=False)
+
+    loader = DataLoader(path, use_cache=False)
+    expected = loader.load_data()['sales'].sum()
+    assert loader.stream_data(chunksize=37).totals()['sales'] == pytest.approx(expected)
+
+def test_kpi_engine_answers_from_aggregates(csv_path):
+    loader = DataLoader(csv_path, use_cache=False)
+    df = loader.load_data()
+    aggregates = loader.stream_data(chunksize=50)
+
+    in_memory = KPIEngine(df)
+    streamed = KPIEngine(aggregates=aggregates)
+
+    assert streamed.calculate_kpis() == pytest.approx(in_memory.calculate_kpis())
+    assert streamed.calculate_growth() == pytest.approx(in_memory.calculate_growth())
+    pd.testing.assert_frame_equal(
+        streamed.get_region_performance().reset_index(drop=True),
+        in_memory.get_region_performance().reset_index(drop=True).astype({'region': str}),
+        check_dtype=False
+    )
+
+@pytest.mark.parametrize('method', ['plot_sales_over_time', 'plot_profit_over_time',
+                                    'plot_category_sales', 'plot_region_map'])
+def test_visualizer_charts_from_aggregates(csv_path, method):
+    loader = DataLoader(csv_path, use_cache=False)
+    df = loader.load_data()
+    streamed = getattr(Visualizer(aggregates=loader.stream_data(chunksize=50)), method)()
+    in_memory = getattr(Visualizer(df), method)()
+    for raw, agg in zip(in_memory.data, streamed.data):
+        for axis in ('x', 'y', 'values', 'labels'):
+            if getattr(raw, axis, None) is not None:
+                assert sorted(map(str, getattr(agg, axis))) == sorted(map(str, getattr(raw, axis)))
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from modules.ai_engine import AIEngine, InsightCache
+
+class MockCompletions(BaseHTTPRequestHandler):
+    """OpenAI-style /chat/completions that echoes the prompt type it was asked about."""
+
+    def do_POST(self):
+        state = self.server.state
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with state['lock']:
+            state['requests'] += 1
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            failures_left = state['fail_with']
+            if failures_left:
+                state['fail_with'] = failures_left[1:]
+        time.sleep(state['delay'])
+        with state['lock']:
+            state['in_flight'] -= 1
+
+        if failures_left:
+            self.send_response(failures_left[0])
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        prompt = body['messages'][-1]['content']
+        payload = json.dumps({'choices': [{'message': {'content': f"  insight for: {prompt[:20]}  "}}]})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def mock_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockCompletions)
+    server.state = {'requests': 0, 'in_flight': 0, 'max_in_flight': 0, 'delay': 0.0, 'fail_with': [],
+                    'lock': threading.Lock()}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def engine_factory(mock_server, tmp_path):
+    base_url = f"http://127.0.0.1:{mock_server.server_address[1]}/v1"
+    return lambda **kwargs: AIEngine('test-key', base_url=base_url, cache_dir=str(tmp_path), **kwargs)
+
+def test_repeat_insight_is_served_from_disk_cache(mock_server, engine_factory):
+    first = engine_factory().generate_insight({'total_sales': 100.0}, 'executive_summary')
+    assert first.startswith('insight for: Analyze this sales')
+
+    # A fresh engine (e.g. after a restart) answers without calling the API
+    again = engine_factory().generate_insight({'total_sales': 100.0}, 'executive_summary')
+    assert again == first
+    assert mock_server.state['requests'] == 1
+
+def test_identical_concurrent_requests_are_coalesced(mock_server, engine_factory):
+    mock_server.state['delay'] = 0.3
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        engine_factory().generate_insight('same context', 'trend_summary'))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results)) == 1 and len(results) == 5
+    assert mock_server.state['requests'] == 1
+
+def test_batch_runs_insight_types_concurrently(mock_server, engine_factory):
+    mock_server.state['delay'] = 0.3
+    insights = engine_factory().generate_insights({
+        'executive_summary': 'a', 'trend_summary': 'b', 'region_performance': 'c'})
+    assert set(insights) == {'executive_summary', 'trend_summary', 'region_performance'}
+    assert mock_server.state['requests'] == 3
+    # All three were open at the server at the same time
+    assert mock_server.state['max_in_flight'] == 3
+
+def test_transient_errors_are_retried_and_client_errors_are_not_cached(mock_server, engine_factory):
+    mock_server.state['fail_with'] = [503, 429]
+    assert engine_factory().generate_insight('ctx').startswith('insight for:')
+    assert mock_server.state['requests'] == 3
+
+    mock_server.state['fail_with'] = [401]
+    engine = engine_factory()
+    assert engine.generate_insight('other').startswith('Error generating insight')
+    assert engine.generate_insight('other').startswith('insight for:')
+
+def test_missing_key_disables_insights(monkeypatch, tmp_path):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    assert 'unavailable' in AIEngine(cache_dir=str(tmp_path)).generate_insight('ctx')
+
+def test_insight_cache_keeps_recent_entries_in_memory(tmp_path):
+    cache = InsightCache(str(tmp_path), max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, f'text {key}')
+    assert len(cache._entries) == 2 and 'a' not in cache._entries
+    # Evicted from memory, still served from disk
+    assert cache.get('a') == 'text a'
+    assert 'a' in cache._entries and 'b' not in cache._entries
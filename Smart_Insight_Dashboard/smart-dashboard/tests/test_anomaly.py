@@ -0,0 +1,68 @@
+import time
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from modules.anomaly import AnomalyDetector, rolling_scores
+from modules.visualization import Visualizer
+
+def make_monthly(n_slices, months=48, seed=0):
+    """One row per slice and month: seasonal sales with mild noise."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2020-01-01', periods=months, freq='MS')
+    slices = [f"S{i}" for i in range(n_slices)]
+    season = 1 + 0.2 * np.sin(np.arange(months) * 2 * np.pi / 12)
+    sales = rng.uniform(100, 1000, (n_slices, 1)) * season * rng.normal(1, 0.03, (n_slices, months))
+    return pd.DataFrame({
+        'order_date': np.tile(dates, n_slices),
+        'region': np.repeat(slices, months),
+        'sales': sales.ravel(),
+        'profit': sales.ravel() * 0.1
+    })
+
+def test_injected_spike_is_the_top_anomaly():
+    df = make_monthly(50)
+    spike = (df['region'] == 'S7') & (df['order_date'] == '2022-06-01')
+    df.loc[spike, 'sales'] *= 3
+
+    flagged = AnomalyDetector(df).detect(dimensions=[('region',)])
+    top = flagged.iloc[0]
+    assert (top['slice'], top['order_date']) == ('S7', pd.Timestamp('2022-06-30'))
+    assert top['score'] > 10
+    assert len(flagged) < 10
+
+def test_vectorized_scores_match_a_per_series_loop():
+    values = np.random.default_rng(1).gamma(2, 100, (60, 5))
+    expected, score = rolling_scores(values, 12)
+    column = pd.Series(values[:, 3])
+    for t in (12, 30, 59):
+        history = column.iloc[t - 12:t]
+        median = history.median()
+        mad = (history - median).abs().median() * 1.4826
+        assert np.isclose(expected[t, 3], median)
+        assert np.isclose(score[t, 3], (column[t] - median) / mad)
+    assert np.isnan(score[:12]).all()
+
+def test_thousands_of_slices_score_in_well_under_a_second():
+    df = make_monthly(3000)
+    detector = AnomalyDetector(df)
+    detector.detect(dimensions=[('region',)])
+    start = time.perf_counter()
+    detector.detect(dimensions=[(), ('region',)])
+    assert time.perf_counter() - start < 0.5
+
+def test_residual_outliers_skip_burn_in():
+    dates = pd.date_range('2020-01-31', periods=40, freq='M')
+    resid = pd.Series(np.random.default_rng(2).normal(0, 10, 40), index=dates)
+    resid.iloc[0], resid.iloc[25] = 5000, 400
+    results = SimpleNamespace(resid=resid, fittedvalues=pd.Series(1000.0, index=dates), loglikelihood_burn=13)
+
+    flagged = AnomalyDetector(None).residual_outliers(results)
+    assert flagged['order_date'].tolist() == [dates[25]]
+    assert flagged['value'].iloc[0] == 1400
+
+def test_sales_chart_marks_anomalies():
+    df = make_monthly(1)
+    df.loc[30, 'sales'] *= 4
+    fig = Visualizer(df).plot_sales_over_time(anomalies=True)
+    markers = [trace for trace in fig.data if trace.mode == 'markers']
+    assert len(markers) == 1 and len(markers[0].x) == 1
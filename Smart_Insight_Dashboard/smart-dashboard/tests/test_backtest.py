@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.backtest import Backtester, error_metrics, rolling_origins, trend_predictions
+from modules.forecasting import ForecastEngine, fit_trends
+
+@pytest.fixture
+def regional_df():
+    """Daily sales for 4 years: monthly totals on a straight line in North, seasonal in South."""
+    dates = pd.date_range('2020-01-01', '2023-12-31', freq='D')
+    months = (dates.year - 2020) * 12 + dates.month
+    rng = np.random.default_rng(1)
+    north = pd.DataFrame({'order_date': dates, 'region': 'North',
+                          'sales': (1000 + 50 * months) / dates.days_in_month})
+    south = pd.DataFrame({'order_date': dates, 'region': 'South',
+                          'sales': 80 + 40 * np.sin(2 * np.pi * dates.month / 12) + rng.normal(0, 2, len(dates))})
+    df = pd.concat([north, south]).sort_values('order_date', kind='stable', ignore_index=True)
+    return df.assign(region=df['region'].astype('category'), profit=0.0)
+
+def test_fit_trends_matches_polyfit():
+    rng = np.random.default_rng(0)
+    x = np.arange(737000, 737048, dtype='float64')
+    values = rng.normal(100, 10, (48, 5)) + np.arange(48)[:, None] * [1, 2, 3, 4, 5]
+    slope, intercept = fit_trends(x, values)
+    for j in range(5):
+        assert np.polyfit(x, values[:, j], 1) == pytest.approx([slope[j], intercept[j]], rel=1e-6)
+
+def test_linear_trend_is_least_squares_on_ordinals(regional_df):
+    engine = ForecastEngine(regional_df)
+    data = engine.prepare_data().reset_index()
+    coeffs = np.polyfit(data['order_date'].map(pd.Timestamp.toordinal), data['sales'], 1)
+    trend = engine.linear_trend(periods=3)
+    ordinals = [d.toordinal() for d in trend.index]
+    assert trend['trend'].to_numpy() == pytest.approx(np.polyval(coeffs, ordinals))
+
+def test_batched_trend_predictions_match_per_origin_fits():
+    rng = np.random.default_rng(2)
+    x = np.cumsum(rng.integers(28, 32, 40)).astype('float64') + 737000
+    values = rng.normal(100, 20, (40, 3))
+    origins = rolling_origins(40, horizon=4, n_origins=3)
+    assert list(origins) == [34, 35, 36]
+    predicted = trend_predictions(x, values, origins, horizon=4)
+    for i, origin in enumerate(origins):
+        for j in range(3):
+            coeffs = np.polyfit(x[:origin], values[:origin, j], 1)
+            assert predicted[i, :, j] == pytest.approx(np.polyval(coeffs, x[origin:origin + 4]))
+
+def test_error_metrics_skip_zero_actuals():
+    actual = np.array([[[100.0], [0.0]]])
+    predicted = np.array([[[110.0], [5.0]]])
+    mape, rmse = error_metrics(actual, predicted)
+    assert mape[0, 0] == pytest.approx(10.0) and np.isnan(mape[1, 0])
+    assert rmse[:, 0] == pytest.approx([10.0, 5.0])
+
+def test_backtest_scores_both_models_per_slice(regional_df):
+    backtester = Backtester(regional_df)
+    scores = backtester.run(dimensions=[(), ('region',)], horizon=3, n_origins=2, max_workers=2)
+    assert set(scores['model']) == {'trend', 'sarima'}
+    assert len(scores) == 2 * 3 * 3  # models x slices x horizons
+    assert (scores['origins'] == 2).all()
+
+    north = scores[scores['slice'] == 'North'].set_index(['model', 'horizon'])
+    assert north.loc['trend', 'mape'].max() < 2.0
+    best = Backtester.best_models(scores).set_index('slice')['model']
+    assert best['South'] == 'sarima'
+
+def test_backtest_needs_enough_history(regional_df):
+    short = regional_df[regional_df['order_date'] < '2021-06-01']
+    assert Backtester(short).run(models=('trend',), dimensions=[()]).empty
@@ -0,0 +1,60 @@
+import pandas as pd
+from modules.cache import ResultCache, CachedEngine
+
+class CountingEngine:
+    instances = 0
+
+    def __init__(self, df):
+        CountingEngine.instances += 1
+        self.df = df
+        self.calls = 0
+
+    def total(self, column='sales'):
+        self.calls += 1
+        return self.df[column].sum()
+
+    def with_frame(self, other):
+        return len(other)
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+
+    frame = pd.DataFrame({'x': range(1000)})
+    limit = int(frame.memory_usage(deep=True).sum() * 1.5)
+    cache = ResultCache(max_bytes=limit)
+    cache.put('first', frame)
+    cache.put('second', frame.copy())
+    assert 'first' not in cache and 'second' in cache
+    assert cache.size_bytes <= limit
+
+def test_cached_engine_memoizes_per_scope_and_args():
+    cache = ResultCache()
+    df = pd.DataFrame({'sales': [1, 2, 3], 'profit': [1, 1, 1]})
+    CountingEngine.instances = 0
+
+    engine = CachedEngine(cache, ('data', '2023-01-01'), CountingEngine, df)
+    assert engine.total() == 6
+    assert engine.total() == 6
+    assert engine.total(column='profit') == 3
+    assert engine.engine.calls == 2
+
+    # A new proxy for the same scope (i.e. the next rerun) never builds its engine
+    rerun = CachedEngine(cache, ('data', '2023-01-01'), CountingEngine, df)
+    assert rerun.total() == 6
+    assert CountingEngine.instances == 1
+
+    other_scope = CachedEngine(cache, ('data', '2024-01-01'), CountingEngine, df)
+    assert other_scope.total() == 6
+    assert CountingEngine.instances == 2
+    assert cache.stats()['hits'] == 2
+
+def test_unhashable_arguments_bypass_cache():
+    cache = ResultCache()
+    engine = CachedEngine(cache, 'scope', CountingEngine, pd.DataFrame({'sales': [1]}))
+    assert engine.with_frame(pd.DataFrame({'a': [1, 2]})) == 2
+    assert len(cache) == 0
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+from modules.context import ContextBuilder, SECTIONS, estimate_tokens
+from modules.cube import SalesCube
+from modules.loader import DataLoader
+from modules.synthetic import SyntheticGenerator
+
+def make_df(n_rows):
+    return DataLoader()._preprocess(SyntheticGenerator(n_rows, seed=1).generate())
+
+@pytest.fixture(scope='module')
+def sample_df():
+    return make_df(20_000)
+
+@pytest.mark.parametrize('prompt_type', list(SECTIONS))
+def test_digest_fits_token_budget(sample_df, prompt_type):
+    digest = ContextBuilder(sample_df).build(prompt_type, token_budget=120)
+    assert 0 < estimate_tokens(digest) <= 120
+    assert 'nan' not in digest
+
+def test_digest_size_does_not_grow_with_rows(sample_df):
+    small = ContextBuilder(sample_df).build('executive_summary')
+    large = ContextBuilder(make_df(200_000)).build('executive_summary')
+    assert abs(len(large) - len(small)) < 0.2 * len(small)
+    assert estimate_tokens(large) < estimate_tokens(sample_df.describe().to_string())
+
+def test_cube_and_raw_rows_give_the_same_digest(sample_df):
+    # Ship the last line of every multi-line order a day later, so orders span two days
+    df = sample_df.copy()
+    last_line = df['order_id'].duplicated() & ~df['order_id'].duplicated(keep='last')
+    assert last_line.any()
+    df.loc[last_line, 'order_date'] += pd.Timedelta(days=1)
+    df = df.sort_values('order_date', kind='stable', ignore_index=True)
+
+    cube = SalesCube.from_frame(df)
+    for prompt_type in ['executive_summary', 'trend_summary', 'category_insights']:
+        assert ContextBuilder(df, cube=cube).build(prompt_type) == ContextBuilder(df).build(prompt_type)
+
+def test_outlier_month_is_flagged(sample_df):
+    df = sample_df.copy()
+    spike = df['order_date'].dt.to_period('M') == pd.Period('2023-06', 'M')
+    df.loc[spike, 'sales'] *= 10
+    assert ContextBuilder(df).outliers()[0].startswith('Outlier months: 2023-06')
+    assert '2023-06' in ContextBuilder(df).build('anomaly_detection').splitlines()[0]
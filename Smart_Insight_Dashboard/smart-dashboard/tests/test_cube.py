@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.cube import SalesCube
+from modules.kpi import KPIEngine
+from modules.visualization import Visualizer
+from modules.utils import filter_data_by_date
+
+@pytest.fixture
+def sample_df():
+    rng = np.random.default_rng(0)
+    n = 2000
+    dates = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 730, n), unit='D')
+    df = pd.DataFrame({
+        'order_date': dates,
+        'region': rng.choice(['North', 'South', 'East', 'West'], n),
+        'category': rng.choice(['Furniture', 'Technology'], n),
+        'sub_category': rng.choice(['Chairs', 'Phones'], n),
+        'segment': rng.choice(['Consumer', 'Corporate'], n),
+        'ship_mode': rng.choice(['First Class', 'Same Day'], n),
+        'sales': rng.uniform(10, 500, n).round(2),
+        'profit': rng.uniform(-50, 100, n).round(2),
+        'quantity': rng.integers(1, 10, n)
+    }).sort_values('order_date', ignore_index=True)
+    # Multi-line orders: consecutive lines on the same day share an id
+    df['order_id'] = 'O' + (df['order_date'].ne(df['order_date'].shift()).cumsum() * 10
+                            + df.index % 3 // 2).astype(str)
+    return df.astype({c: 'category' for c in ['region', 'category', 'sub_category', 'segment', 'ship_mode']})
+
+def test_cube_is_smaller_and_lossless_for_kpis(sample_df):
+    cube = SalesCube.from_frame(sample_df)
+    assert len(cube) < len(sample_df)
+
+    raw = KPIEngine(sample_df)
+    cubed = KPIEngine(sample_df, cube=cube)
+    assert cubed.calculate_kpis() == pytest.approx(raw.calculate_kpis())
+    assert cubed.calculate_growth() == pytest.approx(raw.calculate_growth())
+    pd.testing.assert_frame_equal(cubed.get_region_performance(), raw.get_region_performance(),
+                                  check_dtype=False)
+
+def test_orders_spanning_days_are_counted_once():
+    df = pd.DataFrame({
+        'order_date': pd.to_datetime(['2022-01-02', '2022-01-01', '2022-01-02', '2022-01-03']),
+        'order_id': ['A', 'A', 'B', 'A'],
+        'region': ['East', 'East', 'West', 'East'],
+        'sales': [10.0, 20.0, 30.0, 40.0],
+        'profit': [1.0, 2.0, 3.0, 4.0]
+    })
+    for rows in (df, df.sort_values('order_date', ignore_index=True)):
+        cube = SalesCube.from_frame(rows)
+        assert cube.totals()['orders'] == 2
+        assert cube.frame.groupby('order_date')['orders'].sum().tolist() == [1, 1, 0]
+        assert KPIEngine(rows, cube=cube).calculate_kpis() == pytest.approx(
+            KPIEngine(rows).calculate_kpis())
+
+    # Late lines of an order the cube already holds re-count that order
+    first, later = df[df['order_date'] == '2022-01-01'], df[df['order_date'] > '2022-01-01']
+    appended = SalesCube.from_frame(first).append(later, existing=first)
+    full = SalesCube.from_frame(df)
+    pd.testing.assert_frame_equal(appended.frame, full.frame, check_dtype=False, check_categorical=False)
+    assert appended.slice('2022-01-02', '2022-01-03').totals()['orders'] == 2
+
+def test_slice_counts_orders_that_started_before_the_range(sample_df):
+    # Ship the last line of every multi-line order a day later, so orders straddle day boundaries
+    df = sample_df.copy()
+    last_line = df['order_id'].duplicated() & ~df['order_id'].duplicated(keep='last')
+    df.loc[last_line, 'order_date'] += pd.Timedelta(days=1)
+    df = df.sort_values('order_date', kind='stable', ignore_index=True)
+    cube = SalesCube.from_frame(df)
+    assert len(cube.repeats) == last_line.sum()
+
+    for start, end in [('2022-03-01', '2022-06-30'), ('2023-01-15', '2023-02-20')]:
+        start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        filtered = filter_data_by_date(df, start, end)
+        sliced = cube.slice(start, end)
+        assert sliced.totals()['orders'] == filtered['order_id'].nunique()
+        assert KPIEngine(filtered, cube=sliced).calculate_kpis() == pytest.approx(
+            KPIEngine(filtered).calculate_kpis())
+        pd.testing.assert_frame_equal(sliced.frame.reset_index(drop=True),
+                                      SalesCube.from_frame(filtered).frame, check_dtype=False)
+        # Slicing a slice applies the same rule at the new start
+        inner_start = start + pd.Timedelta(days=20)
+        inner = filter_data_by_date(df, inner_start, end)
+        assert sliced.slice(inner_start, end).totals()['orders'] == inner['order_id'].nunique()
+
+def test_cube_slice_matches_date_filter(sample_df):
+    cube = SalesCube.from_frame(sample_df)
+    start, end = pd.Timestamp('2022-03-15').date(), pd.Timestamp('2023-02-01').date()
+
+    sliced = KPIEngine(None, cube=cube.slice(start, end)).calculate_kpis()
+    filtered = KPIEngine(filter_data_by_date(sample_df, start, end)).calculate_kpis()
+    assert sliced == pytest.approx(filtered)
+
+def _trace_arrays(fig):
+    arrays = []
+    for trace in fig.data:
+        for axis in ('x', 'y', 'z', 'values', 'labels'):
+            values = getattr(trace, axis, None)
+            if values is not None:
+                arrays.append(np.asarray(values))
+    return arrays
+
+@pytest.mark.parametrize('method', [
+    'plot_sales_over_time', 'plot_profit_over_time', 'plot_category_sales',
+    'plot_region_map', 'plot_profitability_heatmap', 'plot_monthly_trends'
+])
+def test_visualizer_charts_match_raw(sample_df, method):
+    raw_fig = getattr(Visualizer(sample_df), method)()
+    cube_fig = getattr(Visualizer(sample_df, cube=SalesCube.from_frame(sample_df)), method)()
+
+    for raw, cubed in zip(_trace_arrays(raw_fig), _trace_arrays(cube_fig)):
+        if raw.dtype.kind in 'fi':
+            np.testing.assert_allclose(cubed, raw)
+        else:
+            np.testing.assert_array_equal(cubed, raw)
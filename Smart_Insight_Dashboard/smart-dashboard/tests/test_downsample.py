@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from modules.downsample import (density_grid, lttb_indices, minmax_indices, page_count, page_frame,
+                                stratified_sample)
+from modules.visualization import Visualizer
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    category = np.where(np.arange(n) < 20, 'Rare', rng.choice(['Furniture', 'Technology'], n))
+    return pd.DataFrame({
+        'category': category,
+        'discount': rng.choice([0, 0.1, 0.2], n),
+        'sales': rng.uniform(10, 1000, n)
+    })
+
+def test_stratified_sample_caps_rows_and_keeps_every_group():
+    df = make_rows(100_000)
+    sample = stratified_sample(df, 'category', 1_000)
+
+    assert len(sample) <= 1_000 + df['category'].nunique()
+    assert set(sample['category']) == set(df['category'])
+    assert sample.index.is_monotonic_increasing
+    shares = sample['category'].value_counts(normalize=True)
+    expected = df['category'].value_counts(normalize=True)
+    assert abs(shares['Furniture'] - expected['Furniture']) < 0.02
+
+def test_density_grid_counts_every_row_with_one_bin_per_discount_level():
+    df = make_rows(10_000)
+    counts, x, y = density_grid(df, 'discount', 'sales', bins=20)
+
+    assert counts.sum() == len(df)
+    np.testing.assert_allclose(x, [0, 0.1, 0.2])
+    assert counts.shape == (20, 3)
+
+def test_large_scatter_sends_a_bounded_number_of_points():
+    df = make_rows(50_000)
+    fig = Visualizer(df).plot_discount_vs_sales(max_points=2_000)
+    assert sum(len(trace.x) for trace in fig.data) <= 2_000 + 3
+
+    fig = Visualizer(df).plot_discount_vs_sales(max_points=2_000, mode='density')
+    assert fig.data[0].type == 'heatmap'
+
+def test_page_frame_clamps_to_valid_pages():
+    df = make_rows(2_500)
+    assert page_count(len(df), 1_000) == 3
+    assert len(page_frame(df, 3, 1_000)) == 500
+    pd.testing.assert_frame_equal(page_frame(df, 99, 1_000), page_frame(df, 3, 1_000))
+    assert page_frame(df, 0, 1_000).index[0] == 0
+
+def test_lttb_and_minmax_keep_spikes_and_cap_points():
+    n = 50_000
+    y = np.sin(np.arange(n) / 500.0)
+    y[12_345], y[40_000] = 25.0, -25.0
+    x = pd.date_range('2020-01-01', periods=n, freq='h').to_numpy()
+
+    for positions in (lttb_indices(x, y, 500), minmax_indices(y, 500)):
+        assert len(positions) <= 500
+        assert (np.diff(positions) > 0).all()
+        assert {12_345, 40_000} <= set(positions)
+    assert lttb_indices(x, y, 500)[[0, -1]].tolist() == [0, n - 1]
+
+def test_daily_sales_chart_is_capped():
+    days = pd.date_range('2000-01-01', periods=10_000, freq='D')
+    df = pd.DataFrame({'order_date': days, 'sales': np.arange(10_000.0)})
+    fig = Visualizer(df).plot_sales_over_time(freq='D', max_points=1_000)
+    assert len(fig.data[0].x) == 1_000
@@ -0,0 +1,138 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from modules import forecasting
+from modules.forecasting import ForecastEngine
+from modules.model_store import ModelStore
+
+@pytest.fixture
+def monthly_df():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range('2020-01-01', '2023-12-31', freq='D')
+    seasonal = 100 + 30 * np.sin(2 * np.pi * dates.month / 12)
+    return pd.DataFrame({'order_date': dates, 'sales': seasonal + rng.normal(0, 5, len(dates))})
+
+@pytest.fixture
+def count_fits(monkeypatch):
+    calls = []
+    original = SARIMAX.fit
+
+    def counting_fit(self, *args, **kwargs):
+        calls.append(1)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(SARIMAX, 'fit', counting_fit)
+    return calls
+
+def test_fit_is_reused_across_horizons_and_restarts(monthly_df, tmp_path, count_fits):
+    engine = ForecastEngine(monthly_df, model_store=ModelStore(str(tmp_path)))
+    short = engine.sarima_forecast(periods=3)
+    long = engine.sarima_forecast(periods=12)
+    assert len(short) == 3 and len(long) == 12
+    pd.testing.assert_frame_equal(short, long.iloc[:3])
+    assert len(count_fits) == 1
+
+    # A fresh process: new in-memory store over the same directory
+    restarted = ForecastEngine(monthly_df, model_store=ModelStore(str(tmp_path)))
+    pd.testing.assert_frame_equal(restarted.sarima_forecast(periods=12), long)
+    assert len(count_fits) == 1
+
+    # Different data is a different series fingerprint: refit
+    changed = monthly_df.assign(sales=monthly_df['sales'] * 2)
+    ForecastEngine(changed, model_store=ModelStore(str(tmp_path))).sarima_forecast(periods=3)
+    assert len(count_fits) == 2
+
+def test_model_store_is_bounded(tmp_path):
+    store = ModelStore(str(tmp_path), max_models=2, max_files=3, max_age=3600)
+    for i in range(5):
+        store.put(f'k{i}', {'model': i})
+    assert len(store._models) == 2 and 'k4' in store._models and 'k0' not in store._models
+    assert len(list(tmp_path.glob('*.pkl'))) == 3
+
+    # Evicted from memory but still on disk; then an old pickle ages out
+    assert store.get('k2') == {'model': 2}
+    os.utime(store._path('k3'), (0, 0))
+    store.put('k5', {'model': 5})
+    assert store.get('k3') is None and store.get('k2') == {'model': 2}
+    assert len(list(tmp_path.glob('*.pkl'))) == 3
+
+def test_background_fits_are_coalesced(monthly_df, tmp_path, count_fits):
+    store = ModelStore(str(tmp_path))
+    first = ForecastEngine(monthly_df, model_store=store).fit_sarima_async()
+    second = ForecastEngine(monthly_df, model_store=store).fit_sarima_async()
+    results = first.result(timeout=60)
+    assert second.result(timeout=60) is results
+    assert len(count_fits) == 1
+
+    cached = ForecastEngine(monthly_df, model_store=store).fit_sarima_async()
+    assert cached.done() and cached.result() is results
+
+def test_auto_order_fit_is_done_once_cached(monthly_df, tmp_path, monkeypatch):
+    # Cheap deterministic search: the simplest order wins
+    monkeypatch.setattr(forecasting, 'available_cpus', lambda: 1)
+    monkeypatch.setattr(forecasting, '_score_order_worker',
+                        lambda series, order, seasonal, *a: float(sum(order) + sum(seasonal[:3])))
+    store = ModelStore(str(tmp_path))
+    first = ForecastEngine(monthly_df, model_store=store).fit_sarima_async(order='auto')
+    results = first.result(timeout=60)
+    assert results.model.order == (0, 1, 0)
+
+    second = ForecastEngine(monthly_df, model_store=store).fit_sarima_async(order='auto')
+    assert second.done() and second.result() is results
+
+@pytest.fixture
+def regional_df(monthly_df):
+    regions = np.where(np.arange(len(monthly_df)) % 2 == 0, 'North', 'South')
+    return monthly_df.assign(region=regions)
+
+def test_batch_forecast_returns_tidy_frame(regional_df, tmp_path):
+    engine = ForecastEngine(regional_df, model_store=ModelStore(str(tmp_path)))
+    batch = engine.batch_forecast(dimensions=[('region',)], periods=6, max_workers=2)
+
+    assert batch.attrs['failures'] == {}
+    assert set(batch['slice']) == {'North', 'South'}
+    assert (batch.groupby('slice').size() == 6).all()
+    assert {'predicted', 'lower_ci', 'upper_ci', 'region'} <= set(batch.columns)
+
+    # A slice's rows are a forecast frame, and the fits were cached for reuse
+    north = batch[batch['slice'] == 'North']
+    single = ForecastEngine(regional_df[regional_df['region'] == 'North'],
+                            model_store=engine.model_store).sarima_forecast(periods=6)
+    np.testing.assert_allclose(north['predicted'], single['predicted'])
+
+def test_batch_forecast_isolates_failures(regional_df, tmp_path):
+    engine = ForecastEngine(regional_df, model_store=ModelStore(str(tmp_path)))
+    batch = engine.batch_forecast(dimensions=[('region',)], periods=6, max_workers=2, timeout=0.01)
+
+    assert batch.empty
+    assert batch.attrs['failures'] == {'North': 'timeout', 'South': 'timeout'}
+
+def test_select_order_picks_from_grid_and_is_cached(monthly_df, tmp_path, monkeypatch):
+    grid = {'p': (0, 1), 'd': (1,), 'q': (0, 1), 'P': (0,), 'D': (1,), 'Q': (0,), 's': (12,)}
+    store = ModelStore(str(tmp_path))
+    order, seasonal_order = ForecastEngine(monthly_df, model_store=store).select_order(
+        grid=grid, max_workers=1)
+    assert (order, seasonal_order) in forecasting.order_candidates(grid)
+
+    # A fresh store on the same directory answers without searching again
+    monkeypatch.setattr(forecasting, '_score_order_worker', lambda *a: pytest.fail('searched'))
+    engine = ForecastEngine(monthly_df, model_store=ModelStore(str(tmp_path)))
+    assert engine.select_order(grid=grid, max_workers=1) == (order, seasonal_order)
+
+def test_select_order_falls_back_when_every_candidate_fails(monthly_df, tmp_path, monkeypatch):
+    monkeypatch.setattr(forecasting, '_score_order_worker', lambda *a: math.inf)
+    engine = ForecastEngine(monthly_df, model_store=ModelStore(str(tmp_path)))
+    assert engine.select_order(max_workers=1) == (forecasting.DEFAULT_ORDER,
+                                                 forecasting.DEFAULT_SEASONAL_ORDER)
+
+def test_select_order_keeps_previous_round_when_a_round_fails(monthly_df, tmp_path, monkeypatch):
+    last = forecasting.ORDER_SEARCH_BUDGETS[-1]
+    monkeypatch.setattr(forecasting, '_score_order_worker',
+                        lambda series, order, seasonal, criterion, holdout, maxiter:
+                        math.inf if maxiter == last else float(sum(order)))
+    engine = ForecastEngine(monthly_df, model_store=ModelStore(str(tmp_path)))
+    order, seasonal_order = engine.select_order(max_workers=1)
+    assert order == (0, 1, 0)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.cache import CachedEngine, ResultCache
+from modules.context import ContextBuilder
+from modules.cube import SalesCube
+from modules.growth import GrowthEngine, growth_rates
+from modules.kpi import KPIEngine
+from modules.synthetic import SyntheticGenerator
+
+@pytest.fixture(scope='module')
+def sample_df():
+    return SyntheticGenerator(20_000, seed=5).generate().sort_values('order_date', ignore_index=True)
+
+def test_growth_rates_are_calendar_offsets():
+    values = np.arange(1, 25, dtype='float64')[:, None]
+    rates = growth_rates(values)
+    assert rates['mom'][1, 0] == pytest.approx(100.0)
+    assert np.isnan(rates['yoy'][11, 0]) and rates['yoy'][12, 0] == pytest.approx((13 / 1 - 1) * 100)
+    assert rates['qoq'][3, 0] == pytest.approx(300.0)
+    # Months 4-6 (sum 15) against months 1-3 (sum 6)
+    assert np.isnan(rates['rolling_3'][4, 0]) and rates['rolling_3'][5, 0] == pytest.approx(150.0)
+
+def test_missing_months_are_not_skipped():
+    df = pd.DataFrame({
+        'order_date': pd.to_datetime(['2022-03-10', '2023-01-05', '2023-03-05']),
+        'sales': [50.0, 100.0, 150.0],
+        'profit': [0.0, 0.0, 0.0],
+        'order_id': ['A', 'B', 'C']
+    })
+    growth = KPIEngine(df).calculate_growth()
+    # February 2023 had no sales: MoM is undefined rather than March vs January
+    assert growth['mom_growth'] == 0
+    assert growth['yoy_growth'] == pytest.approx(200.0)
+
+def test_timeline_matches_per_slice_pct_change(sample_df):
+    cube = SalesCube.from_frame(sample_df)
+    timeline = GrowthEngine(sample_df, cube).timeline()
+    assert set(timeline['dimension']) == {'total', 'region', 'category', 'segment'}
+
+    east = timeline[(timeline['dimension'] == 'region') & (timeline['slice'] == 'East')].set_index('month')
+    monthly = sample_df[sample_df['region'] == 'East'].groupby(
+        sample_df['order_date'].dt.to_period('M'))['sales'].sum()
+    monthly = monthly.reindex(pd.period_range(monthly.index.min(), timeline['month'].max(), freq='M'),
+                              fill_value=0)
+    expected = monthly.pct_change(12, fill_method=None) * 100
+    pd.testing.assert_series_equal(east['yoy'].loc[expected.index], expected, check_names=False)
+    rolling = monthly.rolling(3).sum()
+    pd.testing.assert_series_equal(east['rolling_3'].loc[rolling.index],
+                                   (rolling / rolling.shift(3) - 1) * 100, check_names=False)
+
+def test_timeline_is_cached_and_cube_matches_raw(sample_df):
+    engine = GrowthEngine(sample_df, SalesCube.from_frame(sample_df))
+    assert engine.timeline() is engine.timeline()
+    pd.testing.assert_frame_equal(engine.timeline(), GrowthEngine(sample_df).timeline())
+    latest = engine.latest('region', 'West')
+    assert latest['month'] == engine.timeline()['month'].max()
+    assert len(engine.slice_latest()) == engine.timeline().groupby(['dimension', 'slice']).ngroups
+
+def test_engines_share_an_injected_growth_engine(sample_df):
+    cube = SalesCube.from_frame(sample_df)
+    cache = ResultCache()
+    growth = CachedEngine(cache, 'range', GrowthEngine, sample_df, cube=cube)
+
+    kpis = KPIEngine(sample_df, cube=cube, growth=growth).calculate_growth()
+    digest = ContextBuilder(sample_df, cube, growth=growth).growth()
+    # latest() ran once; the second caller was served from the shared cache
+    assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+    assert kpis == KPIEngine(sample_df, cube=cube).calculate_growth()
+    assert digest == ContextBuilder(sample_df, cube).growth()
@@ -0,0 +1,41 @@
+import os
+import re
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Third-party packages every page needs anyway; imported first so they are
+# not charged to the dashboard modules.
+BASELINE = ['numpy', 'pandas', 'plotly.express', 'plotly.graph_objects']
+# Only the Forecasting and AI Insights pages may pull these in.
+LAZY_PACKAGES = ['statsmodels', 'sklearn', 'scipy', 'httpx', 'openai']
+# Cumulative import time of the dashboard modules on top of the baseline.
+# They take ~60 ms; importing SARIMAX eagerly alone costs ~1 s.
+IMPORT_BUDGET_MS = 400
+
+def app_modules():
+    """The modules.* imports at the top of app.py."""
+    with open(os.path.join(APP_DIR, 'app.py')) as f:
+        return sorted(set(re.findall(r'^from (modules\.\w+) import', f.read(), re.MULTILINE)))
+
+def run_importtime():
+    code = (f"import {', '.join(BASELINE)}\n"
+            f"import {', '.join(app_modules())}\n"
+            "import sys\n"
+            "print(' '.join(sorted(sys.modules)))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=APP_DIR,
+                            capture_output=True, text=True, check=True, timeout=120)
+    return result.stdout.split(), result.stderr
+
+def test_app_startup_does_not_import_heavy_dependencies():
+    loaded, _ = run_importtime()
+    eager = sorted({name.split('.')[0] for name in loaded} & set(LAZY_PACKAGES))
+    assert not eager, f"app.py startup imports {eager}; import them where they are used"
+
+def test_app_module_import_time_within_budget():
+    _, report = run_importtime()
+    # -X importtime lines: "import time: self [us] | cumulative | <indent>package"
+    cumulative_us = sum(int(cumulative) for cumulative, name in
+                        re.findall(r'^import time:\s+\d+ \|\s+(\d+) \| (\S.*)$', report, re.MULTILINE)
+                        if name.startswith('modules.') or name == 'modules')
+    assert cumulative_us / 1000 < IMPORT_BUDGET_MS, report
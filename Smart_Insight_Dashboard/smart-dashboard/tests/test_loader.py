@@ -0,0 +1,84 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from modules.loader import DataLoader, apply_schema
+
+@pytest.fixture
+def csv_path(tmp_path):
+    data = {
+        'order_id': ['O1', 'O2', 'O3'],
+        'order_date': ['2023-01-01', '2023-01-15', '2023-02-01'],
+        'ship_date': ['2023-01-03', '2023-01-18', '2023-02-04'],
+        'sales': [100.0, None, 300.0],
+        'profit': [10.0, 20.0, None],
+        'quantity': [1, 2, 3],
+        'region': ['North', 'South', 'North']
+    }
+    path = tmp_path / 'orders.csv'
+    pd.DataFrame(data).to_csv(path, index=False)
+    return str(path)
+
+def test_load_data_writes_and_serves_cache(csv_path, monkeypatch):
+    loader = DataLoader(csv_path)
+    cold = loader.load_data()
+
+    parquet_path, meta_path = loader._cache_paths()
+    assert os.path.exists(parquet_path)
+    assert os.path.exists(meta_path)
+
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("warm start must not re-parse the CSV")
+    monkeypatch.setattr(pd, 'read_csv', fail_read_csv)
+
+    warm = DataLoader(csv_path).load_data()
+    pd.testing.assert_frame_equal(cold, warm)
+    assert warm['month_year'].dtype == cold['month_year'].dtype
+
+def test_cache_survives_touch_but_not_content_change(csv_path):
+    loader = DataLoader(csv_path)
+    loader.load_data()
+    fingerprint = loader.fingerprint()
+
+    # Same bytes, new mtime: cache is still valid.
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert loader._read_cache() is not None
+    assert loader.fingerprint() == fingerprint
+
+    # New content: cache is invalidated and rebuilt on the next load.
+    with open(csv_path, 'a') as f:
+        f.write('O4,2023-03-01,2023-03-02,400.0,40.0,4,South\n')
+    assert loader._read_cache() is None
+    assert len(loader.load_data()) == 4
+    assert loader.fingerprint() != fingerprint
+
+def test_apply_schema_compacts_and_reports():
+    n = 200
+    df = pd.DataFrame({
+        'order_id': [f'ORD-{i}' for i in range(n)],
+        'customer_id': [f'CUST-{i % 10}' for i in range(n)],
+        'region': ['North', 'South', 'East', 'West'] * (n // 4),
+        'quantity': np.arange(n, dtype='int64'),
+        'sales': np.linspace(1, 100, n)
+    })
+
+    df, report = apply_schema(df)
+    report = report.set_index('column')
+
+    assert df['region'].dtype == 'category'
+    assert df['customer_id'].dtype == 'category'
+    assert df['order_id'].dtype == 'string[pyarrow]'
+    assert df['quantity'].dtype == 'int32'
+    assert df['sales'].dtype == 'float64'
+    assert 'sales' not in report.index
+    assert (report['saved_bytes'] > 0).all()
+
+def test_memory_report_survives_warm_start(csv_path):
+    loader = DataLoader(csv_path)
+    loader.load_data()
+    assert 'region' in set(loader.memory_report['column'])
+
+    warm = DataLoader(csv_path)
+    warm.load_data()
+    pd.testing.assert_frame_equal(warm.memory_report, loader.memory_report)
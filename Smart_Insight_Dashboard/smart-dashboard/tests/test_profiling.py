@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.kpi import KPIEngine
+from modules.profiling import Profiler, get_profiler
+
+def test_engine_methods_record_time_and_rows():
+    df = pd.DataFrame({
+        'order_id': ['O1', 'O2', 'O3'],
+        'order_date': pd.to_datetime(['2023-01-01', '2023-02-01', '2023-03-01']),
+        'sales': [100.0, 200.0, 300.0],
+        'profit': [10.0, 20.0, 30.0]
+    })
+    profiler = get_profiler()
+    run = profiler.begin_run()
+    KPIEngine(df).calculate_kpis()
+
+    (record,) = profiler.records(run)
+    assert record['name'] == 'KPIEngine.calculate_kpis'
+    assert record['rows'] == 3
+    assert record['ms'] >= 0
+    assert record['error'] is None
+
+def test_nested_blocks_report_their_own_peak_memory():
+    profiler = Profiler(track_memory=True)
+    try:
+        run = profiler.begin_run()
+        with profiler.measure('outer'):
+            with profiler.measure('inner'):
+                big = np.ones(2_000_000)  # 16 MB
+                del big
+            with profiler.measure('sibling'):
+                small = np.ones(10_000)  # 80 KB
+                del small
+    finally:
+        profiler.set_memory_tracking(False)
+
+    records = {r['name']: r for r in profiler.records(run)}
+    assert records['inner']['peak_bytes'] >= 16_000_000
+    # The outer block's peak includes everything its children allocated
+    assert records['outer']['peak_bytes'] >= records['inner']['peak_bytes']
+    # A later sibling starts from its own baseline, not the earlier 16 MB peak
+    assert 80_000 <= records['sibling']['peak_bytes'] < 1_000_000
+    names = profiler.summary(run)['name'].tolist()
+    assert names[0] == 'outer' and sorted(names) == ['inner', 'outer', 'sibling']
+
+def test_failed_calls_are_recorded_and_reraised():
+    profiler = Profiler()
+
+    @profiler.profiled(name='boom')
+    def boom():
+        raise ValueError('bad input')
+
+    with pytest.raises(ValueError):
+        boom()
+    (record,) = profiler.records()
+    assert record['name'] == 'boom'
+    assert record['error'] == 'ValueError'
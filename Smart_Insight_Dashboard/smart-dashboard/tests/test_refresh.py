@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+from modules.cube import SalesCube
+from modules.loader import DataLoader
+from modules.refresh import IncrementalDataset
+from modules.synthetic import SyntheticGenerator
+from modules.utils import concat_rows
+
+@pytest.fixture
+def files(tmp_path):
+    """Base CSV, an incoming dir, and the raw rows split into base / new / late orders."""
+    raw = SyntheticGenerator(6000, seed=11).generate()
+    cutoff = raw['order_date'].quantile(0.8)
+    new = raw['order_date'] > cutoff
+    # A few whole orders from the middle of the history arrive late
+    middle = raw.loc[~new, 'order_id'].drop_duplicates().sample(50, random_state=0)
+    late = raw['order_id'].isin(middle) & ~new
+    base_path = tmp_path / 'base.csv'
+    raw[~new & ~late].to_csv(base_path, index=False)
+    incoming = tmp_path / 'incoming'
+    incoming.mkdir()
+    return raw, str(base_path), incoming, {'new': raw[new], 'late': raw[late]}
+
+def _dataset(base_path, incoming):
+    df = DataLoader(base_path, use_cache=False).load_data()
+    return IncrementalDataset(df, batch_dir=str(incoming), min_interval=0)
+
+def _sorted_cube(cube):
+    frame = cube.frame.astype({c: str for c in cube.frame.select_dtypes('category').columns})
+    keys = [c for c in frame.columns if frame[c].dtype == object] + ['order_date']
+    return frame.sort_values(keys, ignore_index=True)
+
+def test_appended_batches_match_full_reload(files, tmp_path):
+    raw, base_path, incoming, batches = files
+    dataset = _dataset(base_path, incoming)
+    batches['new'].to_csv(incoming / 'batch-1.csv', index=False)
+    batches['late'].to_parquet(incoming / 'batch-2.parquet', index=False)
+
+    assert dataset.refresh() == len(batches['new']) + len(batches['late'])
+    version, df, cube = dataset.snapshot()
+    assert version == 2 and dataset.applied == ['batch-1.csv', 'batch-2.parquet']
+
+    raw.to_csv(tmp_path / 'full.csv', index=False)
+    full = DataLoader(str(tmp_path / 'full.csv'), use_cache=False).load_data()
+    assert len(df) == len(full) and df['order_day'].is_monotonic_increasing
+    assert isinstance(df['region'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_series_equal(df.groupby('order_day')['sales'].sum(),
+                                   full.groupby('order_day')['sales'].sum())
+
+    pd.testing.assert_frame_equal(_sorted_cube(cube), _sorted_cube(SalesCube.from_frame(full)),
+                                  check_dtype=False)
+
+def test_batches_are_applied_once(files):
+    _, base_path, incoming, batches = files
+    dataset = _dataset(base_path, incoming)
+    (incoming / '.partial.csv').write_text('not,a,batch\n')
+    assert dataset.refresh() == 0
+
+    batches['new'].to_csv(incoming / 'batch-1.csv', index=False)
+    rows = dataset.refresh()
+    assert rows == len(batches['new'])
+    assert dataset.refresh() == 0
+    assert dataset.snapshot()[0] == 1
+
+def test_batch_sales_are_filled_with_the_base_mean(files):
+    _, base_path, incoming, batches = files
+    dataset = _dataset(base_path, incoming)
+    batch = batches['new'].copy()
+    missing = batch['order_id'].isin(batch['order_id'].iloc[:3])
+    batch.loc[missing, 'sales'] = None
+    batch.to_csv(incoming / 'batch-1.csv', index=False)
+    dataset.refresh()
+
+    df = dataset.snapshot()[1]
+    filled = df['order_id'].isin(batch.loc[missing, 'order_id'])
+    assert filled.sum() == missing.sum()
+    assert df.loc[filled, 'sales'].tolist() == pytest.approx([dataset.sales_fill] * missing.sum())
+    assert dataset.sales_fill != pytest.approx(batch['sales'].mean())
+
+def test_refresh_is_throttled(files):
+    _, base_path, incoming, batches = files
+    dataset = _dataset(base_path, incoming)
+    dataset.min_interval = 3600
+    dataset.refresh()
+    batches['new'].to_csv(incoming / 'batch-1.csv', index=False)
+    assert dataset.refresh() == 0
+    assert dataset.refresh(force=True) == len(batches['new'])
+
+def test_concat_rows_unions_categories():
+    a = pd.DataFrame({'region': pd.Categorical(['East', 'West']), 'sales': [1.0, 2.0]})
+    b = pd.DataFrame({'region': pd.Categorical(['North']), 'sales': [3.0]})
+    combined = concat_rows([a, b])
+    assert list(combined['region'].cat.categories) == ['East', 'West', 'North']
+    assert list(combined['region']) == ['East', 'West', 'North']
+    assert list(combined.index) == [0, 1, 2]
@@ -0,0 +1,66 @@
+import json
+import os
+import pytest
+from modules import model_store, report
+from modules.kpi import KPIEngine
+from modules.loader import DataLoader
+from modules.model_store import ModelStore
+from modules.shared import SharedFrameStore
+from modules.synthetic import SyntheticGenerator
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    SyntheticGenerator(5000, seed=7).write(path)
+    return path
+
+def _kpis(out_dir, name):
+    with open(os.path.join(out_dir, name, 'kpis.json')) as f:
+        return json.load(f)
+
+def test_report_pack_matches_engines(data_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(model_store, '_default_store', ModelStore(str(tmp_path / 'models')))
+    out_dir = str(tmp_path / 'out')
+    manifest = report.generate_report(data_path, out_dir, [(), ('region',)], max_workers=1,
+                                      fmt='html', periods=3, store=SharedFrameStore(str(tmp_path / 'shm')))
+
+    df = DataLoader(data_path).load_data()
+    regions = sorted(df['region'].unique())
+    assert [entry['slice'] for entry in manifest['slices']] == ['all'] + [f"region={r}" for r in regions]
+    assert manifest['failures'] == {}
+
+    east = _kpis(out_dir, 'region=East')
+    expected = KPIEngine(df[df['region'] == 'East']).calculate_kpis()
+    assert east['kpis']['total_sales'] == pytest.approx(expected['total_sales'])
+    assert east['kpis']['total_orders'] == expected['total_orders']
+    assert len(east['forecast']) == 3
+    entry = manifest['slices'][0]
+    assert len(entry['files']) == len(report.FIGURES) + 3
+    assert all(os.path.exists(path) for path in entry['files'])
+
+def test_report_workers_share_published_frames(data_path, tmp_path):
+    out_dir = str(tmp_path / 'out')
+    store = SharedFrameStore(str(tmp_path / 'shm'))
+    manifest = report.generate_report(data_path, out_dir, [('region', 'category')], forecast=False,
+                                      start_date='2022-01-01', end_date='2022-12-31', fmt='html',
+                                      max_workers=2, store=store)
+    assert manifest['workers'] == 2 and manifest['failures'] == {}
+    assert len(manifest['slices']) == 12
+
+    df = DataLoader(data_path).load_data()
+    year = df[df['order_date'].dt.year == 2022]
+    name = 'region=West__category=Technology'
+    west_tech = year[(year['region'] == 'West') & (year['category'] == 'Technology')]
+    assert _kpis(out_dir, name)['kpis']['total_sales'] == pytest.approx(west_tech['sales'].sum())
+
+def test_parse_dimensions():
+    assert report.parse_dimensions(['all', 'region', 'region, category']) == [
+        (), ('region',), ('region', 'category')]
+    with pytest.raises(ValueError):
+        report.parse_dimensions(['customer_id'])
+
+def test_write_figure_falls_back_to_html(tmp_path, monkeypatch):
+    monkeypatch.setattr(report, 'image_export_available', lambda: False)
+    fig = report.px.bar(x=[1, 2], y=[3, 4])
+    assert report.write_figure(fig, str(tmp_path / 'chart'), 'png') == str(tmp_path / 'chart.html')
+    assert os.path.exists(tmp_path / 'chart.html')
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from modules.rfm import RFMEngine, quantile_scores
+
+def make_orders(n=20_000, n_customers=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    customer = rng.integers(0, n_customers, n)
+    return pd.DataFrame({
+        'order_id': [f"O{i // 3}" for i in range(n)],  # three lines per order
+        'order_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365, n)), unit='D'),
+        'customer_id': [f"C{c}" for c in customer],
+        # Names repeat across ids, so they must not be the key
+        'customer_name': [f"Name {c % 50}" for c in customer],
+        'sales': rng.gamma(2, 100, n)
+    })
+
+def test_scores_key_on_customer_id():
+    df = pd.DataFrame({
+        'order_id': ['A', 'A', 'B', 'C'],
+        'order_date': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-03-01', '2024-02-01']),
+        'customer_id': ['C1', 'C1', 'C1', 'C2'],
+        'customer_name': ['Sam', 'Sam', 'Sam', 'Sam'],
+        'sales': [10.0, 5.0, 20.0, 7.0]
+    })
+    scores = RFMEngine(df).scores().set_index('customer_id')
+    assert scores.loc['C1', ['frequency', 'monetary', 'recency_days']].tolist() == [2, 35.0, 0]
+    assert scores.loc['C2', ['frequency', 'monetary', 'recency_days']].tolist() == [1, 7.0, 29]
+
+def test_incremental_update_matches_full_recompute():
+    df = make_orders()
+    # The split falls inside an order, whose lines must still count once
+    split = 15_001
+    engine = RFMEngine(df.iloc[:split])
+    engine.scores()
+    engine.update(df.iloc[split:])
+
+    full = RFMEngine(df).scores().sort_values('customer_id', ignore_index=True)
+    incremental = engine.scores().sort_values('customer_id', ignore_index=True)
+    pd.testing.assert_frame_equal(incremental, full)
+    assert engine.rows == len(df) and full['frequency'].sum() == df['order_id'].nunique()
+
+def test_quantile_scores_are_balanced_and_keep_ties_together():
+    scores = quantile_scores(np.random.default_rng(1).normal(size=10_000))
+    assert np.bincount(scores, minlength=6)[1:].tolist() == [2_000] * 5
+    tied = quantile_scores(np.array([1, 1, 1, 1, 2, 3, 4, 5]))
+    assert len(set(tied[:4])) == 1 and tied[-1] == 5
+
+def test_segment_summary_covers_every_customer():
+    engine = RFMEngine(make_orders())
+    summary = engine.segment_summary()
+    assert summary['customers'].sum() == len(engine)
+    assert np.isclose(summary['share'].sum(), 1.0)
+    top = engine.top_customers(5)
+    assert top['monetary'].is_monotonic_decreasing and len(top) == 5
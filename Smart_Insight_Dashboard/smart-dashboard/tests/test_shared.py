@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from modules.cube import SalesCube
+from modules.forecasting import ForecastEngine
+from modules.kpi import KPIEngine
+from modules.loader import DataLoader, apply_schema
+from modules.shared import SharedFrameStore, read_frame, write_frame
+from modules.synthetic import SyntheticGenerator
+from modules.visualization import Visualizer
+
+@pytest.fixture(scope='module')
+def sample_df():
+    df, _ = apply_schema(DataLoader()._preprocess(SyntheticGenerator(20_000, seed=3).generate()))
+    return df
+
+def mapped(values):
+    """True when an array is a view of a memory-mapped file."""
+    while values is not None and not isinstance(values, np.memmap):
+        values = values.base
+    return values is not None
+
+def test_round_trip_is_exact_and_memory_mapped(sample_df, tmp_path):
+    write_frame(sample_df, str(tmp_path / 'rows'))
+    attached = read_frame(str(tmp_path / 'rows'))
+
+    pd.testing.assert_frame_equal(attached, sample_df)
+    assert mapped(attached['sales'].to_numpy())
+    assert mapped(attached['region'].cat.codes.to_numpy())
+    assert mapped(attached['month_year'].array.asi8)
+    with pytest.raises(ValueError):
+        attached['sales'].to_numpy()[0] = 1.0
+
+def test_engines_run_unchanged_on_attached_frames(sample_df, tmp_path):
+    store = SharedFrameStore(str(tmp_path))
+    cube = SalesCube.from_frame(sample_df)
+    rows = store.get_or_publish('rows', 'orders.csv', 'fp', lambda: sample_df)
+    shared_cube = SalesCube.get_or_publish(store, 'orders.csv', 'fp', lambda: sample_df)
+    pd.testing.assert_frame_equal(shared_cube.repeats, cube.repeats)
+
+    assert KPIEngine(rows, cube=shared_cube).calculate_kpis() == KPIEngine(sample_df, cube=cube).calculate_kpis()
+    assert (Visualizer(rows, cube=shared_cube).plot_sales_over_time().to_json()
+            == Visualizer(sample_df, cube=cube).plot_sales_over_time().to_json())
+    pd.testing.assert_frame_equal(ForecastEngine(rows, cube=shared_cube).prepare_data(),
+                                  ForecastEngine(sample_df, cube=cube).prepare_data())
+
+def _worker_total(root, build_log, results):
+    def build():
+        with open(build_log, 'a') as f:
+            f.write('built\n')
+        return pd.DataFrame({'sales': np.arange(100_000, dtype='float64')})
+    rows = SharedFrameStore(root).get_or_publish('rows', 'orders.csv', 'fp', build)
+    results.put(float(rows['sales'].sum()))
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_concurrent_workers_build_once_and_share(tmp_path):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    build_log = str(tmp_path / 'builds.log')
+    workers = [context.Process(target=_worker_total, args=(str(tmp_path / 'shm'), build_log, results))
+               for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(30)
+
+    assert [results.get(timeout=5) for _ in workers] == [4999950000.0] * 4
+    with open(build_log) as f:
+        assert f.read().count('built') == 1
+
+def test_new_fingerprint_replaces_old_version_of_the_same_source(tmp_path):
+    store = SharedFrameStore(str(tmp_path))
+    store.publish(pd.DataFrame({'x': [1]}), 'rows', 'a.csv', 'old')
+    store.publish(pd.DataFrame({'x': [9]}), 'rows', 'b.csv', 'other')
+    store.publish(pd.DataFrame({'x': [2]}), 'rows', 'a.csv', 'new')
+    assert store.attach('rows', 'a.csv', 'old') is None
+    assert store.attach('rows', 'a.csv', 'new')['x'].tolist() == [2]
+    # Another dataset published to the same root is not pruned
+    assert store.attach('rows', 'b.csv', 'other')['x'].tolist() == [9]
+    assert sorted(os.listdir(str(tmp_path))) == sorted(
+        os.path.basename(store.path('rows', path, fp)) for path, fp in [('a.csv', 'new'), ('b.csv', 'other')])
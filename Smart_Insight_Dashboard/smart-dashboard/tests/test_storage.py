@@ -0,0 +1,106 @@
+import os
+import pandas as pd
+import pytest
+from modules.cube import SalesCube
+from modules.loader import DataLoader
+from modules.kpi import KPIEngine
+from modules.rfm import RFMEngine, RFM_COLUMNS
+from modules.utils import filter_data_by_date
+
+@pytest.fixture
+def loader(tmp_path):
+    dates = pd.date_range('2023-01-01', periods=90, freq='D')
+    df = pd.DataFrame({
+        'order_id': [f'O{i // 3}' for i in range(90)],
+        'order_date': dates,
+        'ship_date': dates + pd.Timedelta(days=2),
+        'ship_mode': 'Standard Class',
+        'customer_id': [f'C{i % 7}' for i in range(90)],
+        'customer_name': [f'Customer {i % 7}' for i in range(90)],
+        'segment': 'Consumer',
+        'region': ['North', 'South', 'East'] * 30,
+        'state': 'Sample State',
+        'city': 'Sample City',
+        'product_id': [f'P{i % 5}' for i in range(90)],
+        'category': ['Furniture', 'Technology'] * 45,
+        'sub_category': ['Chairs', 'Phones'] * 45,
+        'product_name': [f'Product {i % 5}' for i in range(90)],
+        'sales': [float(i + 1) for i in range(90)],
+        'quantity': [i % 4 + 1 for i in range(90)],
+        'discount': 0.0,
+        'profit': [float(i % 9) for i in range(90)]
+    })
+    path = tmp_path / 'orders.csv'
+    df.to_csv(path, index=False)
+    return DataLoader(str(path))
+
+def test_store_matches_pandas_path(loader):
+    df = loader.load_data()
+    store = loader.get_store()
+    start, end = pd.Timestamp('2023-01-15').date(), pd.Timestamp('2023-02-20').date()
+
+    expected = KPIEngine(filter_data_by_date(df, start, end)).calculate_kpis()
+    assert store.kpis(start, end) == pytest.approx(expected)
+
+    pd.testing.assert_frame_equal(store.monthly(), loader.get_monthly_aggregated(df), check_dtype=False)
+
+    by_region = store.aggregate(by=['region'], start_date=start, end_date=end).set_index('region')
+    filtered = filter_data_by_date(df, start, end)
+    expected_region = filtered.groupby('region', observed=True)['sales'].sum()
+    pd.testing.assert_series_equal(by_region['sales'], expected_region.rename_axis('region'),
+                                   check_names=False, check_index_type=False, check_categorical=False)
+
+def test_store_is_rebuilt_only_when_source_changes(loader):
+    store = loader.get_store()
+    assert store.fingerprint() == loader.fingerprint()
+    built_at = os.path.getmtime(store.db_path)
+    assert os.path.getmtime(loader.get_store().db_path) == built_at
+
+    with open(loader.data_path, 'a') as f:
+        f.write('O99,2023-04-01,2023-04-03,Standard Class,C1,Customer 1,Consumer,West,'
+                'Sample State,Sample City,P1,Furniture,Chairs,Product 1,10.0,1,0.0,1.0\n')
+    assert loader.get_store().date_bounds()[1] == pd.Timestamp('2023-04-01')
+
+def test_store_rejects_unknown_group_columns(loader):
+    store = loader.get_store()
+    with pytest.raises(ValueError):
+        store.aggregate(by=['region; DROP TABLE sales'])
+
+def test_forecast_round_trip(loader):
+    store = loader.get_store()
+    forecast = pd.DataFrame({
+        'lower_ci': [1.0, 2.0],
+        'upper_ci': [3.0, 4.0],
+        'predicted': [2.0, 3.0]
+    }, index=pd.to_datetime(['2023-04-01', '2023-05-01']))
+
+    store.save_forecast(forecast)
+    loaded = store.load_forecast()
+    assert list(loaded['predicted']) == [2.0, 3.0]
+    assert list(loaded.index) == list(forecast.index)
+
+def test_missing_sales_use_the_global_mean(loader, tmp_path):
+    raw = pd.read_csv(loader.data_path)
+    raw.loc[[5, 80], 'sales'] = None
+    raw.to_csv(loader.data_path, index=False)
+    store = loader.get_store()
+    store.load_csv(loader.data_path, chunksize=30)
+
+    df = loader.load_data()
+    assert store.kpis()['total_sales'] == pytest.approx(df['sales'].sum())
+
+def test_store_cube_and_rows_match_the_filtered_frame(loader):
+    df = loader.load_data()
+    store = loader.get_store()
+    start, end = pd.Timestamp('2023-01-15').date(), pd.Timestamp('2023-02-20').date()
+    filtered = filter_data_by_date(df, start, end)
+
+    cube = SalesCube(store.cube_frame(start, end))
+    assert KPIEngine(None, cube=cube).calculate_kpis() == pytest.approx(store.kpis(start, end))
+    pd.testing.assert_frame_equal(cube.frame, SalesCube.from_frame(filtered).frame,
+                                  check_dtype=False, check_categorical=False)
+
+    rfm = RFMEngine()
+    for chunk in store.iter_rows(start, end, columns=RFM_COLUMNS, chunksize=20):
+        rfm.update(chunk)
+    pd.testing.assert_frame_equal(rfm.segment_summary(), RFMEngine(filtered).segment_summary())
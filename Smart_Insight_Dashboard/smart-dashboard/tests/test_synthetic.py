@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from modules.loader import DataLoader
+from modules.synthetic import COLUMNS, SyntheticGenerator
+
+def test_generator_is_reproducible_and_shaped_like_superstore():
+    df = SyntheticGenerator(20_000, n_customers=300, n_products=500, n_regions=6).generate()
+
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 20_000
+    pd.testing.assert_frame_equal(df, SyntheticGenerator(20_000, n_customers=300, n_products=500,
+                                                         n_regions=6).generate())
+    assert df['customer_id'].nunique() <= 300
+    assert df['product_id'].nunique() <= 500
+    assert df['region'].nunique() == 6
+    assert (df['ship_date'] >= df['order_date']).all()
+
+    # Lines of one order share its date and customer
+    per_order = df.groupby('order_id')[['order_date', 'customer_id']].nunique()
+    assert (per_order == 1).all().all()
+
+    # Year-end peak and skewed customers
+    by_month = df.groupby(df['order_date'].dt.month)['sales'].sum()
+    assert by_month[12] > by_month[6]
+    top_share = df['customer_id'].value_counts(normalize=True)
+    assert top_share.iloc[0] > 5 * top_share.median()
+
+@pytest.mark.parametrize('suffix', ['csv', 'parquet'])
+def test_chunked_write_round_trips_through_loader(tmp_path, suffix):
+    path = str(tmp_path / f'orders.{suffix}')
+    generator = SyntheticGenerator(5_000, seed=7)
+    generator.write(path, chunksize=1_200)
+    expected = pd.concat(generator.chunks(1_200), ignore_index=True)
+
+    df = DataLoader(path, use_cache=False).load_data()
+    assert len(df) == 5_000
+    assert df['order_id'].nunique() == expected['order_id'].nunique()
+    assert df['sales'].sum() == pytest.approx(expected['sales'].sum())
+
+    streamed = DataLoader(path).stream_data(chunksize=1_000)
+    assert streamed.totals()['sales'] == pytest.approx(expected['sales'].sum())
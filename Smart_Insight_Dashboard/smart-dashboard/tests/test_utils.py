@@ -0,0 +1,38 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from modules.utils import day_index, filter_data_by_date, process_pool, slice_by_date
+
+def _frame(sort):
+    rng = np.random.default_rng(1)
+    dates = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 400 * 24, 500), unit='h')
+    df = pd.DataFrame({'order_date': dates, 'sales': rng.uniform(0, 100, 500)})
+    if sort:
+        df = df.sort_values('order_date', ignore_index=True)
+    df['order_day'] = day_index(df['order_date'])
+    return df
+
+def _reference(df, start, end):
+    return df[(df['order_date'].dt.date >= start) & (df['order_date'].dt.date <= end)]
+
+def test_slice_by_date_matches_row_mask():
+    df = _frame(sort=True)
+    start, end = date(2022, 3, 1), date(2022, 7, 15)
+
+    sliced = slice_by_date(df, start, end)
+    pd.testing.assert_frame_equal(sliced, _reference(df, start, end))
+    # Positional slice shares memory with the parent frame
+    assert np.shares_memory(sliced['sales'].to_numpy(), df['sales'].to_numpy())
+
+def test_filter_data_by_date_falls_back_when_unsorted():
+    df = _frame(sort=False)
+    start, end = date(2022, 3, 1), date(2022, 7, 15)
+    pd.testing.assert_frame_equal(filter_data_by_date(df, start, end), _reference(df, start, end))
+    pd.testing.assert_frame_equal(filter_data_by_date(df.drop(columns='order_day'), start, end),
+                                  _reference(df, start, end).drop(columns='order_day'))
+
+def test_process_pool_workers_are_not_forked():
+    with process_pool(1) as first, process_pool(1) as second:
+        assert first._mp_context is second._mp_context
+        assert first._mp_context.get_start_method() != 'fork'
+        assert list(first.map(abs, [-1, 2])) == [1, 2]